@@ -1,4 +1,7 @@
+import os
+import tempfile
 from functools import lru_cache  # For caching function results to improve performance
+from typing import Literal
 
 from pydantic_settings import (  # Pydantic base class for settings management
     BaseSettings,
@@ -18,6 +21,54 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"  # Algorithm used for JWT tokens
     jwt_secret: str  # Secret key for signing JWT tokens
     jwt_expiration: int = 30  # Token expiration time in minutes
+    token_cache_size: int = 1024  # Maximum number of cached verified tokens
+    token_cache_ttl: float = 60  # Seconds a verified token stays cached
+    fragment_cache_size: int = 100_000  # Maximum number of cached incident JSONs
+    query_cache_size: int = 1024  # Maximum number of cached incident searches
+    bulk_max_items: int = 1000  # Maximum number of items in a bulk request
+    export_chunk_size: int = 500  # Incidents read and sent at once by exports
+    import_batch_size: int = 1000  # Incidents validated and stored at once by imports
+    # Snapshot the storage engines are seeded from, rebuilt from the sample data
+    # once older than `seed_max_age` seconds, see `app.store.seed.Seed`
+    seed_path: str = os.path.join(tempfile.gettempdir(), "byron-labs-api", "seed.bin")
+    seed_max_age: float | None = 24 * 3600
+
+    # Delta syncs: deleted incidents leave a tombstone, kept for this long so
+    # clients syncing within the retention period learn about the deletion
+    tombstone_retention: float = 7 * 24 * 3600  # Seconds tombstones are kept
+    changes_page_size: int = 1000  # Maximum number of changes returned at once
+
+    # Live incident feed: every subscriber gets a bounded queue of events, and is
+    # dropped once it falls that many events behind
+    feed_queue_size: int = 256  # Maximum number of events queued per subscriber
+    feed_max_subscribers: int = 10_000  # Maximum number of subscribers
+    feed_keepalive: float = 15  # Seconds between keep-alive messages
+
+    # Password verification pool used by logins: once every worker is busy and
+    # the queue is full, logins are rejected with a 503 until a slot frees up
+    password_workers: int = 2  # Threads verifying bcrypt password hashes
+    password_queue_size: int = 16  # Maximum number of logins waiting for a thread
+    password_retry_after: float = 1  # Seconds rejected clients are told to wait
+
+    # Storage engine used for incidents and reporters ("memory" or "sqlite")
+    storage_backend: Literal["memory", "sqlite"] = "memory"
+    sqlite_path: str = "incidents.db"  # Database file used by the SQLite engine
+    sqlite_pool_size: int = 4  # Maximum number of pooled SQLite connections
+
+    # Durability of the memory engine: when a journal directory is set, changes
+    # are appended to a journal that is regularly compacted into a snapshot
+    journal_dir: str | None = None  # Directory of the journal and snapshots
+    journal_fsync: Literal["always", "interval", "never"] = "interval"
+    journal_fsync_interval: float = 1.0  # Seconds between fsyncs ("interval")
+    snapshot_interval: float = 300  # Seconds between journal compactions
+
+    # Request profiling: when a profile directory is set, requests sent with the
+    # `X-Profile: <profile_token>` header, or sampled once profiling is armed by
+    # an admin, are profiled and their profiles saved to the directory
+    profile_dir: str | None = None  # Directory the profiles are saved to
+    profile_token: str | None = None  # Token of the profiling header
+    profile_interval: float = 0.001  # Seconds between two sampled call stacks
+    admin_users: list[str] = []  # Usernames allowed to use the admin endpoints
 
     # Configuration for loading environment variables from a specific file
     model_config = SettingsConfigDict(env_file=".env")
@@ -1,18 +1,61 @@
+import logging
+import time
+from contextlib import asynccontextmanager
 from typing import Annotated
 
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core import config
-from .routers import auth, incident, reporter
+from .routers import admin, auth, incident, metrics, reporter
+from .store.backend import get_storage
+from .store.seed import get_seed
+from .utils.feed import get_broadcaster
+from .utils.metrics import MetricsMiddleware
+from .utils.password import get_password_verifier
+from .utils.profiling import ProfilingMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the storage engine on startup and close it on shutdown.
+
+    The password verification pool is shut down along with the storage engine,
+    after the subscriptions to the live incident feed are ended.
+    The time taken to load the storage engine is logged, along with the time
+    spent reading the seed snapshot.
+    """
+    started = time.perf_counter()
+    storage = get_storage()
+    await storage.open()
+    logger.info(
+        "Storage loaded in %.3fs, of which %.3fs reading the seed snapshot",
+        time.perf_counter() - started,
+        sum(get_seed().timings.values()),
+    )
+    yield
+    get_broadcaster().close()  # End the live feed streams before the storage
+    await storage.close()
+    get_password_verifier().close()
+    get_password_verifier.cache_clear()  # A restarted application gets a new pool
+
 
 # Initialize the FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Include routers for various parts of the application
 app.include_router(auth.router)  # Authentication and user-related endpoints
 app.include_router(incident.router)  # Incident management endpoints
 app.include_router(reporter.router)  # Reporter-related endpoints
+app.include_router(metrics.router)  # Prometheus metrics endpoint
+app.include_router(admin.router)  # Administration endpoints
+
+# Profile the requests picked by the request profiler. The settings are only
+# read by the first request, so the application can be imported without them
+app.add_middleware(ProfilingMiddleware)
 
 # Configure Cross-Origin Resource Sharing (CORS) to allow specific origins
 app.add_middleware(
@@ -23,6 +66,9 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all HTTP headers
 )
 
+# Record the latency, status and payload sizes of every request, per route
+app.add_middleware(MetricsMiddleware)
+
 
 # A basic endpoint to check the status of the application
 @app.get("/")
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ProfilingBody(BaseModel):
+    """
+    Represents the request body arming the request profiler.
+
+    This class contains the probability of profiling a request, the number of
+    profiles to take before the profiler disarms itself, and the prefix of the
+    paths of the requests to sample.
+    """
+
+    sample_rate: float = Field(gt=0, le=1)  # Probability of profiling a request
+    count: int = Field(default=10, ge=1, le=1000)  # Number of profiles to take
+    path: str = "/"  # Prefix of the paths of the sampled requests
+
+
+class ProfilingRes(BaseModel):
+    """
+    Represents the state of the request profiler.
+
+    This class contains whether requests are being sampled, with which
+    probability and path prefix, and how many profiles are left to take.
+    """
+
+    enabled: bool  # Whether requests are being sampled
+    sample_rate: float  # Probability of profiling a request
+    remaining: int  # Number of profiles left to take
+    path: str  # Prefix of the paths of the sampled requests
+
+
+class ProfileRes(BaseModel):
+    """
+    Represents a saved request profile.
+
+    This class contains the name of the profile, used to download its files,
+    along with the profiled request, its response status and duration, and the
+    number of call stacks sampled while it ran.
+    """
+
+    name: str  # Name of the profile
+    method: str  # HTTP method of the profiled request
+    path: str  # Path of the profiled request
+    route: str | None  # Template of the route that handled the request
+    status: int  # Status code of the response
+    duration_ms: float  # Time taken to handle the request
+    samples: int  # Number of sampled call stacks
+    created_at: datetime  # Time the profile was taken
@@ -17,3 +17,22 @@ class AuthRes(BaseModel):
     email: str  # The user's email address
     company: str  # The company with which the user is affiliated
     access_token: str  # JWT access token for authorization
+
+
+class PasswordPoolRes(BaseModel):
+    """
+    Represents the state of the password verification pool used by logins.
+
+    This class contains the size of the pool and its admission queue, the
+    number of verifications currently running or waiting, and counters of the
+    verifications completed or rejected since the application started.
+    """
+
+    workers: int  # Number of threads verifying passwords
+    queue_size: int  # Maximum number of verifications waiting for a thread
+    running: int  # Verifications currently running
+    waiting: int  # Verifications waiting for a thread
+    completed: int  # Verifications completed
+    rejected: int  # Verifications rejected because the queue was full
+    avg_wait_ms: float  # Average time spent waiting for a thread
+    avg_verify_ms: float  # Average time spent verifying a password
@@ -1,12 +1,26 @@
 from datetime import datetime
 from enum import Enum
 from typing import Annotated
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import Body, Query
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, Field
 
-from ..models.reporter import Reporter
+from ..models.reporter import Reporter, ReporterRef
+
+
+def local_time(value: datetime | None) -> datetime | None:
+    """
+    Convert a timezone-aware datetime into the naive local time incidents use.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+# Timestamp of an incident. Timezone-aware values are converted to naive local
+# time, so that all incident timestamps can be compared with each other
+LocalDatetime = Annotated[datetime, AfterValidator(local_time)]
 
 
 class IncidentSeverity(str, Enum):
@@ -36,16 +50,18 @@ class Incident(BaseModel):
 
     This class encapsulates the common attributes of an incident,
     such as title, description, severity, reporter, status, and date.
+    The reporter is referenced by its username, and joined from the reporter
+    table when incidents are returned, see `IncidentRes`.
     """
 
     title: str  # Title of the incident
     description: str  # Description of the incident
     severity: IncidentSeverity  # Severity level of the incident
-    reporter: Reporter  # Person or entity reporting the incident
+    reporter: ReporterRef  # Username of the reporter of the incident
     status: IncidentStatus = (
         IncidentStatus.NOT_STARTED
     )  # Current status of the incident
-    date: datetime  # Date when the incident occurred
+    date: LocalDatetime  # Date when the incident occurred
 
 
 class IncidentDTO(Incident):
@@ -58,24 +74,162 @@ class IncidentDTO(Incident):
     """
 
     id: UUID  # Unique identifier for the incident
-    created_at: datetime = datetime.now()  # Timestamp for when the incident was created
-    updated_at: datetime = (
-        datetime.now()
+    created_at: LocalDatetime = Field(
+        default_factory=datetime.now
+    )  # Timestamp for when the incident was created
+    updated_at: LocalDatetime = Field(
+        default_factory=datetime.now
     )  # Timestamp for when the incident was last updated
 
 
+class IncidentImport(IncidentDTO):
+    """
+    Model representing one record of an incident import.
+
+    This class accepts the fields of `IncidentDTO`, so incidents exported from
+    another system keep their identifiers and timestamps. Records without an
+    id get a new UUID, and missing timestamps are set to the time of import.
+    """
+
+    id: UUID = Field(default_factory=uuid4)  # Unique identifier for the incident
+
+
+class IncidentRes(IncidentDTO):
+    """
+    Response model for returning an incident.
+
+    This class extends `IncidentDTO` with the reporter of the incident, which is
+    not stored with the incident but joined from the reporter table when the
+    response is built, so a change to a reporter shows in all of its incidents.
+    """
+
+    reporter: Reporter  # Reporter of the incident
+
+
 class IncidentsRes(BaseModel):
     """
     Response model for returning a list of incidents.
 
-    This class contains a list of IncidentDTO objects, along with metadata
-    about the total count of incidents, the number of skipped records, and the limit on the returned data.
+    This class contains a list of IncidentRes objects, along with metadata
+    about the total count of incidents, the number of skipped records, the limit on the returned data,
+    and a cursor for fetching the next page.
     """
 
-    data: list[IncidentDTO]  # List of incident data transfer objects
+    data: list[IncidentRes]  # List of incidents, with their reporter
     total: int  # Total number of incidents
     skip: int  # Number of records skipped (for pagination)
     limit: int  # Limit on the number of records returned
+    next_cursor: str | None = None  # Cursor for the next page, if there is one
+
+
+class IncidentStatsRes(BaseModel):
+    """
+    Response model for the facet counts of incidents.
+
+    This class contains the number of incidents matching the query, along with
+    the number of them for every severity level, status and reporter.
+    """
+
+    total: int  # Number of matching incidents
+    severity: dict[str, int]  # Number of matching incidents per severity level
+    status: dict[str, int]  # Number of matching incidents per status
+    reporter: dict[str, int]  # Number of matching incidents per reporter username
+
+
+class HistogramBucket(BaseModel):
+    """
+    Model representing one bucket of an incident histogram.
+    """
+
+    start: datetime  # Start of the time interval covered by the bucket
+    count: int  # Number of matching incidents in the interval
+
+
+class IncidentHistogramRes(BaseModel):
+    """
+    Response model for the histogram of incidents over time.
+
+    This class contains the field and interval the incidents were bucketed by,
+    along with the buckets holding at least one matching incident, in
+    chronological order.
+    """
+
+    field: str  # Timestamp field the incidents were bucketed by
+    interval: str  # Length of the interval covered by each bucket
+    total: int  # Number of matching incidents
+    buckets: list[HistogramBucket]  # Non-empty buckets, in chronological order
+
+
+class IncidentPatch(BaseModel):
+    """
+    Model representing the update of one incident in a bulk request.
+
+    This class identifies the incident to update by its UUID. Only the fields
+    that are provided (and not null) are changed, as with a single update.
+    """
+
+    id: UUID  # Unique identifier of the incident to update
+    title: str | None = None  # New title of the incident
+    description: str | None = None  # New description of the incident
+    severity: IncidentSeverity | None = None  # New severity level of the incident
+    reporter: ReporterRef | None = None  # Username of the new reporter
+    status: IncidentStatus | None = None  # New status of the incident
+    date: LocalDatetime | None = None  # New date of the incident
+
+
+class BulkItemRes(BaseModel):
+    """
+    Result of one item of a bulk request.
+
+    This class contains the UUID of the incident the item applied to, the HTTP
+    status code the item would have had as a single request, and an error
+    message if the item failed.
+    """
+
+    id: UUID  # Unique identifier of the incident
+    status: int  # HTTP status code of the item
+    detail: str | None = None  # Error message, if the item failed
+
+
+class BulkRes(BaseModel):
+    """
+    Response model for bulk requests on incidents.
+
+    This class contains the result of every item, in the order of the request,
+    along with the number of items that succeeded and failed.
+    """
+
+    data: list[BulkItemRes]  # Result of every item
+    succeeded: int  # Number of items applied
+    failed: int  # Number of items that could not be applied
+
+
+class IncidentTombstone(BaseModel):
+    """
+    Incident deleted since the version a delta sync started from.
+
+    This class contains the UUID of the deleted incident, along with the
+    version of the storage it was deleted at and the time of its deletion.
+    """
+
+    id: UUID  # Unique identifier of the deleted incident
+    version: int  # Version the incident was deleted at
+    deleted_at: datetime  # Time of the deletion
+
+
+class IncidentChangesRes(BaseModel):
+    """
+    Response model for delta syncs of incidents.
+
+    This class contains the incidents created or updated since a version, the
+    tombstones of the incidents deleted since, the version to sync from next,
+    and a cursor for fetching the rest of the changes.
+    """
+
+    data: list[IncidentRes]  # Incidents changed since the version, as they are now
+    deleted: list[IncidentTombstone]  # Incidents deleted since the version
+    since: int  # Version to sync from next
+    next_cursor: str | None = None  # Cursor for the next page, if there is one
 
 
 class IncidentQueryParams:
@@ -83,20 +237,58 @@ class IncidentQueryParams:
     Query parameters for filtering incidents.
 
     This class is used to define the expected query parameters for incident-related endpoints,
-    allowing filtering based on various attributes such as title, severity, reporter, and status.
+    allowing filtering based on various attributes such as title, description, severity, reporter,
+    and status. The free text `q` parameter matches either the title or the description.
+
+    The `date`, `created_at` and `updated_at` fields can be restricted to a time window
+    with the `*_from` and `*_to` parameters, both inclusive. Timezone-aware values are
+    converted to local time, in which incident timestamps are stored.
     """
 
     def __init__(
         self,
+        q: Annotated[str, Query()] = None,  # Search title and description
         title: Annotated[str, Query()] = None,  # Filter by incident title
+        description: Annotated[str, Query()] = None,  # Filter by incident description
         severity: Annotated[IncidentSeverity, Query()] = None,  # Filter by severity
         reporter: Annotated[str, Query()] = None,  # Filter by reporter
         status: Annotated[IncidentStatus, Query()] = None,  # Filter by status
+        date_from: Annotated[datetime, Query()] = None,  # Earliest incident date
+        date_to: Annotated[datetime, Query()] = None,  # Latest incident date
+        created_from: Annotated[datetime, Query()] = None,  # Earliest creation time
+        created_to: Annotated[datetime, Query()] = None,  # Latest creation time
+        updated_from: Annotated[datetime, Query()] = None,  # Earliest update time
+        updated_to: Annotated[datetime, Query()] = None,  # Latest update time
     ):
+        self.q = q  # Text searched in the title and description
         self.title = title  # Incident title
+        self.description = description  # Incident description
         self.severity = severity  # Severity of the incident
         self.reporter = reporter  # Reporter of the incident
         self.status = status  # Current status of the incident
+        self.date_from = local_time(date_from)  # Lower bound of the incident date
+        self.date_to = local_time(date_to)  # Upper bound of the incident date
+        self.created_from = local_time(created_from)  # Lower bound of created_at
+        self.created_to = local_time(created_to)  # Upper bound of created_at
+        self.updated_from = local_time(updated_from)  # Lower bound of updated_at
+        self.updated_to = local_time(updated_to)  # Upper bound of updated_at
+
+    def ranges(self) -> dict[str, tuple[datetime | None, datetime | None]]:
+        """
+        Return the time windows to filter on, as `(from, to)` bounds by field.
+
+        Only the fields with at least one bound are included.
+        """
+        bounds = {
+            "date": (self.date_from, self.date_to),
+            "created_at": (self.created_from, self.created_to),
+            "updated_at": (self.updated_from, self.updated_to),
+        }
+        return {
+            field: (low, high)
+            for field, (low, high) in bounds.items()
+            if low is not None or high is not None
+        }
 
 
 class IncidentBody:
@@ -114,13 +306,13 @@ class IncidentBody:
         severity: IncidentSeverity | None = Body(
             None
         ),  # Severity level of the incident
-        reporter: Reporter | None = Body(None),  # Reporter of the incident
+        reporter: ReporterRef | None = Body(None),  # Username of the reporter
         status: IncidentStatus | None = Body(None),  # Current status of the incident
         date: datetime | None = Body(None),  # Date of the incident
     ):
         self.title = title  # Incident title
         self.description = description  # Incident description
         self.severity = severity  # Severity of the incident
-        self.reporter = reporter  # Reporter of the incident
+        self.reporter = reporter  # Username of the reporter
         self.status = status  # Current status of the incident
-        self.date = date  # Incident date
+        self.date = local_time(date)  # Incident date, in local time
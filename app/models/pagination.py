@@ -9,17 +9,22 @@ class PaginationQueryParams:
 
     This class defines the expected query parameters used for pagination,
     allowing the specification of 'skip' and 'limit' for controlling which records
-    are retrieved and how many.
+    are retrieved and how many. An opaque 'cursor' taken from the 'next_cursor'
+    of a previous response resumes the listing right after that page.
     """
 
     def __init__(
         self,
         skip: Annotated[
-            int | None, Query()
+            int | None, Query(ge=0)
         ] = 0,  # Number of records to skip (default 0)
         limit: Annotated[
-            int | None, Query()
+            int | None, Query(ge=0)
         ] = None,  # Maximum number of records to return
+        cursor: Annotated[
+            str | None, Query()
+        ] = None,  # Position to resume from (keyset pagination)
     ):
         self.skip = skip  # How many records to skip
         self.limit = limit  # Maximum number of records to return
+        self.cursor = cursor  # Opaque cursor returned by a previous page
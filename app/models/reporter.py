@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Any
 from uuid import UUID
 
-from fastapi import Query
-from pydantic import BaseModel
+from fastapi import Body, Query
+from pydantic import BaseModel, BeforeValidator
 
 
 class Reporter(BaseModel):
@@ -20,6 +20,25 @@ class Reporter(BaseModel):
     company: str  # Company the reporter is associated with
 
 
+def _reporter_username(value: Any) -> Any:
+    """
+    Reduce a reporter given as an object to its username.
+
+    Incidents used to embed a copy of their reporter, so request bodies, exports,
+    journals and snapshots written before may still hold whole reporter objects.
+    """
+    if isinstance(value, Reporter):
+        return value.username
+    if isinstance(value, dict) and "username" in value:
+        return value["username"]
+    return value
+
+
+# Reference to a reporter by username, as stored in incidents. A reporter object
+# is also accepted, and reduced to its username
+ReporterRef = Annotated[str, BeforeValidator(_reporter_username)]
+
+
 class ReporterDTO(Reporter):
     """
     Extended reporter model for Data Transfer Object (DTO) purposes.
@@ -40,13 +59,15 @@ class ReportersRes(BaseModel):
     Response model for returning a list of reporters.
 
     This class contains a list of ReporterDTO objects and additional metadata
-    about the total count of reporters, the number of skipped records, and the limit on the returned data.
+    about the total count of reporters, the number of skipped records, the limit on the returned data,
+    and a cursor for fetching the next page.
     """
 
     data: list[ReporterDTO]  # List of reporter data transfer objects
     total: int  # Total number of reporters
     skip: int  # Number of records skipped (for pagination)
     limit: int  # Limit on the number of records returned
+    next_cursor: str | None = None  # Cursor for the next page, if there is one
 
 
 class ReporterQueryParams:
@@ -69,3 +90,24 @@ class ReporterQueryParams:
         self.last_name = last_name  # Reporter's last name
         self.username = username  # Reporter's username
         self.company = company  # Company associated with the reporter
+
+
+class ReporterBody:
+    """
+    Expected body parameters for updating reporters.
+
+    This class defines the attributes expected in the request body of the
+    reporter update endpoint. The username of a reporter cannot be changed.
+    """
+
+    def __init__(
+        self,
+        name: str | None = Body(None),  # Reporter's full name
+        email: str | None = Body(None),  # Reporter's email address
+        company: str | None = Body(None),  # Company the reporter is associated with
+        disabled: bool | None = Body(None),  # Whether the account is disabled
+    ):
+        self.name = name  # Reporter's full name
+        self.email = email  # Reporter's email address
+        self.company = company  # Company associated with the reporter
+        self.disabled = disabled  # Whether the reporter's account is disabled
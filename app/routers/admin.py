@@ -0,0 +1,108 @@
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from ..models.admin import ProfileRes, ProfilingBody, ProfilingRes
+from ..models.reporter import Reporter
+from ..utils.auth import admin_user
+from ..utils.profiling import Profiler, get_profiler
+
+# Create a FastAPI router with a prefix for administration endpoints
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def configured_profiler(
+    profiler: Annotated[Profiler | None, Depends(get_profiler)],
+) -> Profiler:
+    """
+    Return the request profiler, raising an HTTP 404 exception if profiling is
+    not configured.
+    """
+    if profiler is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled"
+        )
+    return profiler
+
+
+@router.get("/profiling", response_model=ProfilingRes)
+async def read_profiling(
+    auth: Annotated[Reporter, Depends(admin_user)],  # Current administrator
+    profiler: Annotated[Profiler, Depends(configured_profiler)],  # Profiler
+):
+    """
+    Endpoint to get the state of the request profiler.
+
+    This endpoint returns whether requests are being sampled for profiling, and
+    how many profiles are left to take.
+    """
+    return profiler.state()
+
+
+@router.put("/profiling", response_model=ProfilingRes)
+async def arm_profiling(
+    body: ProfilingBody,  # Sampling settings
+    auth: Annotated[Reporter, Depends(admin_user)],  # Current administrator
+    profiler: Annotated[Profiler, Depends(configured_profiler)],  # Profiler
+):
+    """
+    Endpoint to start profiling a sample of the requests.
+
+    This endpoint profiles every request whose path starts with `path` with
+    probability `sample_rate`, until `count` profiles were taken. Requests are
+    profiled one at a time, and their profiles can then be listed and
+    downloaded from `/admin/profiles`.
+    """
+    profiler.arm(body.sample_rate, body.count, body.path)
+    return profiler.state()
+
+
+@router.delete("/profiling", response_model=ProfilingRes)
+async def disarm_profiling(
+    auth: Annotated[Reporter, Depends(admin_user)],  # Current administrator
+    profiler: Annotated[Profiler, Depends(configured_profiler)],  # Profiler
+):
+    """
+    Endpoint to stop profiling sampled requests.
+
+    Requests carrying the profiling header are still profiled.
+    """
+    profiler.disarm()
+    return profiler.state()
+
+
+@router.get("/profiles", response_model=list[ProfileRes])
+async def list_profiles(
+    auth: Annotated[Reporter, Depends(admin_user)],  # Current administrator
+    profiler: Annotated[Profiler, Depends(configured_profiler)],  # Profiler
+):
+    """
+    Endpoint to list the saved request profiles, most recent first.
+    """
+    return profiler.list()
+
+
+@router.get("/profiles/{name}/{kind}")
+async def download_profile(
+    name: str,  # Name of the profile
+    kind: Literal["pstats", "collapsed"],  # File of the profile
+    auth: Annotated[Reporter, Depends(admin_user)],  # Current administrator
+    profiler: Annotated[Profiler, Depends(configured_profiler)],  # Profiler
+):
+    """
+    Endpoint to download a file of a saved request profile.
+
+    The `pstats` file holds the deterministic profile of the request, to be
+    loaded with Python's `pstats` module or a viewer such as snakeviz. The
+    `collapsed` file holds the sampled call stacks, one per line with its
+    number of samples, to be rendered as a flame graph.
+    """
+    path = profiler.file(name, kind)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+
+    media_type = "application/octet-stream" if kind == "pstats" else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=f"{name}.{kind}")
@@ -7,10 +7,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt
 
 from ..core import config
-from ..models.auth import AuthRes
+from ..models.auth import AuthRes, PasswordPoolRes
 from ..models.reporter import Reporter
-from ..utils.auth import crypt, current_user
-from ..utils.reporter import REPORTERS_DB, search_reporter_db
+from ..utils.auth import current_user
+from ..utils.password import PasswordVerifier, get_password_verifier
+from ..utils.reporter import search_reporter_db
 
 # Create a FastAPI router with a prefix for authentication endpoints
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -27,6 +28,23 @@ async def read_users_me(auth: Reporter = Depends(current_user)):
     return auth  # Return the authenticated user's information
 
 
+@router.get("/pool", response_model=PasswordPoolRes)
+async def read_password_pool(
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+    verifier: Annotated[
+        PasswordVerifier, Depends(get_password_verifier)
+    ],  # Password verification pool
+):
+    """
+    Endpoint to get the metrics of the password verification pool.
+
+    This endpoint returns the size of the pool used to check passwords on login,
+    how many verifications are running or waiting, and how many were completed
+    or rejected because the pool was saturated.
+    """
+    return verifier.metrics()
+
+
 @router.post("/login", response_model=AuthRes)
 async def login(
     settings: Annotated[
@@ -35,6 +53,9 @@ async def login(
     form_data: Annotated[
         OAuth2PasswordRequestForm, Depends()
     ],  # Form data for login (username and password)
+    verifier: Annotated[
+        PasswordVerifier, Depends(get_password_verifier)
+    ],  # Password verification pool
 ):
     """
     Endpoint to authenticate a user and generate an access token.
@@ -43,23 +64,17 @@ async def login(
     and password. If valid, it generates a JWT access token with user information.
     """
 
-    # Check if the username exists in the database
-    found = REPORTERS_DB.get(form_data.username)
-    if not found:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect username"
-        )
-
     # Retrieve the reporter's information from the database
-    reporter = search_reporter_db(form_data.username)
+    reporter = await search_reporter_db(form_data.username)
 
     if not reporter:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect username"
         )
 
-    # Verify the provided password with the stored encrypted password
-    if not crypt.verify(form_data.password, reporter.password):
+    # Verify the provided password with the stored encrypted password, on the
+    # verification pool so the event loop keeps serving other requests
+    if not await verifier.verify(form_data.password, reporter.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect password"
         )
@@ -1,27 +1,70 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    status,
+)
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 from app.models.pagination import PaginationQueryParams
 
+from ..core import config
 from ..models.incident import (
+    BulkRes,
     Incident,
     IncidentBody,
+    IncidentChangesRes,
     IncidentDTO,
+    IncidentHistogramRes,
+    IncidentPatch,
     IncidentQueryParams,
+    IncidentRes,
     IncidentsRes,
+    IncidentStatsRes,
 )
 from ..models.reporter import Reporter
 from ..models.sort import SortQueryParams
-from ..utils.auth import current_user
+from ..store.backend import get_incident_repository, get_reporter_repository
+from ..store.base import IncidentRepository, ReporterRepository
+from ..utils.auth import current_user, websocket_user
+from ..utils.cache import get_fragment_cache
+from ..utils.etag import make_etag, not_modified
+from ..utils.feed import (
+    CREATED,
+    DELETED,
+    UPDATED,
+    IncidentBroadcaster,
+    get_broadcaster,
+    sse_events,
+    websocket_events,
+)
 from ..utils.incident import (
-    INCIDENTS_DB,
+    UploadStreamingResponse,
+    apply_known_reporters,
+    bulk_response,
+    check_bulk_size,
+    count_incidents_by_facet,
+    count_incidents_by_interval,
+    export_incidents,
+    import_incidents,
+    incident_response,
+    is_incident,
+    incidents_response,
     search_incident_by_query,
     search_incident_by_uuid,
+    sync_incidents,
 )
+from ..utils.reporter import check_reporter
 
 # Create a FastAPI router with a prefix for incident endpoints
 router = APIRouter(prefix="/incident", tags=["Incident"])
@@ -29,6 +72,7 @@ router = APIRouter(prefix="/incident", tags=["Incident"])
 
 @router.get("/all", response_model=IncidentsRes)
 async def get_incidents(
+    request: Request,
     q: Annotated[
         IncidentQueryParams, Depends(IncidentQueryParams)
     ],  # Query parameters for incidents
@@ -36,6 +80,12 @@ async def get_incidents(
         PaginationQueryParams, Depends(PaginationQueryParams)
     ],  # Pagination parameters
     sort: Annotated[SortQueryParams, Depends(SortQueryParams)],  # Sorting parameters
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
+    reporters_db: Annotated[
+        ReporterRepository, Depends(get_reporter_repository)
+    ],  # Reporter storage
     auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
 ):
     """
@@ -44,44 +94,416 @@ async def get_incidents(
     This endpoint returns all incidents, with optional filtering, pagination, and sorting.
     The response includes metadata for pagination, such as total count, skipped records,
     and limit on the returned data.
+
+    Incidents only reference their reporter by username; the reporters are joined
+    into the page when the response is built.
+
+    The response carries an ETag derived from the versions of the incidents and of
+    the reporters, and from the query parameters. If the client sends it back in
+    `If-None-Match` and no incident nor reporter has changed since, a 304 Not
+    Modified response is returned without searching.
+    """
+    versions = (await incidents_db.version(), await reporters_db.version())
+    etag = make_etag(versions, request)
+    if cached := not_modified(request, etag):
+        return cached  # The client's copy of the page is still current
+
+    incidents, next_cursor = await search_incident_by_query(
+        q, sort, pag
+    )  # Retrieve the page of incidents based on query parameters
+    total = await incidents_db.count()  # Total number of stored incidents
+
+    # Join the cached JSON of the incidents instead of validating the models
+    response = await incidents_response(
+        incidents,  # List of incidents
+        total=total,  # Total number of incidents
+        skip=pag.skip or 0,  # Number of skipped records
+        limit=pag.limit or total,  # Limit on the returned data
+        next_cursor=next_cursor,  # Cursor to resume after this page
+    )
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.get("/stats", response_model=IncidentStatsRes)
+async def get_incident_stats(
+    request: Request,
+    response: Response,
+    q: Annotated[
+        IncidentQueryParams, Depends(IncidentQueryParams)
+    ],  # Query parameters for incidents
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+):
+    """
+    Retrieve the number of incidents per severity level, status and reporter.
+
+    This endpoint accepts the same filters as `/incident/all`, so the counts of one
+    facet can be restricted by the others. The counts are maintained by the store on
+    every change; only title and description filters require counting incidents.
+    The response carries an ETag, like `/incident/all`.
+    """
+    etag = make_etag(await incidents_db.version(), request)
+    if cached := not_modified(request, etag):
+        return cached  # The client's copy of the counts is still current
+    response.headers["ETag"] = etag
+
+    return await count_incidents_by_facet(q)
+
+
+@router.get("/histogram", response_model=IncidentHistogramRes)
+async def get_incident_histogram(
+    request: Request,
+    response: Response,
+    q: Annotated[
+        IncidentQueryParams, Depends(IncidentQueryParams)
+    ],  # Query parameters for incidents
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+    interval: Annotated[
+        Literal["hour", "day"], Query()
+    ] = "day",  # Length of each bucket
+    field: Annotated[
+        Literal["date", "created_at", "updated_at"], Query()
+    ] = "date",  # Timestamp field the incidents are bucketed by
+):
+    """
+    Retrieve the number of incidents per hour or per day.
+
+    This endpoint accepts the same filters as `/incident/all`, including the time
+    windows, and returns the non-empty buckets in chronological order. Buckets are
+    counted from the time-ordered index of the bucketed field when it is the only
+    one filtered. The response carries an ETag, like `/incident/all`.
     """
-    incidents = search_incident_by_query(
-        q, sort
-    )  # Retrieve incidents based on query parameters
+    etag = make_etag(await incidents_db.version(), request)
+    if cached := not_modified(request, etag):
+        return cached  # The client's copy of the histogram is still current
+    response.headers["ETag"] = etag
 
-    # Apply pagination
-    if pag.skip:
-        incidents = incidents[pag.skip :]
-    if pag.limit:
-        incidents = incidents[: pag.limit]
+    return await count_incidents_by_interval(q, field, interval)
 
-    return {
-        "data": incidents,  # List of incidents
-        "total": len(INCIDENTS_DB),  # Total number of incidents
-        "skip": pag.skip or 0,  # Number of skipped records
-        "limit": pag.limit or len(INCIDENTS_DB),  # Limit on the returned data
-    }
 
+@router.get("/changes", response_model=IncidentChangesRes)
+async def get_incident_changes(
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+    since: Annotated[int, Query(ge=0)] = 0,  # Version the client is synced to
+    limit: Annotated[
+        int | None, Query(ge=1)
+    ] = None,  # Maximum number of changes to return
+    cursor: Annotated[
+        str | None, Query()
+    ] = None,  # Cursor resuming the sync after a page
+):
+    """
+    Retrieve the incidents created, updated or deleted since a version.
+
+    This endpoint lets clients keep a copy of the incidents in sync without
+    downloading all of them again. A first sync from version 0 returns every
+    incident; later syncs pass the `since` version of the previous response and
+    only get the changes made since: the incidents created or updated, as they
+    are now, and a tombstone for every incident deleted. Changes are returned in
+    the order they were made, at most `limit` at a time (and no more than the
+    `changes_page_size` setting), with a `next_cursor` to read the rest.
 
-@router.get("/{id}")
-async def get_incident(id: UUID, auth: Annotated[Reporter, Depends(current_user)]):
+    Tombstones are kept for the `tombstone_retention` setting. If a client syncs
+    from a version whose deletions were forgotten, a 410 Gone response tells it
+    to sync again from version 0; so does a restart of the memory engine.
+    """
+    limit = min(limit or settings.changes_page_size, settings.changes_page_size)
+    return await sync_incidents(since, cursor, limit)
+
+
+@router.get("/stream")
+async def stream_incidents(
+    q: Annotated[
+        IncidentQueryParams, Depends(IncidentQueryParams)
+    ],  # Query parameters for incidents
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    broadcaster: Annotated[
+        IncidentBroadcaster, Depends(get_broadcaster)
+    ],  # Live incident feed
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+):
+    """
+    Stream the changes to incidents as server-sent events.
+
+    This endpoint keeps the connection open and sends a `created`, `updated` or
+    `deleted` event, holding the incident, whenever an incident matching the same
+    filters as `/incident/all` is changed. Clients that fall too far behind get an
+    `overflow` event and are disconnected. A 503 status is returned when the
+    maximum number of subscribers is reached.
+    """
+    subscription = broadcaster.subscribe(q)
+    return StreamingResponse(
+        sse_events(subscription, settings.feed_keepalive),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream")
+async def stream_incidents_websocket(
+    websocket: WebSocket,
+    q: Annotated[
+        IncidentQueryParams, Depends(IncidentQueryParams)
+    ],  # Query parameters for incidents
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    broadcaster: Annotated[
+        IncidentBroadcaster, Depends(get_broadcaster)
+    ],  # Live incident feed
+):
+    """
+    Stream the changes to incidents over a WebSocket.
+
+    This endpoint sends the same events as the server-sent events stream, as JSON
+    text messages. The token is given in the `Authorization` header or the `token`
+    query parameter; the connection is closed with code 1008 if it is invalid, and
+    with code 1013 when the maximum number of subscribers is reached or the client
+    falls too far behind.
+    """
+    if await websocket_user(websocket) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        subscription = broadcaster.subscribe(q)
+    except HTTPException:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept()
+    await websocket_events(websocket, subscription, settings.feed_keepalive)
+
+
+# Media type of each export format
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/export")
+async def get_incidents_export(
+    q: Annotated[
+        IncidentQueryParams, Depends(IncidentQueryParams)
+    ],  # Query parameters for incidents
+    sort: Annotated[SortQueryParams, Depends(SortQueryParams)],  # Sorting parameters
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+    format: Annotated[Literal["ndjson", "csv"], Query()] = "ndjson",  # Export format
+):
+    """
+    Export the incidents matching the query parameters as NDJSON or CSV.
+
+    This endpoint accepts the same filtering and sorting parameters as `/incident/all`,
+    and streams every matching incident as a line of NDJSON or CSV. The export is read
+    and sent in chunks, so its memory use does not depend on the number of incidents.
+    """
+    return StreamingResponse(
+        export_incidents(q, sort, format, settings.export_chunk_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="incidents.{format}"'},
+    )
+
+
+@router.post("/import")
+async def import_incidents_ndjson(
+    request: Request,
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+):
+    """
+    Import incidents from an NDJSON request body.
+
+    This endpoint reads the body as a stream, one incident per line, and stores the
+    incidents in batches while the upload goes on. The response is a stream of NDJSON
+    events: `{"line", "error"}` for every line that could not be imported, `{"progress"}`
+    after every batch and a final `{"done"}` summary. Imported incidents appear in
+    listings and searches once the import is over.
+    """
+    return UploadStreamingResponse(
+        import_incidents(request, settings.import_batch_size),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/bulk", response_model=BulkRes)
+async def create_incidents(
+    body: Annotated[list[Incident], Body()],  # Incidents to create
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+):
+    """
+    Create a batch of incidents.
+
+    This endpoint takes a list of incidents, validated together, and adds them to the
+    database as a single batch. It returns the result of every item, in order, including
+    the UUID generated for each new incident, with a 422 status for incidents whose
+    reporter does not exist.
+    """
+    check_bulk_size(body, settings)
+
+    # The items are already validated, so the new incidents are built without
+    # validating them again
+    now = datetime.now()
+    new_incidents = [
+        IncidentDTO.model_construct(
+            id=uuid4(), created_at=now, updated_at=now, **dict(incident)
+        )
+        for incident in body
+    ]
+
+    # Incidents of unknown reporters are rejected, and the others added
+    results = await apply_known_reporters(
+        new_incidents, lambda incident: incident.reporter, incidents_db.add_many
+    )
+    await get_broadcaster().publish(CREATED, filter(is_incident, results))
+    return bulk_response(
+        [incident.id for incident in new_incidents],
+        results,
+        status.HTTP_409_CONFLICT,
+        "Incident already exists",
+    )
+
+
+@router.patch("/bulk", response_model=BulkRes)
+async def update_incidents(
+    body: Annotated[list[IncidentPatch], Body()],  # Updates to apply
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+):
+    """
+    Update a batch of incidents.
+
+    This endpoint takes a list of updates, each identifying an incident by its UUID, and
+    applies them as a single batch. Only the fields provided in an update are changed.
+    It returns the result of every item, in order, with a 404 status for unknown UUIDs
+    and a 422 status for updates to a reporter that does not exist.
+    """
+    check_bulk_size(body, settings)
+
+    # Collect the fields provided in every update
+    changes = [
+        (
+            patch.id,
+            {
+                field: value
+                for field, value in patch
+                if field != "id" and value is not None
+            },
+        )
+        for patch in body
+    ]
+
+    results = await apply_known_reporters(
+        changes, lambda change: change[1].get("reporter"), incidents_db.update_many
+    )
+    fragments = get_fragment_cache()
+    for patch in body:
+        fragments.invalidate(patch.id)  # Their cached JSON is now stale
+    await get_broadcaster().publish(UPDATED, filter(is_incident, results))
+    return bulk_response(
+        [patch.id for patch in body],
+        results,
+        status.HTTP_404_NOT_FOUND,
+        "Incident not found",
+    )
+
+
+@router.delete("/bulk", response_model=BulkRes)
+async def delete_incidents(
+    ids: Annotated[list[UUID], Body()],  # UUIDs of the incidents to delete
+    settings: Annotated[
+        config.Settings, Depends(config.get_settings)
+    ],  # Inject configuration settings
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+):
+    """
+    Delete a batch of incidents by their unique identifiers.
+
+    This endpoint takes a list of UUIDs and deletes the incidents as a single batch.
+    It returns the result of every item, in order, with a 404 status for unknown UUIDs.
+    """
+    check_bulk_size(ids, settings)
+
+    results = await incidents_db.remove_many(ids)
+    fragments = get_fragment_cache()
+    for id in ids:
+        fragments.invalidate(id)  # Drop their cached JSON
+    await get_broadcaster().publish(DELETED, filter(is_incident, results))
+    return bulk_response(ids, results, status.HTTP_404_NOT_FOUND, "Incident not found")
+
+
+@router.get("/{id}", response_model=IncidentRes)
+async def get_incident(
+    id: UUID,
+    request: Request,
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
+    reporters_db: Annotated[
+        ReporterRepository, Depends(get_reporter_repository)
+    ],  # Reporter storage
+    auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
+):
     """
     Retrieve a specific incident by its unique identifier.
 
     This endpoint returns an incident based on the provided UUID. If the incident is not found,
     it raises an HTTP 404 exception.
+
+    The response carries an ETag derived from the version of the incident and of the
+    reporters, one of which is joined into the incident. If the client sends it back in
+    `If-None-Match` and neither has changed since, a 304 Not Modified response is
+    returned.
     """
-    found = search_incident_by_uuid(id)  # Find the incident by its UUID
+    version = await incidents_db.version(id)
+    etag = None
+    if version is not None:
+        etag = make_etag((version, await reporters_db.version()))
+    if etag and (cached := not_modified(request, etag)):
+        return cached  # The client's copy of the incident is still current
+
+    found = await search_incident_by_uuid(id)  # Find the incident by its UUID
     if found is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found"
         )
-    return found  # Return the found incident
+
+    response = await incident_response(found)
+    if etag:
+        response.headers["ETag"] = etag
+    return response  # Return the found incident
 
 
-@router.post("/", response_model=IncidentDTO)
+@router.post("/", response_model=IncidentRes)
 async def create_incident(
     body: Annotated[IncidentBody, Depends(IncidentBody)],
+    incidents_db: Annotated[IncidentRepository, Depends(get_incident_repository)],
     auth: Annotated[Reporter, Depends(current_user)],
 ):
     """
@@ -89,8 +511,9 @@ async def create_incident(
 
     This endpoint allows you to create a new incident. It takes an `Incident` object as input
     and generates additional data, such as a unique identifier and timestamps, before adding
-    it to the database.
+    it to the database. The reporter is given by its username, and must exist.
     """
+    await check_reporter(body.reporter)
 
     # Create a new incident with the provided data
     new_incident = IncidentDTO(
@@ -100,50 +523,65 @@ async def create_incident(
         **jsonable_encoder(body)  # Convert the body to a dictionary
     )
 
-    INCIDENTS_DB.append(new_incident)  # Add the new incident to the database
+    await incidents_db.add(new_incident)  # Register the new incident in the store
 
-    return new_incident  # Return the created incident with additional data
+    response = await incident_response(new_incident)
+    await get_broadcaster().publish(CREATED, [new_incident])  # Notify the feed
+    return response  # Return the created incident with additional data
 
 
-@router.put("/{id}", response_model=IncidentDTO)
+@router.put("/{id}", response_model=IncidentRes)
 async def update_incident(
     id: UUID,
     body: Annotated[IncidentBody, Depends(IncidentBody)],  # Data to update the incident
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
     auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
 ):
     """
     Update an existing incident.
 
     This endpoint allows you to update an incident with new data. If the incident with the given
-    UUID doesn't exist, it raises an HTTP 404 exception.
+    UUID doesn't exist, it raises an HTTP 404 exception. A new reporter is given by its
+    username, and must exist.
     """
-    found = search_incident_by_uuid(id)  # Find the incident by its UUID
-    if found is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found"
-        )
+    await check_reporter(body.reporter)
 
-    # Update the incident with new data if provided
+    # Collect the fields provided in the request body
+    changes = {}
     if body.title is not None:
-        found.title = body.title
+        changes["title"] = body.title
     if body.description is not None:
-        found.description = body.description
+        changes["description"] = body.description
     if body.severity is not None:
-        found.severity = body.severity
+        changes["severity"] = body.severity
     if body.reporter is not None:
-        found.reporter = body.reporter
+        changes["reporter"] = body.reporter
     if body.status is not None:
-        found.status = body.status
+        changes["status"] = body.status
     if body.date is not None:
-        found.date = body.date
-    found.updated_at = datetime.now()  # Update the timestamp
+        changes["date"] = body.date
+
+    # Apply the changes through the store, which also refreshes the timestamp
+    found = await incidents_db.update(id, changes)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found"
+        )
+    get_fragment_cache().invalidate(id)  # Its cached JSON is now stale
 
-    return found  # Return the updated incident
+    response = await incident_response(found)
+    await get_broadcaster().publish(UPDATED, [found])  # Notify the feed
+    return response  # Return the updated incident
 
 
 @router.delete("/{id}")
 async def delete_incident(
     id: UUID,
+    incidents_db: Annotated[
+        IncidentRepository, Depends(get_incident_repository)
+    ],  # Incident storage
     auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
 ):
     """
@@ -152,10 +590,11 @@ async def delete_incident(
     This endpoint deletes an incident with the given UUID. If the incident doesn't exist,
     it raises an HTTP 404 exception.
     """
-    found = search_incident_by_uuid(id)  # Find the incident by its UUID
+    found = await incidents_db.remove(id)  # Remove the incident by its UUID
     if found is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found"
         )
-    INCIDENTS_DB.remove(found)  # Remove the found incident from the database
+    get_fragment_cache().invalidate(id)  # Drop its cached JSON
+    await get_broadcaster().publish(DELETED, [found])  # Notify the feed
     return {"message": "Incident deleted successfully"}  # Return success message
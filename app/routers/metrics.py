@@ -0,0 +1,88 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..store.backend import get_storage
+from ..store.base import Storage
+from ..utils.cache import get_fragment_cache, get_query_cache, get_token_cache
+from ..utils.feed import get_broadcaster
+from ..utils.metrics import CONTENT_TYPE, Metrics, get_metrics
+from ..utils.password import PasswordVerifier, get_password_verifier
+
+# Create a FastAPI router for the metrics endpoint
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics(
+    metrics: Annotated[Metrics, Depends(get_metrics)],  # Request metrics
+    storage: Annotated[Storage, Depends(get_storage)],  # Storage engine
+    verifier: Annotated[
+        PasswordVerifier, Depends(get_password_verifier)
+    ],  # Password verification pool
+):
+    """
+    Endpoint exposing the metrics of the application in Prometheus text format.
+
+    This endpoint returns the request counts and latency histograms of every
+    route, labelled with the route template rather than the requested path,
+    along with the number of stored incidents and reporters, the size and hit
+    ratio of the caches, the time taken by authentication, the state of the
+    password verification pool and the subscribers of the live incident feed. It
+    requires no authentication, so a Prometheus server can scrape it; the
+    metrics are those of the worker serving it.
+    """
+    lines = list(metrics.render())
+
+    lines.append("# HELP store_items Items held by the storage engine.")
+    lines.append("# TYPE store_items gauge")
+    lines.append(f'store_items{{kind="incidents"}} {await storage.incidents.count()}')
+    lines.append(f'store_items{{kind="reporters"}} {await storage.reporters.count()}')
+
+    caches = {
+        "query": get_query_cache().metrics(),
+        "fragment": get_fragment_cache().metrics(),
+        "token": get_token_cache().metrics(),
+    }
+    for name, key, kind, description in (
+        ("cache_entries", "size", "gauge", "Entries held by the cache."),
+        ("cache_capacity", "maxsize", "gauge", "Maximum entries of the cache."),
+        ("cache_hits_total", "hits", "counter", "Lookups answered by the cache."),
+        ("cache_misses_total", "misses", "counter", "Lookups missing the cache."),
+    ):
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for cache, values in caches.items():
+            lines.append(f'{name}{{cache="{cache}"}} {values[key]}')
+    lines.append("# HELP cache_hit_ratio Share of lookups answered by the cache.")
+    lines.append("# TYPE cache_hit_ratio gauge")
+    for cache, values in caches.items():
+        lookups = values["hits"] + values["misses"]
+        ratio = values["hits"] / lookups if lookups else 0.0
+        lines.append(f'cache_hit_ratio{{cache="{cache}"}} {ratio}')
+
+    pool = verifier.metrics()
+    for name, key, kind, description in (
+        ("password_workers", "workers", "gauge", "Password verification threads."),
+        ("password_running", "running", "gauge", "Verifications running."),
+        ("password_waiting", "waiting", "gauge", "Verifications waiting."),
+        ("password_completed_total", "completed", "counter", "Verifications done."),
+        ("password_rejected_total", "rejected", "counter", "Verifications refused."),
+    ):
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {pool[key]}")
+
+    feed = get_broadcaster().metrics()
+    for name, key, kind, description in (
+        ("feed_subscribers", "subscribers", "gauge", "Live feed subscribers."),
+        ("feed_events_total", "published", "counter", "Live feed events sent."),
+        ("feed_dropped_total", "dropped", "counter", "Slow subscribers dropped."),
+    ):
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {feed[key]}")
+
+    lines.append("")  # The exposition ends with a line feed
+    return PlainTextResponse("\n".join(lines), media_type=CONTENT_TYPE)
@@ -1,12 +1,25 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from app.models.pagination import PaginationQueryParams
 
-from ..models.reporter import Reporter, ReportersRes
-from ..utils.auth import current_user
-from ..utils.reporter import REPORTERS_DB
+from ..models.reporter import (
+    Reporter,
+    ReporterBody,
+    ReporterDTO,
+    ReporterQueryParams,
+    ReportersRes,
+)
+from ..store.backend import get_reporter_repository
+from ..store.base import ReporterRepository
+from ..utils.auth import admin_user, current_user
+from ..utils.etag import make_etag, not_modified
+from ..utils.reporter import (
+    list_reporters_db,
+    reporters_response,
+    update_reporter_db,
+)
 
 # Create a FastAPI router with a prefix for reporter-related endpoints
 router = APIRouter(prefix="/reporter", tags=["Reporter"])
@@ -14,29 +27,72 @@ router = APIRouter(prefix="/reporter", tags=["Reporter"])
 
 @router.get("/all", response_model=ReportersRes)
 async def get_reporters_all(
+    request: Request,
     pag: Annotated[
         PaginationQueryParams, Depends(PaginationQueryParams)
     ],  # Pagination parameters
+    q: Annotated[
+        ReporterQueryParams, Depends(ReporterQueryParams)
+    ],  # Query parameters for filtering
+    reporters_db: Annotated[
+        ReporterRepository, Depends(get_reporter_repository)
+    ],  # Reporter storage
     auth: Annotated[Reporter, Depends(current_user)],  # Current authenticated user
 ):
     """
     Retrieve all reporters with optional pagination.
 
     This endpoint returns a list of all reporters, with optional pagination
-    specified by 'skip' and 'limit'. It uses dependency injection to get pagination
-    parameters and the current authenticated user.
+    specified by 'skip' and 'limit', or resumed from a 'cursor'. Reporters can be
+    filtered by 'username', 'company', 'first_name' and 'last_name', which are
+    served by the reporter indexes of the storage engine. It uses dependency
+    injection to get pagination parameters and the current authenticated user.
+
+    The response carries an ETag derived from the version of the reporters and the
+    query parameters. If the client sends it back in `If-None-Match` and no reporter
+    has changed since, a 304 Not Modified response is returned.
     """
+    etag = make_etag(await reporters_db.version(), request)
+    if cached := not_modified(request, etag):
+        return cached  # The client's copy of the page is still current
+
+    # Retrieve the reporters for the requested page
+    reporters, next_cursor = await list_reporters_db(pag, q)
+    total = await reporters_db.count(q)  # Number of matching reporters
+
+    # Serialize the models held by the storage engine instead of validating them
+    response = reporters_response(
+        reporters,
+        total=total,
+        skip=pag.skip or 0,
+        limit=pag.limit or total,
+        next_cursor=next_cursor,
+    )
+    response.headers["ETag"] = etag
+    return response
 
-    # Retrieve all reporters from the database and apply pagination if needed
-    reporters = list(REPORTERS_DB.values())
-    if pag.skip:
-        reporters = reporters[pag.skip :]
-    if pag.limit:
-        reporters = reporters[: pag.limit]
-
-    return {
-        "data": reporters,
-        "total": len(REPORTERS_DB),
-        "skip": pag.skip or 0,
-        "limit": pag.limit or len(REPORTERS_DB),
-    }
+
+@router.put("/{username}", response_model=ReporterDTO)
+async def update_reporter(
+    username: str,  # Username of the reporter to update
+    body: Annotated[ReporterBody, Depends(ReporterBody)],  # Data to update the reporter
+    auth: Annotated[Reporter, Depends(admin_user)],  # Current administrator
+):
+    """
+    Update an existing reporter.
+
+    This endpoint allows administrators to change the details of a reporter, or
+    to disable or enable its account. Only the fields that are provided (and not
+    null) are changed. If the reporter with the given username does not exist,
+    it raises an HTTP 404 exception.
+
+    The tokens cached for the reporter are dropped, so the change applies to its
+    very next request: the requests of a disabled reporter are rejected at once.
+    """
+    changes = {field: value for field, value in vars(body).items() if value is not None}
+    reporter = await update_reporter_db(username, changes)
+    if reporter is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reporter not found"
+        )
+    return reporter
@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+from ..core import config
+from .base import IncidentRepository, ReporterRepository, Storage
+from .incident import IncidentStore
+from .journal import DurableMemoryStorage
+from .memory import MemoryStorage
+from .seed import get_seed
+from .sqlite import SQLiteStorage
+
+
+@lru_cache()  # A single storage engine is shared by the whole application
+def get_storage() -> Storage:
+    """
+    Create the storage engine selected by the `storage_backend` setting.
+
+    Every engine starts from the seed data, which is only read from the seed
+    snapshot when the engine needs it. The memory engine is loaded with the
+    seed incidents, and is made durable by a journal when `journal_dir` is set,
+    in which case the seed incidents are only read if the journal holds no data
+    yet. Likewise, the SQLite engine only reads them to fill a new database.
+    """
+    settings = config.get_settings()
+    seed = get_seed()
+    retention = settings.tombstone_retention  # Seconds deletions are remembered
+    if settings.storage_backend == "sqlite":
+        return SQLiteStorage(
+            settings.sqlite_path, settings.sqlite_pool_size, seed, retention
+        )
+    if settings.journal_dir:
+        return DurableMemoryStorage(
+            IncidentStore(tombstone_retention=retention),
+            seed.reporters(),
+            settings.journal_dir,
+            fsync=settings.journal_fsync,
+            fsync_interval=settings.journal_fsync_interval,
+            snapshot_interval=settings.snapshot_interval,
+            seed_incidents=seed.incidents,
+        )
+    return MemoryStorage(IncidentStore(seed.incidents(), retention), seed.reporters())
+
+
+def get_incident_repository() -> IncidentRepository:
+    """
+    Dependency returning the incident repository of the storage engine.
+    """
+    return get_storage().incidents
+
+
+def get_reporter_repository() -> ReporterRepository:
+    """
+    Dependency returning the reporter repository of the storage engine.
+    """
+    return get_storage().reporters
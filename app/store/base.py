@@ -0,0 +1,287 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from datetime import datetime
+from time import time_ns
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+from uuid import UUID
+
+from ..models.incident import IncidentDTO, IncidentQueryParams
+from ..models.reporter import ReporterDTO, ReporterQueryParams
+
+# Greatest integer JavaScript numbers hold exactly, which versions must not exceed
+# for browser clients to send back the versions they were given
+MAX_VERSION = 2**53 - 1
+
+
+def initial_version() -> int:
+    """
+    Return the version a new store or database starts from.
+
+    Versions start from the current time in microseconds, so they keep
+    increasing across restarts of the application, while staying below
+    `MAX_VERSION` for centuries.
+    """
+    return time_ns() // 1000
+
+
+class IncidentRepository(ABC):
+    """
+    Storage interface for incidents.
+
+    Routers and utilities only talk to incidents through this interface, so the
+    storage engine can be swapped through the application settings. Every method
+    is asynchronous, which lets backends doing I/O run it off the event loop.
+    """
+
+    @abstractmethod
+    async def get(self, id: UUID) -> IncidentDTO | None:
+        """
+        Return the incident with the given UUID, or `None` if it does not exist.
+        """
+
+    @abstractmethod
+    async def add(self, incident: IncidentDTO) -> IncidentDTO:
+        """
+        Store a new incident and return it.
+        """
+
+    @abstractmethod
+    async def update(self, id: UUID, changes: dict[str, Any]) -> IncidentDTO | None:
+        """
+        Apply field changes to an incident and refresh its `updated_at`.
+
+        Returns the updated incident, or `None` if no incident has the given UUID.
+        """
+
+    @abstractmethod
+    async def remove(self, id: UUID) -> IncidentDTO | None:
+        """
+        Remove an incident and return it, or `None` if it does not exist.
+        """
+
+    async def add_many(self, incidents: list[IncidentDTO]) -> list[IncidentDTO | None]:
+        """
+        Store a batch of new incidents.
+
+        Returns the stored incidents in order, with `None` in place of incidents
+        whose UUID already exists. Backends override this to apply the batch at
+        once; the default adds the incidents one by one.
+        """
+        results = []
+        for incident in incidents:
+            try:
+                results.append(await self.add(incident))
+            except KeyError:
+                results.append(None)
+        return results
+
+    @asynccontextmanager
+    async def bulk_load(
+        self,
+    ) -> AsyncIterator[Callable[[list[IncidentDTO]], Awaitable[list]]]:
+        """
+        Open a bulk load, used to import a large number of incidents in batches.
+
+        The context yields an asynchronous function storing a batch of new
+        incidents, with the same results as `add_many`. Backends may defer the
+        maintenance of their indexes until the context exits, so incidents
+        loaded this way might only appear in searches once the load is over.
+        The default simply adds every batch with `add_many`.
+        """
+        yield self.add_many
+
+    async def update_many(
+        self, changes: list[tuple[UUID, dict[str, Any]]]
+    ) -> list[IncidentDTO | None]:
+        """
+        Apply a batch of `(id, changes)` updates and refresh their `updated_at`.
+
+        Returns the updated incidents in order, with `None` in place of updates
+        targeting a UUID that does not exist. Backends override this to apply
+        the batch at once; the default updates the incidents one by one.
+        """
+        return [await self.update(id, fields) for id, fields in changes]
+
+    async def remove_many(self, ids: list[UUID]) -> list[IncidentDTO | None]:
+        """
+        Remove a batch of incidents.
+
+        Returns the removed incidents in order, with `None` in place of UUIDs
+        that do not exist. Backends override this to apply the batch at once;
+        the default removes the incidents one by one.
+        """
+        return [await self.remove(id) for id in ids]
+
+    @abstractmethod
+    async def count(self) -> int:
+        """
+        Return the total number of stored incidents.
+        """
+
+    @abstractmethod
+    async def facets(self, q: IncidentQueryParams) -> list[tuple[str, str, str, int]]:
+        """
+        Count the incidents matching the query parameters by facet.
+
+        Returns `(severity, status, reporter username, count)` for every
+        combination of the three facets with at least one matching incident.
+        """
+
+    @abstractmethod
+    async def histogram(
+        self, q: IncidentQueryParams, field: str, interval: str
+    ) -> list[tuple[datetime, int]]:
+        """
+        Count the incidents matching the query parameters by interval of time.
+
+        Incidents are bucketed by the timestamp `field` (`date`, `created_at` or
+        `updated_at`) into intervals of an `hour` or a `day`. Returns
+        `(bucket start, count)` for every non-empty bucket, in chronological order.
+        """
+
+    @abstractmethod
+    async def version(self, id: UUID | None = None) -> int | None:
+        """
+        Return a version number that increases whenever incidents change.
+
+        Without a UUID, this is the version of the whole repository, which
+        changes with every added, updated or removed incident. With a UUID, it
+        is the version of that incident, or `None` if the incident does not
+        exist.
+        """
+
+    @abstractmethod
+    async def changes(
+        self, after: tuple[int, UUID], limit: int, since: int = 0
+    ) -> tuple[int, list[tuple[int, IncidentDTO]], list[tuple[int, UUID, datetime]]]:
+        """
+        Return the incidents changed or deleted after a `(version, id)` position.
+
+        Changes are ordered by the version they were made at, then by UUID. The
+        first item is the tombstone horizon: the highest version whose
+        deletions may have been forgotten, so the changes since an older
+        version are incomplete. It is followed by the first `limit` incidents
+        changed after the position, as `(version, incident)`, and the first
+        `limit` tombstones of incidents deleted after the position and after
+        version `since`, as `(version, id, deleted_at)`.
+        """
+
+    @abstractmethod
+    async def search(
+        self,
+        q: IncidentQueryParams,
+        sort_by: str,
+        reverse: bool,
+        after: tuple | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[IncidentDTO]:
+        """
+        Return a page of the incidents matching the query parameters.
+
+        Incidents are ordered by `(sort key, id)`, ascending or descending. If a
+        `(key, id)` position is given in `after`, the page starts right after it,
+        then `skip` matching incidents are skipped and at most `limit` returned.
+        """
+
+
+class ReporterRepository(ABC):
+    """
+    Storage interface for reporters.
+
+    Reporters are returned as dictionaries holding the fields of `ReporterDTO`,
+    which is the format of the seed reporters they are loaded from, except by
+    `get_model` and `search`, which return `ReporterDTO` models.
+    """
+
+    @abstractmethod
+    async def get(self, username: str) -> dict | None:
+        """
+        Return the reporter with the given username, or `None` if it does not exist.
+        """
+
+    async def get_model(self, username: str) -> ReporterDTO | None:
+        """
+        Return the `ReporterDTO` of a reporter, or `None` if it does not exist.
+
+        Backends keeping a model of every reporter override this to return it
+        instead of building a new one; the default builds it from `get`.
+        """
+        reporter = await self.get(username)
+        if reporter is not None:
+            return ReporterDTO(**reporter)
+
+    @abstractmethod
+    async def get_many(self, usernames: Iterable[str]) -> dict[str, dict]:
+        """
+        Return the reporters with the given usernames, keyed by username.
+
+        Usernames that do not exist are left out. This is how incidents, which
+        only reference their reporter, are joined with their reporters.
+        """
+
+    @abstractmethod
+    async def update(self, username: str, changes: dict[str, Any]) -> dict | None:
+        """
+        Apply field changes to a reporter and refresh its `updated_at`.
+
+        The username identifies the reporter and cannot be changed. Returns the
+        updated reporter, or `None` if no reporter has the given username.
+        """
+
+    @abstractmethod
+    async def count(self, q: ReporterQueryParams | None = None) -> int:
+        """
+        Return the number of stored reporters matching the query parameters.
+
+        Without query parameters, this is the total number of stored reporters.
+        """
+
+    @abstractmethod
+    async def version(self) -> int:
+        """
+        Return a version number that increases whenever a reporter changes.
+        """
+
+    @abstractmethod
+    async def search(
+        self,
+        q: ReporterQueryParams | None = None,
+        after: str | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[ReporterDTO]:
+        """
+        Return a page of the reporters matching the query parameters.
+
+        Reporters are returned as `ReporterDTO` models, in listing order. The
+        username filter matches exactly, the company filter matches the whole
+        company regardless of case, and the first and last name filters match
+        the start of the first word of the name, or of a following word. If the
+        username of a reporter is given in `after`, the page starts right after
+        that reporter. Raises a `KeyError` if that reporter does not exist.
+        """
+
+
+class Storage:
+    """
+    Storage engine holding the incident and reporter repositories.
+
+    The engine is opened when the application starts and closed on shutdown.
+    Backends that hold resources, such as database connections, override these
+    hooks; the defaults do nothing.
+    """
+
+    def __init__(self, incidents: IncidentRepository, reporters: ReporterRepository):
+        self.incidents = incidents  # Repository of incidents
+        self.reporters = reporters  # Repository of reporters
+
+    async def open(self) -> None:
+        """
+        Prepare the storage engine for use.
+        """
+
+    async def close(self) -> None:
+        """
+        Release the resources held by the storage engine.
+        """
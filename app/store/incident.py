@@ -0,0 +1,743 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Iterable, Iterator
+from uuid import UUID
+
+from ..models.incident import IncidentDTO, IncidentQueryParams
+from .base import initial_version
+from .indexes import MAX_ID, SortIndex, TrigramIndex
+from .tombstones import TombstoneLog
+from .records import (
+    MICROSECOND,
+    SEVERITIES,
+    SEVERITY_CODES,
+    SEVERITY_VALUES,
+    STATUS_CODES,
+    STATUS_VALUES,
+    STATUSES,
+    IncidentRecord,
+    from_microseconds,
+    to_microseconds,
+)
+
+# Fields incidents can be sorted by, mapped to the sort key of an incident model.
+# The store sorts its records by equivalent keys, see `IncidentStore._keys`
+SORT_KEYS = {
+    "title": lambda incident: incident.title,
+    "reporter": lambda incident: incident.reporter,
+    "severity": lambda incident: incident.severity.value,
+    "date": lambda incident: incident.date,
+    "created_at": lambda incident: incident.created_at,
+    "updated_at": lambda incident: incident.updated_at,
+}
+
+# Text fields covered by the trigram index for substring searches
+TEXT_FIELDS = ("title", "description")
+
+# Timestamp fields that can be filtered by time window and bucketed in histograms
+RANGE_FIELDS = ("date", "created_at", "updated_at")
+
+# Histogram intervals, mapped to the width of a bucket in microseconds. Stored
+# timestamps count from a midnight in local time, so buckets start on the hour
+HISTOGRAM_INTERVALS = {
+    "hour": timedelta(hours=1) // MICROSECOND,
+    "day": timedelta(days=1) // MICROSECOND,
+}
+
+# Candidate sets smaller than this fraction of the store are sorted directly
+# instead of being matched against a walk of the whole sort index
+SUBSET_SORT_RATIO = 0.1
+
+
+def _intersect(ids: set[int] | None, other: set[int] | None):
+    """
+    Intersect two optional sets of integer ids, where `None` means "any id".
+    """
+    if ids is None:
+        return other
+    if other is None:
+        return ids
+    return ids & other
+
+
+def _bounds(low: datetime | None, high: datetime | None) -> tuple:
+    """
+    Convert the optional bounds of a time window into microseconds.
+    """
+    return (
+        None if low is None else to_microseconds(low),
+        None if high is None else to_microseconds(high),
+    )
+
+
+class IncidentStore:
+    """
+    In-memory store for incidents.
+
+    Incidents are kept as compact `IncidentRecord`s in a dictionary keyed by the
+    integer value of their UUID. Python dictionaries preserve insertion order,
+    so the same structure provides the ordered storage used for listings and
+    constant time lookups, updates and deletes by id.
+
+    Records refer to the username of their reporter by its position in a table
+    of usernames, where every username is only stored once. `IncidentDTO`
+    models are only built from the records handed out by the store, see
+    `materialize`, so the memory taken by an incident is little more than its
+    text.
+
+    A sort index is maintained for every field in `SORT_KEYS`, so listings can
+    be read in sorted order without sorting the whole table on each request,
+    and a trigram index for every field in `TEXT_FIELDS` narrows substring
+    searches down to a set of candidates.
+
+    The sort indexes of the timestamp fields in `RANGE_FIELDS` also serve time
+    window filters and histograms, whose bounds are found by binary search.
+
+    The number of incidents for every combination of severity, status and
+    reporter is kept up to date on every change, so facet counts never need a
+    scan of the incidents.
+
+    Every change increments the version of the store, and records it as the
+    version of the changed incident. Versions start from the current time in
+    microseconds, see `initial_version`, so they keep increasing across
+    restarts of the application.
+    A sort index on the version orders incidents by their last change, and
+    deleted incidents leave a tombstone in a `TombstoneLog`, kept for
+    `tombstone_retention` seconds if given, so the changes since a version are
+    read without scanning the store, see `changes`.
+    """
+
+    def __init__(
+        self,
+        incidents: Iterable[IncidentDTO] = (),
+        tombstone_retention: float | None = None,
+    ):
+        self._records: dict[int, IncidentRecord] = {}  # Primary key index
+        self._reporters: list[str] = []  # Usernames referenced by records
+        self._reporter_ids: dict[str, int] = {}  # Position of every username
+        self._keys = {
+            "title": attrgetter("title"),
+            "reporter": lambda record: self._reporters[record.reporter],
+            "severity": lambda record: SEVERITY_VALUES[record.severity],
+            "date": attrgetter("date"),
+            "created_at": attrgetter("created_at"),
+            "updated_at": attrgetter("updated_at"),
+        }  # Sort key of a record for every field in `SORT_KEYS`
+        self._sort_indexes = {
+            field: SortIndex(key) for field, key in self._keys.items()
+        }  # Secondary indexes used for sorted listings
+        self._text_indexes = {
+            field: TrigramIndex(attrgetter(field)) for field in TEXT_FIELDS
+        }  # Inverted indexes used for substring searches
+        self._versions = SortIndex(attrgetter("version"))  # Order of the changes
+        self.tombstones = TombstoneLog(
+            None
+            if tombstone_retention is None
+            else int(tombstone_retention * 1_000_000)
+        )  # Incidents deleted recently, in microseconds
+        self.version = initial_version()  # Version of the whole store
+        self._facets: Counter[tuple[int, int, int]] = Counter()  # Joint counts
+        self.load(incidents)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[IncidentDTO]:
+        return map(self.materialize, self._records.values())
+
+    def __contains__(self, id: UUID) -> bool:
+        return id.int in self._records
+
+    def get(self, id: UUID) -> IncidentDTO | None:
+        """
+        Return the incident with the given UUID, or `None` if it does not exist.
+        """
+        record = self._records.get(id.int)
+        return self.materialize(record) if record is not None else None
+
+    def version_of(self, id: UUID) -> int | None:
+        """
+        Return the version of an incident, or `None` if it does not exist.
+        """
+        record = self._records.get(id.int)
+        return record.version if record is not None else None
+
+    def records(self) -> list[IncidentRecord]:
+        """
+        Return the records of the stored incidents, in insertion order.
+
+        Records are never changed once stored, so the list stays a consistent
+        view of the store while it keeps changing.
+        """
+        return list(self._records.values())
+
+    def materialize(self, record: IncidentRecord) -> IncidentDTO:
+        """
+        Build the `IncidentDTO` of a record.
+
+        The model is built without validation, as records only hold values that
+        were valid when they were stored.
+        """
+        return IncidentDTO.model_construct(
+            id=UUID(int=record.id),
+            title=record.title,
+            description=record.description,
+            severity=SEVERITIES[record.severity],
+            reporter=self._reporters[record.reporter],
+            status=STATUSES[record.status],
+            date=from_microseconds(record.date),
+            created_at=from_microseconds(record.created_at),
+            updated_at=from_microseconds(record.updated_at),
+        )
+
+    def _reporter_id(self, username: str) -> int:
+        """
+        Return the position of a reporter's username in the table, adding it if
+        needed.
+
+        Usernames are never removed from the table, which only grows with the
+        number of distinct reporters.
+        """
+        id = self._reporter_ids.get(username)
+        if id is None:
+            id = self._reporter_ids[username] = len(self._reporters)
+            self._reporters.append(username)
+        return id
+
+    def _encode(self, incident: IncidentDTO, version: int) -> IncidentRecord:
+        """
+        Build the record of an incident changed at the given version.
+        """
+        return IncidentRecord(
+            incident.id.int,
+            incident.title,
+            incident.description,
+            SEVERITY_CODES[incident.severity],
+            STATUS_CODES[incident.status],
+            self._reporter_id(incident.reporter),
+            to_microseconds(incident.date),
+            to_microseconds(incident.created_at),
+            to_microseconds(incident.updated_at),
+            version,
+        )
+
+    def _changed(
+        self, record: IncidentRecord, changes: dict[str, Any], now: int, version: int
+    ) -> IncidentRecord:
+        """
+        Return a copy of a record with field changes applied, updated at `now`
+        and at the given version.
+        """
+        record = record.copy()
+        for field, value in changes.items():
+            if field == "severity":
+                value = SEVERITY_CODES[value]
+            elif field == "status":
+                value = STATUS_CODES[value]
+            elif field == "reporter":
+                value = self._reporter_id(value)
+            elif field in RANGE_FIELDS:
+                value = to_microseconds(value)
+            setattr(record, field, value)
+        record.updated_at = now  # Update the timestamp
+        record.version = version
+        return record
+
+    def _matching_reporters(self, needle: str) -> set[int]:
+        """
+        Return the positions of the reporters whose username contains `needle`.
+
+        The table holds every username once, so it is scanned instead of the
+        incidents.
+        """
+        needle = needle.lower()
+        return {
+            id
+            for id, username in enumerate(self._reporters)
+            if needle in username.lower()
+        }
+
+    def _count(self, record: IncidentRecord, delta: int) -> None:
+        """
+        Add `delta` to the facet count of a record's severity, status and reporter.
+        """
+        key = (record.severity, record.status, record.reporter)
+        count = self._facets[key] + delta
+        if count:
+            self._facets[key] = count
+        else:
+            del self._facets[key]
+
+    def _bump(self) -> int:
+        """
+        Increment the version of the store and return it.
+        """
+        self.version += 1
+        return self.version
+
+    def load(self, incidents: Iterable[IncidentDTO]) -> None:
+        """
+        Replace the content of the store with the given incidents.
+
+        The incidents are converted into records as they are read, so a lazy
+        iterable is never held in memory as models. The indexes are rebuilt
+        once all incidents are loaded, instead of being updated incident by
+        incident, which keeps large loads fast.
+        """
+        self._reporters = []
+        self._reporter_ids = {}
+        version = self._bump()
+        self._records = {
+            incident.id.int: self._encode(incident, version) for incident in incidents
+        }
+        self._facets = Counter(
+            (record.severity, record.status, record.reporter)
+            for record in self._records.values()
+        )
+        for index in self._indexes():
+            index.rebuild(self._records.values())
+        self.tombstones.reset(version)  # Deletions from the previous content are lost
+
+    def add(self, incident: IncidentDTO) -> IncidentDTO:
+        """
+        Register a new incident in the store and return it.
+
+        Raises a `KeyError` if an incident with the same UUID is already stored.
+        """
+        if incident.id.int in self._records:
+            raise KeyError(f"Incident {incident.id} already exists")
+        record = self._records[incident.id.int] = self._encode(incident, self._bump())
+        self._count(record, 1)
+        for index in self._indexes():
+            index.insert(record)
+        return incident
+
+    def add_many(self, incidents: Iterable[IncidentDTO]) -> list[IncidentDTO | None]:
+        """
+        Register a batch of new incidents in the store.
+
+        The indexes are maintained with one pass per index for the whole batch.
+        Returns the stored incidents in order, with `None` in place of incidents
+        whose UUID is already stored (or repeated in the batch).
+        """
+        results: list[IncidentDTO | None] = []
+        added = []
+        version = self._bump()  # The whole batch is a single change
+        for incident in incidents:
+            if incident.id.int in self._records:
+                results.append(None)
+                continue
+            record = self._records[incident.id.int] = self._encode(incident, version)
+            self._count(record, 1)
+            added.append(record)
+            results.append(incident)
+
+        for index in self._indexes():
+            index.insert_many(added)
+        return results
+
+    def stage(self, incidents: Iterable[IncidentDTO]) -> list[IncidentDTO | None]:
+        """
+        Register a batch of new incidents without updating the indexes.
+
+        This is meant for large imports: staged incidents can be read by UUID
+        right away, but only appear in listings and searches once `reindex` has
+        rebuilt the indexes. Returns the stored incidents in order, with `None`
+        in place of incidents whose UUID is already stored.
+
+        The version index is the exception: the batch is appended to it, so
+        staged incidents are part of the changes from the start.
+        """
+        results: list[IncidentDTO | None] = []
+        added = []
+        version = self._bump()  # The whole batch is a single change
+        for incident in incidents:
+            if incident.id.int in self._records:
+                results.append(None)
+                continue
+            record = self._records[incident.id.int] = self._encode(incident, version)
+            self._count(record, 1)
+            added.append(record)
+            results.append(incident)
+        self._versions.insert_many(added)  # Newer than every indexed version
+        return results
+
+    def reindex(self) -> None:
+        """
+        Rebuild every index from the stored incidents.
+        """
+        self._bump()  # Staged incidents become visible to searches
+        for index in self._indexes():
+            index.rebuild(self._records.values())
+
+    def put(self, incident: IncidentDTO) -> IncidentDTO:
+        """
+        Store an incident as is, replacing any incident with the same UUID.
+        """
+        self.remove(incident.id)
+        return self.add(incident)
+
+    def update(self, id: UUID, changes: dict[str, Any]) -> IncidentDTO | None:
+        """
+        Apply the given field changes to an incident and refresh its `updated_at`.
+
+        Returns the updated incident, or `None` if no incident has the given UUID.
+        """
+        record = self._records.get(id.int)
+        if record is None:
+            return None
+
+        # Only the indexes whose key depends on a changed field need updating
+        stale = [
+            index
+            for field, index in self._sort_indexes.items()
+            if field in changes or field == "updated_at"
+        ]
+        stale += [
+            index for field, index in self._text_indexes.items() if field in changes
+        ]
+        stale.append(self._versions)
+        for index in stale:
+            index.remove(record)
+
+        self._count(record, -1)
+        now = to_microseconds(datetime.now())
+        record = self._changed(record, changes, now, self._bump())
+        self._records[record.id] = record
+        self._count(record, 1)
+
+        for index in stale:
+            index.insert(record)
+        return self.materialize(record)
+
+    def update_many(
+        self, changes: Iterable[tuple[UUID, dict[str, Any]]]
+    ) -> list[IncidentDTO | None]:
+        """
+        Apply a batch of `(id, changes)` updates and refresh their `updated_at`.
+
+        The indexes are maintained with one pass per index for the whole batch.
+        Returns the updated incidents in order, with `None` in place of updates
+        targeting a UUID that is not stored.
+        """
+        changes = list(changes)
+        updated: dict[int, IncidentRecord] = {}  # Records changed by the batch
+        fields: set[str] = {"updated_at"}  # Fields changed by the batch
+        for id, incident_changes in changes:
+            if id.int in self._records:
+                updated[id.int] = self._records[id.int]
+                fields.update(incident_changes)
+
+        # Only the indexes whose key depends on a changed field need updating
+        stale = [
+            index for field, index in self._sort_indexes.items() if field in fields
+        ]
+        stale += [
+            index for field, index in self._text_indexes.items() if field in fields
+        ]
+        stale.append(self._versions)
+        for index in stale:
+            index.remove_many(updated.values())
+
+        results: list[IncidentDTO | None] = []
+        version = self._bump()  # The whole batch is a single change
+        now = to_microseconds(datetime.now())
+        for id, incident_changes in changes:
+            record = updated.get(id.int)
+            if record is None:
+                results.append(None)
+                continue
+            self._count(record, -1)
+            record = self._changed(record, incident_changes, now, version)
+            self._records[record.id] = updated[record.id] = record
+            self._count(record, 1)
+            results.append(self.materialize(record))
+
+        for index in stale:
+            index.insert_many(updated.values())
+        return results
+
+    def remove(self, id: UUID) -> IncidentDTO | None:
+        """
+        Remove an incident from the store.
+
+        Returns the removed incident, or `None` if no incident has the given UUID.
+        """
+        record = self._records.pop(id.int, None)
+        if record is None:
+            return None
+        version = self._bump()
+        self._count(record, -1)
+        for index in self._indexes():
+            index.remove(record)
+        self.tombstones.add([record.id], version, to_microseconds(datetime.now()))
+        return self.materialize(record)
+
+    def remove_many(self, ids: Iterable[UUID]) -> list[IncidentDTO | None]:
+        """
+        Remove a batch of incidents from the store.
+
+        The indexes are maintained with one pass per index for the whole batch.
+        Returns the removed incidents in order, with `None` in place of UUIDs
+        that are not stored (or repeated in the batch).
+        """
+        records = [self._records.pop(id.int, None) for id in ids]
+        removed = [record for record in records if record is not None]
+        for record in removed:
+            self._count(record, -1)
+        version = self._bump()  # The whole batch is a single change
+
+        for index in self._indexes():
+            index.remove_many(removed)
+        if removed:
+            self.tombstones.add(
+                (record.id for record in removed),
+                version,
+                to_microseconds(datetime.now()),
+            )
+        return [self.materialize(record) if record else None for record in records]
+
+    def facets(self, q: IncidentQueryParams) -> list[tuple[str, str, str, int]]:
+        """
+        Count the incidents matching the query parameters by severity, status
+        and reporter.
+
+        Returns `(severity, status, reporter username, count)` for every
+        combination with matching incidents. Severity, status and reporter
+        filters are answered from the maintained counts, without reading any
+        incident; only substring filters on the title or description require
+        counting the matching incidents, as do time windows.
+        """
+        if q.q or q.title or q.description or q.ranges():
+            counts = Counter(
+                (record.severity, record.status, record.reporter)
+                for record in self.search(q, "created_at")
+            )
+        else:
+            severity = SEVERITY_CODES[q.severity] if q.severity else None
+            status = STATUS_CODES[q.status] if q.status else None
+            reporters = self._matching_reporters(q.reporter) if q.reporter else None
+            counts = {
+                key: count
+                for key, count in self._facets.items()
+                if (severity is None or key[0] == severity)
+                and (status is None or key[1] == status)
+                and (reporters is None or key[2] in reporters)
+            }
+
+        return [
+            (
+                SEVERITY_VALUES[severity],
+                STATUS_VALUES[status],
+                self._reporters[reporter],
+                count,
+            )
+            for (severity, status, reporter), count in counts.items()
+        ]
+
+    def histogram(
+        self, q: IncidentQueryParams, field: str, interval: str
+    ) -> list[tuple[datetime, int]]:
+        """
+        Count the incidents matching the query parameters by interval of time.
+
+        Incidents are bucketed by one of the `RANGE_FIELDS`, with one of the
+        `HISTOGRAM_INTERVALS`. Returns `(bucket start, count)` for every
+        non-empty bucket in chronological order. Without other filters than a
+        time window on the bucketed field, the buckets are counted on its sort
+        index by binary search, without reading any incident.
+        """
+        width = HISTOGRAM_INTERVALS[interval]
+        ranges = q.ranges()
+        low, high = _bounds(*ranges.pop(field, (None, None)))
+        if ranges or any(
+            (q.q, q.title, q.description, q.severity, q.reporter, q.status)
+        ):
+            values = map(self._keys[field], self.search(q, field))
+            buckets = sorted(Counter(value - value % width for value in values).items())
+        else:
+            buckets = self._sort_indexes[field].buckets(
+                lambda value: value - value % width, width, low, high
+            )
+        return [(from_microseconds(start), count) for start, count in buckets]
+
+    def _indexes(self):
+        """
+        Return every secondary index maintained by the store.
+        """
+        return [
+            *self._sort_indexes.values(),
+            *self._text_indexes.values(),
+            self._versions,
+        ]
+
+    def changes(
+        self, after: tuple[int, int], limit: int, since: int = 0
+    ) -> tuple[list[IncidentRecord], list[tuple[int, int, int]]]:
+        """
+        Return the changes following a `(version, id)` position, in order.
+
+        Changes are the records of the incidents last changed after the
+        position, and the tombstones of the incidents deleted after it and
+        after version `since`, at most `limit` of each. Both are read from
+        ordered structures by binary search, so the cost depends on the
+        number of changes returned rather than on the size of the store.
+        """
+        ids = islice(self._versions.ids(after=after), limit)
+        records = [self._records[id] for id in ids]
+        tombstones = self.tombstones.after(max(after, (since, MAX_ID - 1)), limit)
+        return records, tombstones
+
+    def search_text(self, field: str, needle: str) -> set[int] | None:
+        """
+        Return the integer ids of the incidents whose `field` may contain `needle`.
+
+        The result is a superset of the matches computed from the trigram index,
+        or `None` if the needle is too short for the index to narrow the search.
+        """
+        return self._text_indexes[field].candidates(needle)
+
+    def sorted(
+        self,
+        sort_by: str,
+        reverse: bool = False,
+        after: tuple | None = None,
+        ids: set[int] | None = None,
+        bounds: tuple | None = None,
+    ) -> Iterator[IncidentRecord]:
+        """
+        Iterate over the records ordered by one of the fields in `SORT_KEYS`.
+
+        Records are read lazily from the sort index, so consumers that only
+        need the first few rows never walk the rest of the table. An optional
+        `(key, id)` position, in terms of record keys and integer ids, resumes
+        the iteration right after that entry.
+
+        If a set of integer `ids` (see `UUID.int`) is given, only those incidents
+        are returned. Small sets are sorted directly rather than matched against
+        a walk of the index. Optional `(low, high)` bounds restrict the walk of
+        the index to the keys between them.
+        """
+        records = self._records
+
+        if ids is not None and len(ids) < len(records) * SUBSET_SORT_RATIO:
+            key = self._keys[sort_by]
+            found = (records.get(id) for id in ids)
+            entries = sorted((key(record), record.id) for record in found if record)
+            if reverse:
+                entries.reverse()
+            for entry in entries:
+                if after is not None and (
+                    entry >= after if reverse else entry <= after
+                ):
+                    continue  # Skip the entries up to the cursor position
+                yield records[entry[1]]
+            return
+
+        for id in self._sort_indexes[sort_by].ids(reverse, after, *(bounds or ())):
+            if ids is None or id in ids:
+                yield records[id]
+
+    def search(
+        self,
+        q: IncidentQueryParams,
+        sort_by: str,
+        reverse: bool = False,
+        after: tuple | None = None,
+    ) -> Iterator[IncidentRecord]:
+        """
+        Iterate over the records matching the query parameters in sorted order.
+
+        An optional `(key, id)` position, with the key of `SORT_KEYS` and the
+        UUID of an incident, resumes the iteration right after that incident.
+        The records are yielded as they are, see `materialize`.
+
+        Substring filters are first narrowed down through the trigram indexes.
+        The indexes only return candidates, so every filter is still checked on
+        the records read from the sort index.
+
+        A time window on the sort field bounds the walk of the sort index, and
+        a narrow one on another timestamp field is turned into candidates from
+        that field's sort index. The reporter filter is resolved on the table
+        of usernames, then on the reporter sort index in the same way.
+        """
+        filters = []  # Predicates a record must satisfy to be returned
+        candidates = None  # Incident ids narrowed down by the indexes
+        bounds = None  # Range of sort keys to walk
+
+        if after is not None:
+            key, id = after
+            if sort_by in RANGE_FIELDS:
+                key = to_microseconds(key)
+            after = (key, id.int)  # Position in terms of the record keys
+
+        for field, needle in (("title", q.title), ("description", q.description)):
+            if needle:
+                needle = needle.lower()
+                filters.append(
+                    lambda record, field=field, needle=needle: needle
+                    in getattr(record, field).lower()
+                )
+                candidates = _intersect(candidates, self.search_text(field, needle))
+
+        if q.q:
+            text = q.q.lower()
+            filters.append(
+                lambda record: text in record.title.lower()
+                or text in record.description.lower()
+            )
+            title_ids = self.search_text("title", text)
+            description_ids = self.search_text("description", text)
+            if title_ids is not None and description_ids is not None:
+                candidates = _intersect(candidates, title_ids | description_ids)
+
+        if q.reporter:
+            reporters = self._matching_reporters(q.reporter)
+            filters.append(lambda record: record.reporter in reporters)
+            # The incidents of a reporter are contiguous in the reporter sort
+            # index: it is walked between the matching usernames when sorting by
+            # reporter, and the incidents of few reporters become candidates
+            usernames = sorted(self._reporters[id] for id in reporters)
+            index = self._sort_indexes["reporter"]
+            spans = [index.span(name, name) for name in usernames]
+            reported = sum(stop - start for start, stop in spans)  # Their incidents
+            if sort_by == "reporter" and usernames:
+                bounds = (usernames[0], usernames[-1])
+            elif reported < len(self._records) * SUBSET_SORT_RATIO:
+                candidates = _intersect(
+                    candidates,
+                    {id for name in usernames for id in index.members(name, name)},
+                )
+
+        if q.severity:
+            severity = SEVERITY_CODES[q.severity]
+            filters.append(lambda record: record.severity == severity)
+
+        if q.status:
+            status = STATUS_CODES[q.status]
+            filters.append(lambda record: record.status == status)
+
+        for field, window in q.ranges().items():
+            key = self._keys[field]
+            low, high = _bounds(*window)
+            filters.append(
+                lambda record, key=key, low=low, high=high: (
+                    low is None or low <= key(record)
+                )
+                and (high is None or key(record) <= high)
+            )
+            if field == sort_by:
+                bounds = (low, high)
+                continue
+            # Only narrow windows are worth collecting into a candidate set
+            index = self._sort_indexes[field]
+            start, stop = index.span(low, high)
+            if stop - start < len(self._records) * SUBSET_SORT_RATIO:
+                candidates = _intersect(candidates, index.members(low, high))
+
+        # Walk the sort index and yield the records matching every filter
+        for record in self.sorted(sort_by, reverse, after, candidates, bounds):
+            if all(matches(record) for matches in filters):
+                yield record
@@ -0,0 +1,386 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
+
+TRIGRAM_SIZE = 3  # Length of the n-grams used by the text index
+
+# Batches at least this large are merged into a sort index with one sort or
+# filter pass over its entries, instead of one binary search per entry
+BATCH_MERGE_SIZE = 64
+
+# Greater than the integer value of any UUID, used to find the end of a key range
+MAX_ID = 1 << 128
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Return the set of lowercase trigrams contained in a text.
+    """
+    text = text.lower()
+    return {text[i : i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+class SortIndex:
+    """
+    Secondary index keeping incident ids ordered by a sort key.
+
+    Entries are `(key, id)` tuples held in a sorted list, so the index can be
+    walked in either direction without sorting. Incidents are identified by the
+    integer value of their UUID, which breaks ties and gives every incident a
+    unique and stable position in the order. Integers are used instead of the
+    UUIDs themselves because they compare and hash in C, which makes building
+    the index and finding positions much faster.
+
+    Nothing else is kept per incident: the entry of an incident is computed
+    again from the incident to remove it, which must therefore have the sort
+    key it was inserted with. Stored records are never changed, so the store
+    always removes the record it inserted.
+    """
+
+    def __init__(self, key: Callable[[Any], Any]):
+        self._key = key  # Extracts the sort key from an incident
+        self._entries: list[tuple[Any, int]] = []  # Sorted entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, incidents: Iterable) -> None:
+        """
+        Replace the content of the index with the given incidents.
+
+        The entries are sorted once, which is much faster than inserting the
+        incidents one by one when loading a large number of them.
+        """
+        key = self._key
+        self._entries = sorted((key(incident), incident.id) for incident in incidents)
+
+    def insert(self, incident) -> None:
+        """
+        Add an incident to the index at the position given by its sort key.
+        """
+        insort(self._entries, (self._key(incident), incident.id))
+
+    def insert_many(self, incidents: Iterable) -> None:
+        """
+        Add a batch of incidents to the index.
+
+        Large batches are appended and the entries sorted again. The list then
+        holds two sorted runs, which the sort merges in linear time, instead of
+        paying a list insertion per incident. A batch whose keys all sort after
+        the last entry, such as new versions, is simply appended.
+        """
+        key = self._key
+        entries = sorted((key(incident), incident.id) for incident in incidents)
+        if not entries:
+            return
+        if not self._entries or self._entries[-1] < entries[0]:
+            self._entries.extend(entries)
+        elif len(entries) < BATCH_MERGE_SIZE:
+            for entry in entries:
+                insort(self._entries, entry)
+        else:
+            self._entries.extend(entries)
+            self._entries.sort()
+
+    def _delete(self, entry: tuple[Any, int]) -> None:
+        """
+        Delete an entry found by binary search, if it is in the index.
+        """
+        entries = self._entries
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def remove(self, incident) -> None:
+        """
+        Remove an incident from the index, if it is indexed.
+        """
+        self._delete((self._key(incident), incident.id))
+
+    def remove_many(self, incidents: Iterable) -> None:
+        """
+        Remove a batch of incidents from the index.
+
+        Large batches are removed with a single pass filtering the entries,
+        instead of one list deletion per incident.
+        """
+        incidents = list(incidents)
+        if len(incidents) < BATCH_MERGE_SIZE:
+            for incident in incidents:
+                self.remove(incident)
+            return
+
+        removed = {incident.id for incident in incidents}
+        self._entries = [entry for entry in self._entries if entry[1] not in removed]
+
+    def span(self, low: Any = None, high: Any = None) -> tuple[int, int]:
+        """
+        Return the `(start, stop)` positions of the entries with a key in a range.
+
+        Both bounds are inclusive, and `None` leaves the range open on that side.
+        The positions are found by binary search.
+        """
+        entries = self._entries
+        start = 0 if low is None else bisect_left(entries, (low,))
+        stop = len(entries) if high is None else bisect_right(entries, (high, MAX_ID))
+        return start, max(start, stop)
+
+    def members(self, low: Any = None, high: Any = None) -> set[int]:
+        """
+        Return the integer ids of the incidents with a key in a range.
+        """
+        start, stop = self.span(low, high)
+        return {entry[1] for entry in self._entries[start:stop]}
+
+    def ids(
+        self,
+        reverse: bool = False,
+        after: tuple[Any, int] | None = None,
+        low: Any = None,
+        high: Any = None,
+    ) -> Iterator[int]:
+        """
+        Iterate over the indexed incident ids in ascending or descending order.
+
+        If `after` is given as a `(key, id)` position, iteration resumes with
+        the first entry past that position in the requested direction. The
+        position is found by binary search and does not need to be present in
+        the index, so it stays valid when the incident it came from is deleted.
+
+        Iteration can be restricted to the keys between `low` and `high`, both
+        inclusive, whose positions are found by binary search as well.
+        """
+        entries = self._entries
+        first, stop = self.span(low, high)
+        if after is None:
+            start = stop - 1 if reverse else first
+        elif reverse:
+            start = min(bisect_left(entries, after), stop) - 1
+        else:
+            start = max(bisect_left(entries, (after[0], after[1] + 1)), first)
+
+        step = -1 if reverse else 1
+        position = start
+        while first <= position < stop:
+            yield entries[position][1]
+            position += step
+
+    def buckets(
+        self,
+        floor: Callable[[Any], Any],
+        width: Any,
+        low: Any = None,
+        high: Any = None,
+    ) -> list[tuple[Any, int]]:
+        """
+        Count the entries in consecutive buckets of keys, in ascending order.
+
+        `floor` maps a key to the start of its bucket, and a bucket covers the
+        keys from its start up to its start plus `width`. Only the non-empty
+        buckets are returned, as `(start, count)` pairs, and the optional bounds
+        restrict the keys counted. The end of each bucket is found by binary
+        search, so the cost depends on the number of buckets rather than on
+        the number of entries.
+        """
+        entries = self._entries
+        position, stop = self.span(low, high)
+        counts = []
+        while position < stop:
+            start = floor(entries[position][0])
+            end = bisect_left(entries, (start + width,), position, stop)
+            counts.append((start, end - position))
+            position = end
+        return counts
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to the ids of incidents containing them.
+
+    A case-insensitive substring query can only match incidents containing all
+    of its trigrams, so intersecting their posting lists narrows the candidates
+    without scanning every incident. Candidates still have to be checked with a
+    real substring test, as the trigrams may appear in a different order.
+
+    Posting lists hold the integer value of the incident UUIDs, which hash in C
+    and keep index maintenance cheap. The trigrams of an incident are computed
+    again from its text to remove it, as with the sort index, rather than kept
+    in a set of strings per incident, which would take more memory than the
+    posting lists themselves.
+    """
+
+    def __init__(self, text: Callable[[Any], str]):
+        self._text = text  # Extracts the indexed text from an incident
+        self._postings: dict[str, set[int]] = {}  # Incident ids per trigram
+
+    def rebuild(self, incidents: Iterable) -> None:
+        """
+        Replace the content of the index with the given incidents.
+
+        Posting lists are collected as lists and converted to sets once at the
+        end, which is cheaper than growing every set one id at a time.
+        """
+        text = self._text
+        postings: dict[str, list[int]] = {}
+        for incident in incidents:
+            id = incident.id
+            for gram in trigrams(text(incident)):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [id]
+                else:
+                    posting.append(id)
+        self._postings = {gram: set(ids) for gram, ids in postings.items()}
+
+    def insert(self, incident) -> None:
+        """
+        Add the trigrams of an incident's text to the index.
+        """
+        id = incident.id
+        postings = self._postings
+        for gram in trigrams(self._text(incident)):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {id}
+            else:
+                posting.add(id)
+
+    def insert_many(self, incidents: Iterable) -> None:
+        """
+        Add the trigrams of a batch of incidents to the index.
+        """
+        for incident in incidents:
+            self.insert(incident)
+
+    def remove(self, incident) -> None:
+        """
+        Remove an incident from the posting lists of the trigrams of its text.
+        """
+        id = incident.id
+        postings = self._postings
+        for gram in trigrams(self._text(incident)):
+            posting = postings.get(gram)
+            if posting is not None:
+                posting.discard(id)
+                if not posting:
+                    del postings[gram]
+
+    def remove_many(self, incidents: Iterable) -> None:
+        """
+        Remove a batch of incidents from the index.
+        """
+        for incident in incidents:
+            self.remove(incident)
+
+    def candidates(self, needle: str) -> set[int] | None:
+        """
+        Return the integer ids of the incidents that may contain a substring.
+
+        Returns `None` if the substring is shorter than a trigram, since the
+        index cannot narrow the search in that case.
+        """
+        grams = trigrams(needle)
+        if not grams:
+            return None
+
+        # Intersect the posting lists from the smallest to the largest
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+
+class HashIndex:
+    """
+    Inverted index from exact keys to the positions of the items holding them.
+
+    Items are identified by an integer position given by their owner, such as
+    their position in a listing, so posting lists stay small sets of integers.
+    The key of an item is computed again from the item to remove it, which must
+    therefore be the item it was inserted with.
+    """
+
+    def __init__(self, key: Callable[[Any], str]):
+        self._key = key  # Extracts the indexed key from an item
+        self._postings: dict[str, set[int]] = {}  # Item positions per key
+
+    def insert(self, position: int, item) -> None:
+        """
+        Add an item to the posting list of its key.
+        """
+        self._postings.setdefault(self._key(item), set()).add(position)
+
+    def remove(self, position: int, item) -> None:
+        """
+        Remove an item from the posting list of its key.
+        """
+        key = self._key(item)
+        posting = self._postings.get(key)
+        if posting is not None:
+            posting.discard(position)
+            if not posting:
+                del self._postings[key]
+
+    def get(self, key: str) -> set[int]:
+        """
+        Return the positions of the items with the given key.
+        """
+        return self._postings.get(key, set())
+
+
+class PrefixIndex:
+    """
+    Inverted index from tokens to the positions of the items holding them,
+    searchable by token prefix.
+
+    Distinct tokens are also kept in a sorted list, where the tokens starting
+    with a prefix form a contiguous run found by binary search. A prefix query
+    then only visits the posting lists of matching tokens. As with the hash
+    index, the tokens of an item are computed again from the item to remove it.
+    """
+
+    def __init__(self, tokens: Callable[[Any], Iterable[str]]):
+        self._tokens = tokens  # Extracts the indexed tokens from an item
+        self._postings: dict[str, set[int]] = {}  # Item positions per token
+        self._sorted: list[str] = []  # Distinct tokens, in sorted order
+
+    def insert(self, position: int, item) -> None:
+        """
+        Add an item to the posting lists of its tokens.
+        """
+        for token in self._tokens(item):
+            posting = self._postings.get(token)
+            if posting is None:
+                self._postings[token] = {position}
+                insort(self._sorted, token)
+            else:
+                posting.add(position)
+
+    def remove(self, position: int, item) -> None:
+        """
+        Remove an item from the posting lists of its tokens.
+        """
+        for token in self._tokens(item):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(position)
+            if not posting:
+                del self._postings[token]
+                del self._sorted[bisect_left(self._sorted, token)]
+
+    def prefixed(self, prefix: str) -> set[int]:
+        """
+        Return the positions of the items holding a token starting with `prefix`.
+        """
+        tokens = self._sorted
+        start = bisect_left(tokens, prefix)
+        result = set()
+        for token in islice(tokens, start, None):
+            if not token.startswith(prefix):
+                break
+            result |= self._postings[token]
+        return result
@@ -0,0 +1,476 @@
+import asyncio
+import gc
+import logging
+import mmap
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+from uuid import UUID
+
+import orjson
+
+from ..models.incident import IncidentDTO
+from .incident import IncidentStore
+from .memory import MemoryIncidentRepository, MemoryStorage
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.db"  # Latest snapshot of the incidents
+JOURNAL_FILE = "journal.log"  # Records written since the last rotation
+ROTATED_JOURNAL_FILE = "journal.log.old"  # Records waiting for a snapshot
+
+
+def _lines(path: Path) -> Iterator[bytes]:
+    """
+    Iterate over the lines of a file through a read-only memory map.
+
+    Mapping the file lets the OS page it in directly, without copying it into
+    Python buffers, which keeps recovery fast for large files.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter(mapped.readline, b"")
+
+
+def read_snapshot(path: Path) -> tuple[int, dict[UUID, IncidentDTO]] | None:
+    """
+    Read a snapshot file, returning its sequence number and its incidents.
+
+    Returns `None` if the snapshot does not exist.
+    """
+    lines = _lines(path)
+    header = next(lines, None)
+    if header is None:
+        return None
+
+    seq = orjson.loads(header)["seq"]  # Last journal record in the snapshot
+    incidents = {}
+    for line in lines:
+        incident = IncidentDTO.model_validate_json(line)
+        incidents[incident.id] = incident
+    return seq, incidents
+
+
+def replay_journal(path: Path, incidents: dict[UUID, IncidentDTO], after: int) -> int:
+    """
+    Apply the records of a journal file newer than `after` to the incidents.
+
+    Records hold the full state of an incident or a deletion, so replaying a
+    record that is already reflected in the incidents is harmless. Returns the
+    sequence number of the last record. A torn record left by a crash in the
+    middle of a write ends the replay.
+    """
+    seq = after
+    for line in _lines(path):
+        try:
+            record_seq, op, data = orjson.loads(line)
+        except (orjson.JSONDecodeError, ValueError):
+            logger.warning("Ignoring torn journal record in %s", path)
+            break
+        if record_seq <= after:
+            continue
+        if op == "put":
+            incident = IncidentDTO.model_validate(data)
+            incidents[incident.id] = incident
+        elif op == "del":
+            incidents.pop(UUID(data), None)
+        seq = record_seq
+    return seq
+
+
+def write_snapshot(
+    path: Path, seq: int, incidents: Iterable[IncidentDTO], count: int
+) -> None:
+    """
+    Atomically write a snapshot of the `count` incidents up to journal record `seq`.
+
+    The snapshot is written to a temporary file, flushed to disk and renamed
+    over the previous one, so a crash never leaves a partial snapshot behind.
+    """
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "wb") as file:
+        file.write(orjson.dumps({"seq": seq, "count": count}) + b"\n")
+        for incident in incidents:
+            file.write(orjson.dumps(incident.model_dump()) + b"\n")
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+    # Persist the rename itself, where the platform allows syncing directories
+    if hasattr(os, "O_DIRECTORY"):
+        directory = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+class Journal:
+    """
+    Append-only write-ahead journal of incident changes.
+
+    Records are buffered in memory and written by a background task, so all
+    the records appended while a write is in progress are committed together by
+    the next one (group commit). The `fsync` policy decides when the file is
+    flushed to disk:
+
+    - "always": on every group commit, and writers wait until their record is
+      on disk before returning.
+    - "interval": at most once every `fsync_interval` seconds.
+    - "never": whenever the OS decides to.
+
+    With the last two policies, writers return before their record is written.
+    If a write fails, the records it held cannot be acknowledged again, so the
+    journal is marked as failed: the writer stops, and appending raises from
+    then on, instead of acknowledging changes that would never be written.
+    """
+
+    def __init__(self, directory: Path, fsync: str = "interval", fsync_interval=1.0):
+        self.path = directory / JOURNAL_FILE  # File receiving new records
+        self.rotated_path = directory / ROTATED_JOURNAL_FILE  # Rotated records
+        self.fsync = fsync  # Flush policy
+        self.fsync_interval = fsync_interval  # Seconds between flushes
+        self.seq = 0  # Sequence number of the last appended record
+        self._buffer: list[bytes] = []  # Records waiting to be written
+        self._waiters: list[asyncio.Future] = []  # Writers waiting for a commit
+        self._wakeup = asyncio.Event()  # Set when records are appended
+        self._lock = asyncio.Lock()  # Serializes writes and rotations
+        self._file = None  # Open journal file
+        self._dirty = False  # Whether written records still need an fsync
+        self._synced_at = time.monotonic()  # Time of the last fsync
+        self._task: asyncio.Task | None = None  # Background writer
+        self._closing = False  # Set to stop the background writer
+        self._error: Exception | None = None  # Write failure, once failed
+
+    def start(self, seq: int) -> None:
+        """
+        Open the journal file and start the background writer.
+        """
+        self.seq = seq
+        self._file = open(self.path, "ab")
+        self._task = asyncio.create_task(self._run())
+
+    def append(self, op: str, data: Any) -> asyncio.Future | None:
+        """
+        Append a record to the journal.
+
+        With the "always" fsync policy, returns a future resolved once the record
+        is on disk. Otherwise returns `None` and the record is written shortly.
+        Raises a `RuntimeError` if the journal has not been started, or failed.
+        """
+        if self._task is None:
+            raise RuntimeError("The incident journal has not been started")
+        self._check()
+        self.seq += 1
+        self._buffer.append(orjson.dumps([self.seq, op, data]) + b"\n")
+        self._wakeup.set()
+        if self.fsync == "always":
+            commit = asyncio.get_running_loop().create_future()
+            self._waiters.append(commit)
+            return commit
+        return None
+
+    def _check(self) -> None:
+        """
+        Raise a `RuntimeError` if a write of the journal failed.
+        """
+        if self._error is not None:
+            raise RuntimeError("The incident journal failed") from self._error
+
+    def _write(self, data: bytes, sync: bool) -> None:
+        """
+        Write a group of records, and flush them to disk if asked. Runs in a thread.
+        """
+        self._file.write(data)
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    async def _commit(self, force_sync: bool = False) -> None:
+        """
+        Write every buffered record. Must be called with the lock held.
+
+        If the write fails, the journal is marked as failed, and the writers
+        waiting for a commit get the exception.
+        """
+        self._check()
+        data, self._buffer = b"".join(self._buffer), []
+        waiters, self._waiters = self._waiters, []
+        sync = (
+            force_sync
+            or self.fsync == "always"
+            or (
+                self.fsync == "interval"
+                and time.monotonic() - self._synced_at >= self.fsync_interval
+            )
+        )
+        try:
+            if data or (sync and self._dirty):
+                await asyncio.to_thread(self._write, data, sync)
+        except Exception as exc:
+            # The write may have been partial, so records are not written again
+            self._error = exc
+            waiters += self._waiters  # Records appended during the write
+            self._buffer, self._waiters = [], []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            raise
+
+        self._dirty = not sync and (self._dirty or bool(data))
+        if sync:
+            self._synced_at = time.monotonic()
+        for waiter in waiters:
+            if not waiter.done():  # Writers may have been cancelled meanwhile
+                waiter.set_result(None)
+
+    async def _run(self) -> None:
+        """
+        Background writer committing the buffered records as they come.
+        """
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.fsync_interval)
+            except asyncio.TimeoutError:
+                pass  # Wake up regularly to flush records written without fsync
+            self._wakeup.clear()
+            async with self._lock:
+                try:
+                    await self._commit(force_sync=self._closing)
+                except Exception:
+                    logger.exception("Failed to write the incident journal")
+                    return  # Appending raises from now on
+
+    async def rotate(self) -> int:
+        """
+        Move the records written so far aside so they can be compacted.
+
+        Returns the sequence number of the last rotated record. The rotated
+        records are kept until a snapshot including them has been written.
+        """
+        async with self._lock:
+            await self._commit(force_sync=True)
+            seq = self.seq
+            self._file.close()
+            if self.rotated_path.exists():
+                # A previous snapshot did not complete, keep its records too
+                with open(self.rotated_path, "ab") as rotated:
+                    rotated.write(self.path.read_bytes())
+                self.path.unlink()
+            else:
+                os.replace(self.path, self.rotated_path)
+            self._file = open(self.path, "ab")
+            return seq
+
+    async def close(self) -> None:
+        """
+        Stop the background writer after committing the buffered records.
+        """
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task  # Commits the remaining records before exiting
+        self._file.close()
+        self._task = None
+
+
+class JournaledIncidentRepository(MemoryIncidentRepository):
+    """
+    In-memory incident repository logging every change to a `Journal`.
+
+    Changes are applied to the store first and then journaled as the full
+    state of the incident, or as a deletion. Writes are only delayed by the
+    journal with the "always" fsync policy.
+    """
+
+    def __init__(self, store: IncidentStore, journal: Journal):
+        super().__init__(store)
+        self.journal = journal
+
+    async def _log(self, op: str, data: Any) -> None:
+        commit = self.journal.append(op, data)
+        if commit is not None:
+            await commit
+
+    async def add(self, incident: IncidentDTO) -> IncidentDTO:
+        incident = await super().add(incident)
+        await self._log("put", incident.model_dump())
+        return incident
+
+    async def update(self, id: UUID, changes: dict[str, Any]) -> IncidentDTO | None:
+        incident = await super().update(id, changes)
+        if incident is not None:
+            await self._log("put", incident.model_dump())
+        return incident
+
+    async def remove(self, id: UUID) -> IncidentDTO | None:
+        incident = await super().remove(id)
+        if incident is not None:
+            await self._log("del", str(id))
+        return incident
+
+    async def _log_many(self, records: list[tuple[str, Any]]) -> None:
+        # Records are committed in order, so the batch is durable once the
+        # commit of its last record completes
+        commit = None
+        for op, data in records:
+            commit = self.journal.append(op, data)
+        if commit is not None:
+            await commit
+
+    async def add_many(self, incidents: list[IncidentDTO]) -> list[IncidentDTO | None]:
+        results = await super().add_many(incidents)
+        await self._log_many(
+            [("put", incident.model_dump()) for incident in results if incident]
+        )
+        return results
+
+    @asynccontextmanager
+    async def bulk_load(self):
+        async with super().bulk_load() as stage:
+
+            async def load(incidents: list[IncidentDTO]) -> list[IncidentDTO | None]:
+                results = await stage(incidents)
+                await self._log_many(
+                    [("put", incident.model_dump()) for incident in results if incident]
+                )
+                return results
+
+            yield load
+
+    async def update_many(
+        self, changes: list[tuple[UUID, dict[str, Any]]]
+    ) -> list[IncidentDTO | None]:
+        results = await super().update_many(changes)
+        await self._log_many(
+            [("put", incident.model_dump()) for incident in results if incident]
+        )
+        return results
+
+    async def remove_many(self, ids: list[UUID]) -> list[IncidentDTO | None]:
+        results = await super().remove_many(ids)
+        await self._log_many(
+            [("del", str(incident.id)) for incident in results if incident]
+        )
+        return results
+
+
+class DurableMemoryStorage(MemoryStorage):
+    """
+    In-memory storage engine made durable by a journal and periodic snapshots.
+
+    On startup the latest snapshot is loaded and the journal records written
+    after it are replayed. A background task then regularly compacts the
+    journal into a new snapshot. If the directory holds no data yet, the store
+    is loaded with the seed incidents, if given, which are saved as the first
+    snapshot.
+    """
+
+    def __init__(
+        self,
+        incidents: IncidentStore,
+        reporters: dict[str, dict],
+        directory: str,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        snapshot_interval: float = 300,
+        seed_incidents: Callable[[], Iterable[IncidentDTO]] | None = None,
+    ):
+        super().__init__(incidents, reporters)
+        self.store = incidents  # Store recovered on startup
+        self.directory = Path(directory)  # Directory holding the files
+        self.snapshot_path = self.directory / SNAPSHOT_FILE
+        self.snapshot_interval = snapshot_interval  # Seconds between snapshots
+        self.journal = Journal(self.directory, fsync, fsync_interval)
+        self.incidents = JournaledIncidentRepository(incidents, self.journal)
+        self._seed_incidents = seed_incidents  # Reads the incidents of a new journal
+        self._snapshot_seq = 0  # Last journal record included in the snapshot
+        self._task: asyncio.Task | None = None  # Background snapshot task
+
+    def _recover(self) -> tuple[int, dict[UUID, IncidentDTO]] | None:
+        """
+        Load the snapshot and replay the journal. Runs in a thread.
+        """
+        snapshot = read_snapshot(self.snapshot_path)
+        seq, incidents = snapshot if snapshot else (0, {})
+        snapshot_seq = seq
+        for path in (self.journal.rotated_path, self.journal.path):
+            seq = max(seq, replay_journal(path, incidents, snapshot_seq))
+        if snapshot is None and seq == 0:
+            return None  # Nothing has been saved yet
+        return seq, incidents
+
+    async def open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+
+        # Loading allocates millions of long-lived objects, which would trigger
+        # many useless garbage collections, so the collector is paused meanwhile
+        gc.disable()
+        try:
+            recovered = await asyncio.to_thread(self._recover)
+            if recovered is not None:
+                self.store.load(recovered[1].values())
+            elif self._seed_incidents is not None:
+                self.store.load(self._seed_incidents())
+        finally:
+            gc.enable()
+
+        if recovered is not None:
+            seq = recovered[0]
+            logger.info(
+                "Recovered %d incidents up to record %d in %.2fs",
+                len(self.store),
+                seq,
+                time.perf_counter() - started,
+            )
+        else:
+            seq = 0
+        self.journal.start(seq)
+        await self.snapshot()
+        self._task = asyncio.create_task(self._run())
+
+    async def snapshot(self) -> None:
+        """
+        Compact the journal into a new snapshot of the incidents.
+        """
+        seq = await self.journal.rotate()
+        # Records are never changed once stored, so the list copied on the event
+        # loop is consistent, and is turned into models and serialized in a thread
+        records = self.store.records()
+        await asyncio.to_thread(
+            write_snapshot,
+            self.snapshot_path,
+            seq,
+            map(self.store.materialize, records),
+            len(records),
+        )
+        self.journal.rotated_path.unlink(missing_ok=True)
+        self._snapshot_seq = seq
+
+    async def _run(self) -> None:
+        """
+        Background task taking a snapshot when the journal has new records.
+        """
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            if self.journal.seq > self._snapshot_seq:
+                try:
+                    await self.snapshot()
+                except Exception:
+                    logger.exception("Failed to write the incident snapshot")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.journal.close()
@@ -0,0 +1,166 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Any, Iterable
+from uuid import UUID
+
+from ..models.incident import IncidentDTO, IncidentQueryParams
+from ..models.reporter import ReporterDTO, ReporterQueryParams
+from .base import IncidentRepository, ReporterRepository, Storage, initial_version
+from .incident import IncidentStore
+from .records import from_microseconds
+from .reporter import ReporterDirectory
+
+
+class MemoryIncidentRepository(IncidentRepository):
+    """
+    Incident repository backed by an in-memory `IncidentStore`.
+
+    All operations run synchronously against the store's indexes. They never
+    wait on I/O, so running them directly on the event loop is cheaper than
+    handing them to a thread.
+    """
+
+    def __init__(self, store: IncidentStore):
+        self.store = store  # Indexed in-memory incident store
+
+    async def get(self, id: UUID) -> IncidentDTO | None:
+        return self.store.get(id)
+
+    async def add(self, incident: IncidentDTO) -> IncidentDTO:
+        return self.store.add(incident)
+
+    async def update(self, id: UUID, changes: dict[str, Any]) -> IncidentDTO | None:
+        return self.store.update(id, changes)
+
+    async def remove(self, id: UUID) -> IncidentDTO | None:
+        return self.store.remove(id)
+
+    async def add_many(self, incidents: list[IncidentDTO]) -> list[IncidentDTO | None]:
+        return self.store.add_many(incidents)
+
+    @asynccontextmanager
+    async def bulk_load(self):
+        # Batches are only staged, and the indexes rebuilt once at the end
+        try:
+            yield self._stage
+        finally:
+            self.store.reindex()
+
+    async def _stage(self, incidents: list[IncidentDTO]) -> list[IncidentDTO | None]:
+        return self.store.stage(incidents)
+
+    async def update_many(
+        self, changes: list[tuple[UUID, dict[str, Any]]]
+    ) -> list[IncidentDTO | None]:
+        return self.store.update_many(changes)
+
+    async def remove_many(self, ids: list[UUID]) -> list[IncidentDTO | None]:
+        return self.store.remove_many(ids)
+
+    async def count(self) -> int:
+        return len(self.store)
+
+    async def facets(self, q: IncidentQueryParams) -> list[tuple[str, str, str, int]]:
+        return self.store.facets(q)
+
+    async def histogram(
+        self, q: IncidentQueryParams, field: str, interval: str
+    ) -> list[tuple[datetime, int]]:
+        return self.store.histogram(q, field, interval)
+
+    async def version(self, id: UUID | None = None) -> int | None:
+        return self.store.version if id is None else self.store.version_of(id)
+
+    async def changes(
+        self, after: tuple[int, UUID], limit: int, since: int = 0
+    ) -> tuple[int, list[tuple[int, IncidentDTO]], list[tuple[int, UUID, datetime]]]:
+        version, id = after
+        records, tombstones = self.store.changes((version, id.int), limit, since)
+        return (
+            self.store.tombstones.horizon,
+            [(record.version, self.store.materialize(record)) for record in records],
+            [
+                (version, UUID(int=id), from_microseconds(deleted_at))
+                for version, id, deleted_at in tombstones
+            ],
+        )
+
+    async def search(
+        self,
+        q: IncidentQueryParams,
+        sort_by: str,
+        reverse: bool,
+        after: tuple | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[IncidentDTO]:
+        # Only the records of the requested page are turned into models
+        records = self.store.search(q, sort_by, reverse, after)
+        stop = skip + limit if limit is not None else None
+        return list(map(self.store.materialize, islice(records, skip, stop)))
+
+
+class MemoryReporterRepository(ReporterRepository):
+    """
+    Reporter repository backed by an in-memory `ReporterDirectory`.
+
+    The directory hands out a `ReporterDTO` built once per reporter, and serves
+    the reporter filters from its indexes.
+    """
+
+    def __init__(self, reporters: dict[str, dict]):
+        self.directory = ReporterDirectory(reporters.values())
+        self._version = initial_version()  # Incremented on every change
+
+    async def get(self, username: str) -> dict | None:
+        return self.directory.get(username)
+
+    async def get_model(self, username: str) -> ReporterDTO | None:
+        return self.directory.model(username)
+
+    async def get_many(self, usernames: Iterable[str]) -> dict[str, dict]:
+        get = self.directory.get
+        return {
+            username: reporter
+            for username in usernames
+            if (reporter := get(username)) is not None
+        }
+
+    async def update(self, username: str, changes: dict[str, Any]) -> dict | None:
+        reporter = self.directory.get(username)
+        if reporter is None:
+            return None
+        if "username" in changes:
+            raise KeyError("Cannot update reporter field 'username'")
+
+        reporter = {**reporter, **changes, "updated_at": datetime.now()}
+        self.directory.replace(reporter)
+        self._version += 1
+        return reporter
+
+    async def count(self, q: ReporterQueryParams | None = None) -> int:
+        return self.directory.count(q)
+
+    async def version(self) -> int:
+        return self._version
+
+    async def search(
+        self,
+        q: ReporterQueryParams | None = None,
+        after: str | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[ReporterDTO]:
+        return self.directory.search(q, after, skip, limit)
+
+
+class MemoryStorage(Storage):
+    """
+    Storage engine keeping incidents and reporters in the worker's memory.
+    """
+
+    def __init__(self, incidents: IncidentStore, reporters: dict[str, dict]):
+        super().__init__(
+            MemoryIncidentRepository(incidents), MemoryReporterRepository(reporters)
+        )
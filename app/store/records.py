@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from ..models.incident import IncidentSeverity, IncidentStatus
+
+# Timestamps are stored as microseconds since this (naive) reference time
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+SEVERITIES = list(IncidentSeverity)  # Severity levels, by code
+STATUSES = list(IncidentStatus)  # Statuses, by code
+SEVERITY_CODES = {level: code for code, level in enumerate(SEVERITIES)}  # By level
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}  # By status
+SEVERITY_VALUES = [severity.value for severity in SEVERITIES]  # Values, by code
+STATUS_VALUES = [status.value for status in STATUSES]  # Values, by code
+
+
+def to_microseconds(value: datetime) -> int:
+    """
+    Convert a datetime into microseconds since `EPOCH`, in naive local time.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - EPOCH) // MICROSECOND
+
+
+def from_microseconds(value: int) -> datetime:
+    """
+    Convert microseconds since `EPOCH` back into a naive datetime.
+    """
+    return EPOCH + value * MICROSECOND
+
+
+class IncidentRecord:
+    """
+    Compact in-memory representation of an incident.
+
+    Records only hold small immutable values: the integer value of the UUID,
+    the text fields, the codes of the severity and status (positions in
+    `SEVERITIES` and `STATUSES`), the position of the reporter's username in
+    the table of the store holding the record, timestamps as microseconds since
+    `EPOCH`, and the version of the store the incident was last changed at.
+    Slots spare every record a dictionary of attributes, so a record takes a
+    fraction of the memory of an `IncidentDTO`.
+
+    Records are never changed once stored: an update stores a changed copy,
+    so a list of records read at some point stays a consistent view.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "severity",
+        "status",
+        "reporter",
+        "date",
+        "created_at",
+        "updated_at",
+        "version",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        description: str,
+        severity: int,
+        status: int,
+        reporter: int,
+        date: int,
+        created_at: int,
+        updated_at: int,
+        version: int,
+    ):
+        self.id = id  # Integer value of the incident UUID
+        self.title = title  # Title of the incident
+        self.description = description  # Description of the incident
+        self.severity = severity  # Code of the severity level
+        self.status = status  # Code of the status
+        self.reporter = reporter  # Position of the username in the store's table
+        self.date = date  # Date of the incident, in microseconds
+        self.created_at = created_at  # Creation time, in microseconds
+        self.updated_at = updated_at  # Last update time, in microseconds
+        self.version = version  # Version of the store at the last change
+
+    def copy(self) -> "IncidentRecord":
+        """
+        Return a copy of the record, to be changed before it is stored.
+        """
+        return IncidentRecord(
+            self.id,
+            self.title,
+            self.description,
+            self.severity,
+            self.status,
+            self.reporter,
+            self.date,
+            self.created_at,
+            self.updated_at,
+            self.version,
+        )
@@ -0,0 +1,182 @@
+from bisect import bisect_right
+from typing import Iterable
+
+from ..models.reporter import ReporterDTO, ReporterQueryParams
+from .indexes import HashIndex, PrefixIndex
+
+
+def company_key(reporter: dict) -> str:
+    """
+    Return the key of a reporter's company, compared regardless of case.
+    """
+    return reporter["company"].lower()
+
+
+def first_name_tokens(reporter: dict) -> list[str]:
+    """
+    Return the first name of a reporter, as the first lowercase word of its name.
+    """
+    return reporter["name"].lower().split()[:1]
+
+
+def last_name_tokens(reporter: dict) -> list[str]:
+    """
+    Return the last names of a reporter, as the lowercase words of its name
+    following the first one.
+    """
+    return reporter["name"].lower().split()[1:]
+
+
+class ReporterDirectory:
+    """
+    In-memory directory of reporters, indexed for the reporter filters.
+
+    Reporters are kept as dictionaries keyed by username, in the format of the
+    seed reporters, along with a `ReporterDTO` built once per reporter and
+    handed out to every reader until the reporter changes. Every reporter has a
+    fixed position in the listing order, which is its insertion order.
+
+    Filters of `ReporterQueryParams` are served by indexes holding positions:
+    the username by the table of positions itself, the company by a hash index
+    on its lowercase value, and first and last names by prefix indexes on the
+    lowercase words of the name. Matching positions are intersected, then
+    sorted to list the matching reporters in listing order.
+    """
+
+    def __init__(self, reporters: Iterable[dict] = ()):
+        self._reporters: dict[str, dict] = {}  # Reporters keyed by username
+        self._models: dict[str, ReporterDTO] = {}  # Models keyed by username
+        self._order: list[str] = []  # Usernames in listing order
+        self._positions: dict[str, int] = {}  # Position of every username
+        self._companies = HashIndex(company_key)  # Positions by company
+        self._first_names = PrefixIndex(first_name_tokens)  # By first name
+        self._last_names = PrefixIndex(last_name_tokens)  # By last names
+        for reporter in reporters:
+            self.add(reporter)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def get(self, username: str) -> dict | None:
+        """
+        Return the reporter with the given username, or `None` if it does not exist.
+        """
+        return self._reporters.get(username)
+
+    def model(self, username: str) -> ReporterDTO | None:
+        """
+        Return the `ReporterDTO` of a reporter, or `None` if it does not exist.
+        """
+        return self._models.get(username)
+
+    def _index(self, position: int, reporter: dict) -> None:
+        """
+        Add a reporter to the filter indexes.
+        """
+        self._companies.insert(position, reporter)
+        self._first_names.insert(position, reporter)
+        self._last_names.insert(position, reporter)
+
+    def _unindex(self, position: int, reporter: dict) -> None:
+        """
+        Remove a reporter from the filter indexes.
+        """
+        self._companies.remove(position, reporter)
+        self._first_names.remove(position, reporter)
+        self._last_names.remove(position, reporter)
+
+    def add(self, reporter: dict) -> None:
+        """
+        Add a new reporter at the end of the listing order.
+
+        Raises a `KeyError` if a reporter with the same username already exists.
+        """
+        username = reporter["username"]
+        if username in self._reporters:
+            raise KeyError(username)
+
+        position = len(self._order)
+        self._order.append(username)
+        self._positions[username] = position
+        self._reporters[username] = reporter
+        self._models[username] = ReporterDTO(**reporter)
+        self._index(position, reporter)
+
+    def replace(self, reporter: dict) -> None:
+        """
+        Replace an existing reporter, keeping its position in the listing order.
+
+        The stored dictionary is replaced rather than changed, so readers holding
+        the previous one are not affected.
+        """
+        username = reporter["username"]
+        position = self._positions[username]
+        self._unindex(position, self._reporters[username])
+        self._reporters[username] = reporter
+        self._models[username] = ReporterDTO(**reporter)
+        self._index(position, reporter)
+
+    def matching(self, q: ReporterQueryParams | None) -> list[int] | None:
+        """
+        Return the sorted positions of the reporters matching the filters.
+
+        Returns `None` if no filter is set, meaning that every reporter matches.
+        """
+        if q is None:
+            return None
+
+        candidates = []
+        if q.username:
+            position = self._positions.get(q.username)
+            candidates.append({position} if position is not None else set())
+        if q.company:
+            candidates.append(self._companies.get(q.company.lower()))
+        if q.first_name:
+            candidates.append(self._first_names.prefixed(q.first_name.lower()))
+        if q.last_name:
+            candidates.append(self._last_names.prefixed(q.last_name.lower()))
+        if not candidates:
+            return None
+
+        # Intersect the candidates from the smallest to the largest set
+        candidates.sort(key=len)
+        positions = set(candidates[0])
+        for other in candidates[1:]:
+            if not positions:
+                break
+            positions &= other
+        return sorted(positions)
+
+    def count(self, q: ReporterQueryParams | None = None) -> int:
+        """
+        Return the number of reporters matching the filters.
+        """
+        positions = self.matching(q)
+        return len(self._order) if positions is None else len(positions)
+
+    def search(
+        self,
+        q: ReporterQueryParams | None = None,
+        after: str | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[ReporterDTO]:
+        """
+        Return a page of the reporters matching the filters, in listing order.
+
+        If the username of a reporter is given in `after`, the page starts right
+        after that reporter. Raises a `KeyError` if that reporter does not exist.
+        """
+        positions = self.matching(q)
+        start = self._positions[after] + 1 if after is not None else 0
+        if positions is not None:
+            start = bisect_right(positions, start - 1)
+        start += skip
+        stop = start + limit if limit is not None else None
+
+        order = self._order
+        if positions is None:
+            usernames = order[start:stop]
+        else:
+            usernames = [order[position] for position in positions[start:stop]]
+        return [self._models[username] for username in usernames]
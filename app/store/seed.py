@@ -0,0 +1,442 @@
+import hashlib
+import inspect
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+from uuid import UUID
+
+from ..core import config
+from ..models.incident import IncidentDTO
+from .records import (
+    EPOCH,
+    MICROSECOND,
+    SEVERITY_CODES,
+    SEVERITIES,
+    STATUS_CODES,
+    STATUSES,
+    to_microseconds,
+)
+
+logger = logging.getLogger(__name__)
+
+# Identifies a seed snapshot file, and the version of its format
+MAGIC = b"BLSEED\x00\x03"
+
+# Magic, fingerprint of the generators of the data, build time, then number of
+# reporters, of incident authors and of incidents
+HEADER = struct.Struct("<8s16sqIII")
+
+# Fingerprint of snapshots not built from the sample data, which are never rebuilt
+NO_FINGERPRINT = bytes(16)
+
+# Fixed part of a reporter record: UUID, creation and update times, disabled
+# flag, then the byte lengths of the username, name, email, password hash and
+# company, whose UTF-8 bytes follow the fixed part
+REPORTER = struct.Struct("<16sqq?5I")
+REPORTER_STRINGS = ("username", "name", "email", "password", "company")
+
+# Fixed part of an author record, the username of the reporter of incidents: its
+# byte length, whose UTF-8 bytes follow
+AUTHOR = struct.Struct("<I")
+
+# Fixed part of an incident record: UUID, severity and status codes, position
+# of the author in the file, date, creation and update times, then the byte
+# lengths of the title and description, whose UTF-8 bytes follow the fixed part.
+# Codes and timestamps are those of the store's records, see `records`
+INCIDENT = struct.Struct("<16sBBIqqq2I")
+
+
+def _pack_strings(record: struct.Struct, *values, strings: Iterable[str]) -> bytes:
+    """
+    Pack the fixed part of a record followed by its strings, encoded as UTF-8.
+    """
+    encoded = [string.encode() for string in strings]
+    return record.pack(*values, *map(len, encoded)) + b"".join(encoded)
+
+
+def write_seed(
+    path: Path,
+    incidents: Iterable[IncidentDTO],
+    reporters: dict[str, dict],
+    fingerprint: bytes = NO_FINGERPRINT,
+) -> None:
+    """
+    Atomically write a seed snapshot of incidents and reporters.
+
+    Records are packed with `struct`, so the snapshot is compact and is read
+    back without parsing nor validating any text. The username of the reporter
+    of an incident is stored once in a table of authors, and incidents refer to
+    it by position, so an author shared by many incidents takes no more space.
+    The fingerprint of the generators of the data, see `sample_fingerprint`, is
+    stored along with the build time, so outdated snapshots can be rebuilt.
+    """
+    authors: dict[str, int] = {}  # Position of every author in the file
+    body = bytearray()
+    count = 0
+    for incident in incidents:
+        position = authors.setdefault(incident.reporter, len(authors))
+        body += _pack_strings(
+            INCIDENT,
+            incident.id.bytes,
+            SEVERITY_CODES[incident.severity],
+            STATUS_CODES[incident.status],
+            position,
+            to_microseconds(incident.date),
+            to_microseconds(incident.created_at),
+            to_microseconds(incident.updated_at),
+            strings=(incident.title, incident.description),
+        )
+        count += 1
+
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "wb") as file:
+        file.write(
+            HEADER.pack(
+                MAGIC,
+                fingerprint,
+                to_microseconds(datetime.now()),
+                len(reporters),
+                len(authors),
+                count,
+            )
+        )
+        for reporter in reporters.values():
+            file.write(
+                _pack_strings(
+                    REPORTER,
+                    reporter["id"].bytes,
+                    to_microseconds(reporter["created_at"]),
+                    to_microseconds(reporter["updated_at"]),
+                    reporter["disabled"],
+                    strings=(reporter[field] for field in REPORTER_STRINGS),
+                )
+            )
+        for author in authors:
+            file.write(_pack_strings(AUTHOR, strings=(author,)))
+        file.write(body)
+    os.replace(temporary, path)
+
+
+def _read_strings(buffer, offset: int, lengths: Iterable[int]) -> tuple[list, int]:
+    """
+    Decode consecutive UTF-8 strings of the given byte lengths.
+
+    Returns the strings and the offset right after the last one.
+    """
+    strings = []
+    for length in lengths:
+        strings.append(str(buffer[offset : offset + length], "utf-8"))
+        offset += length
+    return strings, offset
+
+
+def _read_reporters(buffer, count: int, offset: int) -> tuple[list[dict], int]:
+    """
+    Decode `count` reporter records starting at `offset`.
+
+    Returns the reporters in file order and the offset of the next record.
+    """
+    reporters = []
+    for _ in range(count):
+        id, created_at, updated_at, disabled, *lengths = REPORTER.unpack_from(
+            buffer, offset
+        )
+        fields, offset = _read_strings(buffer, offset + REPORTER.size, lengths)
+        reporters.append(
+            {
+                "id": UUID(bytes=id),
+                **dict(zip(REPORTER_STRINGS, fields)),
+                "disabled": disabled,
+                "created_at": EPOCH + created_at * MICROSECOND,
+                "updated_at": EPOCH + updated_at * MICROSECOND,
+            }
+        )
+    return reporters, offset
+
+
+def _read_authors(buffer, count: int, offset: int) -> tuple[list[str], int]:
+    """
+    Decode `count` author records starting at `offset`.
+
+    Returns the usernames of the authors in file order and the offset of the
+    next record.
+    """
+    authors = []
+    for _ in range(count):
+        lengths = AUTHOR.unpack_from(buffer, offset)
+        fields, offset = _read_strings(buffer, offset + AUTHOR.size, lengths)
+        authors.append(fields[0])
+    return authors, offset
+
+
+def _read_incidents(
+    buffer, count: int, offset: int, authors: list[str]
+) -> Iterator[IncidentDTO]:
+    """
+    Decode `count` incident records starting at `offset`, one at a time.
+
+    Models are built without validation, as the snapshot only holds values
+    that were valid when it was written. Incidents of the same author share a
+    single username string.
+    """
+    construct = IncidentDTO.model_construct
+    unpack_from = INCIDENT.unpack_from
+    size = INCIDENT.size
+
+    for _ in range(count):
+        (
+            id,
+            severity,
+            status,
+            author,
+            date,
+            created_at,
+            updated_at,
+            title_length,
+            description_length,
+        ) = unpack_from(buffer, offset)
+        offset += size
+        title = str(buffer[offset : offset + title_length], "utf-8")
+        offset += title_length
+        description = str(buffer[offset : offset + description_length], "utf-8")
+        offset += description_length
+        yield construct(
+            id=UUID(bytes=id),
+            title=title,
+            description=description,
+            severity=SEVERITIES[severity],
+            reporter=authors[author],
+            status=STATUSES[status],
+            date=EPOCH + date * MICROSECOND,
+            created_at=EPOCH + created_at * MICROSECOND,
+            updated_at=EPOCH + updated_at * MICROSECOND,
+        )
+
+
+def _iter_incidents(
+    path: Path, offset: int, author_count: int, incident_count: int
+) -> Iterator[IncidentDTO]:
+    """
+    Iterate over the incidents of a seed snapshot whose authors start at `offset`.
+
+    The file is mapped for as long as the iteration lasts.
+    """
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = memoryview(mapped)
+            try:
+                authors, offset = _read_authors(buffer, author_count, offset)
+                yield from _read_incidents(buffer, incident_count, offset, authors)
+            finally:
+                buffer.release()  # The map cannot be closed while exported
+
+
+def read_seed_header(path: Path) -> tuple[bytes, datetime] | None:
+    """
+    Read the fingerprint and the build time of a seed snapshot.
+
+    Returns `None` if the snapshot does not exist or was written in another format.
+    """
+    if not path.exists() or path.stat().st_size < HEADER.size:
+        return None
+    with open(path, "rb") as file:
+        magic, fingerprint, built_at, *_ = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        return None
+    return fingerprint, EPOCH + built_at * MICROSECOND
+
+
+def read_seed(
+    path: Path, incidents: bool = True
+) -> tuple[dict[str, dict], Iterator[IncidentDTO] | None] | None:
+    """
+    Read a seed snapshot, returning its reporters keyed by username and its incidents.
+
+    The file is read through a memory map, and reporters are stored first, so
+    they are read without touching the other records. The incidents are
+    returned as an iterator decoding them as they are consumed, or `None` with
+    `incidents=False`. Returns `None` if the snapshot does not exist or was
+    written in another format.
+    """
+    if not path.exists() or path.stat().st_size < HEADER.size:
+        return None
+
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = memoryview(mapped)
+            try:
+                magic, _, _, *counts = HEADER.unpack_from(buffer)
+                if magic != MAGIC:
+                    return None
+                reporter_count, author_count, incident_count = counts
+                reporters, offset = _read_reporters(buffer, reporter_count, HEADER.size)
+            finally:
+                buffer.release()  # The map cannot be closed while exported
+
+    loaded = None
+    if incidents:
+        loaded = _iter_incidents(path, offset, author_count, incident_count)
+    return {reporter["username"]: reporter for reporter in reporters}, loaded
+
+
+def _sample_generators() -> tuple:
+    """
+    Return the functions generating the sample reporters and incidents.
+
+    Imported here because the mock data lives next to the utilities, which
+    themselves use the storage engine.
+    """
+    from ..utils.incident import sample_incidents
+    from ..utils.reporter import sample_reporters
+
+    return sample_reporters, sample_incidents
+
+
+def sample_fingerprint() -> bytes:
+    """
+    Fingerprint the generators of the sample data, by hashing their source code.
+    """
+    source = "".join(map(inspect.getsource, _sample_generators()))
+    return hashlib.blake2b(source.encode(), digest_size=16).digest()
+
+
+def build_seed(path: Path) -> None:
+    """
+    Write a seed snapshot of the sample data, stamped with its fingerprint.
+    """
+    sample_reporters, sample_incidents = _sample_generators()
+    reporters = sample_reporters()
+    write_seed(path, sample_incidents(reporters), reporters, sample_fingerprint())
+
+
+class Seed:
+    """
+    Seed data of the storage engines, read from a snapshot file on first use.
+
+    Nothing is loaded when the application is imported: the reporters are read
+    the first time they are needed, and the incidents every time a storage
+    engine has to be filled with them (which never happens when a database or
+    journal already holds data).
+
+    If the snapshot file does not exist yet, it is built from the mock data of
+    the utilities and written for the next start. The mock data is dated
+    relative to the time it is built, so a snapshot of it is rebuilt once older
+    than `max_age` seconds, or once the generators of the mock data changed.
+    Snapshots of other data, such as the datasets of the benchmarks, are kept.
+    If a rebuilt snapshot cannot be written, the previous one is used.
+
+    The time spent reading the snapshot is recorded in `timings`, in seconds.
+    """
+
+    def __init__(self, path: str, max_age: float | None = None):
+        self.path = Path(path)  # Seed snapshot file
+        self.max_age = max_age  # Seconds before a snapshot of the mock data is stale
+        self.timings: dict[str, float] = {}  # Seconds spent on each load
+        self._reporters: dict[str, dict] | None = None  # Reporters, once read
+        self._checked = False  # Whether the snapshot is known to be current
+
+    def _outdated(self, header: tuple[bytes, datetime] | None) -> bool:
+        """
+        Tell whether a snapshot with the given header has to be rebuilt.
+        """
+        if header is None:
+            return True
+        fingerprint, built_at = header
+        if fingerprint == NO_FINGERPRINT:
+            return False
+        if fingerprint != sample_fingerprint():
+            return True
+        age = (datetime.now() - built_at).total_seconds()
+        return self.max_age is not None and age > self.max_age
+
+    def _ensure(self) -> None:
+        """
+        Build the snapshot file from the mock data if it is missing or outdated.
+        """
+        if self._checked:
+            return
+        header = read_seed_header(self.path)
+        if self._outdated(header):
+            started = time.perf_counter()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                build_seed(self.path)
+            except OSError:
+                if header is None:
+                    raise
+                logger.warning(
+                    "Could not rebuild the seed snapshot %s, using the previous one",
+                    self.path,
+                    exc_info=True,
+                )
+            else:
+                self.timings["build"] = time.perf_counter() - started
+                logger.info("Wrote the seed snapshot %s", self.path)
+        self._checked = True
+
+    def reporters(self) -> dict[str, dict]:
+        """
+        Return the seed reporters, keyed by username.
+
+        The same dictionary is returned on every call.
+        """
+        if self._reporters is None:
+            self._ensure()
+            started = time.perf_counter()
+            self._reporters, _ = read_seed(self.path, incidents=False)
+            self.timings["reporters"] = time.perf_counter() - started
+        return self._reporters
+
+    def incidents(self) -> Iterator[IncidentDTO]:
+        """
+        Iterate over the seed incidents.
+
+        The incidents are read from the snapshot as they are consumed, and not
+        kept, so a storage engine converting them into its own format never
+        holds them all as models. The recorded time only counts the reading,
+        not the work of the consumer in between.
+        """
+        self._ensure()
+        started = time.perf_counter()
+        _, incidents = read_seed(self.path)
+        elapsed = time.perf_counter() - started
+        count = 0
+        while True:
+            started = time.perf_counter()
+            incident = next(incidents, None)
+            elapsed += time.perf_counter() - started
+            if incident is None:
+                break
+            count += 1
+            yield incident
+
+        self.timings["incidents"] = elapsed
+        logger.info("Read %d seed incidents in %.3fs", count, elapsed)
+
+
+@lru_cache()
+def get_seed() -> Seed:
+    """
+    Return the seed data of the application.
+
+    The seed is read from the snapshot file set in the application settings.
+    """
+    settings = config.get_settings()
+    return Seed(settings.seed_path, settings.seed_max_age)
+
+
+if __name__ == "__main__":
+    # Build the seed snapshot ahead of time, for instance when building an image
+    # of the application: python -m app.store.seed [path]
+    logging.basicConfig(level=logging.INFO)
+    target = Path(sys.argv[1] if len(sys.argv) > 1 else config.get_settings().seed_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    build_seed(target)
+    logger.info("Wrote the seed snapshot %s", target)
@@ -0,0 +1,996 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable
+from uuid import UUID
+
+from ..models.incident import IncidentDTO, IncidentQueryParams
+from ..models.reporter import ReporterDTO, ReporterQueryParams
+from .base import (
+    MAX_VERSION,
+    IncidentRepository,
+    ReporterRepository,
+    Storage,
+    initial_version,
+)
+from .seed import Seed
+
+# Incident fields that can be changed by an update
+UPDATABLE_FIELDS = {"title", "description", "severity", "status", "reporter", "date"}
+
+# Reporter fields that can be changed by an update
+REPORTER_UPDATABLE_FIELDS = {"name", "email", "password", "company", "disabled"}
+
+# Number of values bound to a single statement, below the limit of SQLite
+MAX_PARAMETERS = 999
+
+# Greatest UUID, as stored: the position after every change made at a version
+MAX_UUID = str(UUID(int=(1 << 128) - 1))
+
+# Columns used to sort incidents, by sort field
+SORT_COLUMNS = {
+    "title": "title",
+    "reporter": "reporter_username",
+    "severity": "severity",
+    "date": "date",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+# Length of the timestamp prefix identifying a histogram bucket, by interval
+HISTOGRAM_PREFIXES = {"hour": len("YYYY-MM-DDTHH"), "day": len("YYYY-MM-DD")}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reporter_username TEXT NOT NULL,
+    date TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS incidents_title ON incidents (title, id);
+CREATE INDEX IF NOT EXISTS incidents_reporter ON incidents (reporter_username, id);
+CREATE INDEX IF NOT EXISTS incidents_severity ON incidents (severity, id);
+CREATE INDEX IF NOT EXISTS incidents_date ON incidents (date, id);
+CREATE INDEX IF NOT EXISTS incidents_created_at ON incidents (created_at, id);
+CREATE INDEX IF NOT EXISTS incidents_updated_at ON incidents (updated_at, id);
+CREATE INDEX IF NOT EXISTS incidents_severity_created_at
+    ON incidents (severity, created_at, id);
+CREATE INDEX IF NOT EXISTS incidents_status_created_at
+    ON incidents (status, created_at, id);
+
+CREATE TABLE IF NOT EXISTS reporters (
+    username TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL,
+    company TEXT NOT NULL,
+    disabled INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+-- Reporter filters compare companies and names regardless of case, and name
+-- prefixes are searched with LIKE, which can use an index with NOCASE collation
+CREATE INDEX IF NOT EXISTS reporters_company ON reporters (company COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS reporters_name ON reporters (name COLLATE NOCASE);
+
+-- Number of incidents for every combination of facets, kept up to date by
+-- triggers so facet counts never need a scan of the incidents
+CREATE TABLE IF NOT EXISTS incident_facets (
+    severity TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reporter_username TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (severity, status, reporter_username)
+);
+CREATE TRIGGER IF NOT EXISTS incident_facets_insert AFTER INSERT ON incidents
+BEGIN
+    INSERT INTO incident_facets VALUES (
+        NEW.severity, NEW.status, NEW.reporter_username, 1
+    ) ON CONFLICT DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS incident_facets_delete AFTER DELETE ON incidents
+BEGIN
+    UPDATE incident_facets SET count = count - 1
+    WHERE severity = OLD.severity AND status = OLD.status
+        AND reporter_username = OLD.reporter_username;
+    DELETE FROM incident_facets WHERE count = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS incident_facets_update
+AFTER UPDATE OF severity, status, reporter_username ON incidents
+BEGIN
+    UPDATE incident_facets SET count = count - 1
+    WHERE severity = OLD.severity AND status = OLD.status
+        AND reporter_username = OLD.reporter_username;
+    INSERT INTO incident_facets VALUES (
+        NEW.severity, NEW.status, NEW.reporter_username, 1
+    ) ON CONFLICT DO UPDATE SET count = count + 1;
+    DELETE FROM incident_facets WHERE count = 0;
+END;
+
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+-- Incidents deleted recently, with the version they were deleted at, so delta
+-- syncs can tell clients about deletions. Tombstones older than the retention
+-- period are dropped, and the highest dropped version kept as the 'tombstones'
+-- version, below which changes are incomplete
+CREATE TABLE IF NOT EXISTS incident_tombstones (
+    id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    deleted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS incident_tombstones_version
+    ON incident_tombstones (version, id);
+CREATE INDEX IF NOT EXISTS incident_tombstones_deleted_at
+    ON incident_tombstones (deleted_at);
+"""
+
+# Increment a version counter of the `versions` table and return its new value
+BUMP_VERSION = "UPDATE versions SET value = value + 1 WHERE name = ? RETURNING value"
+
+INSERT_INCIDENT = """
+INSERT INTO incidents (
+    id, title, description, severity, status, reporter_username,
+    date, created_at, updated_at, version
+) VALUES (
+    ?, ?, ?, ?, ?, ?, ?, ?, ?,
+    (SELECT value FROM versions WHERE name = 'incidents')
+)
+"""
+
+INSERT_REPORTER = """
+INSERT INTO reporters (
+    username, id, name, email, password, company, disabled, created_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _timestamp(value: datetime) -> str:
+    """
+    Format a datetime as a fixed width ISO 8601 string that sorts chronologically.
+
+    Aware datetimes are converted to naive local time first, as the memory
+    engine does, so that every stored value shares the same format.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
+def _incident_params(incident: IncidentDTO) -> tuple:
+    """
+    Convert an incident into the parameters of `INSERT_INCIDENT`.
+    """
+    return (
+        str(incident.id),
+        incident.title,
+        incident.description,
+        incident.severity.value,
+        incident.status.value,
+        incident.reporter,
+        _timestamp(incident.date),
+        _timestamp(incident.created_at),
+        _timestamp(incident.updated_at),
+    )
+
+
+def _column_value(field: str, value: Any) -> Any:
+    """
+    Convert an incident field value into the value stored in its column.
+    """
+    if isinstance(value, datetime):
+        return _timestamp(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, "value"):  # Enumerations are stored by value
+        return value.value
+    return value
+
+
+def _filters(q: IncidentQueryParams) -> tuple[list[str], list]:
+    """
+    Translate incident query parameters into SQL conditions and their parameters.
+    """
+    where = []  # SQL conditions an incident must satisfy
+    params = []  # Parameters bound to the conditions
+
+    # Substring filters are case insensitive, like in the memory backend
+    if q.title:
+        where.append("instr(lower(title), ?) > 0")
+        params.append(q.title.lower())
+    if q.description:
+        where.append("instr(lower(description), ?) > 0")
+        params.append(q.description.lower())
+    if q.q:
+        where.append("(instr(lower(title), ?) > 0 OR instr(lower(description), ?) > 0)")
+        params += [q.q.lower(), q.q.lower()]
+    # Usernames are matched on the facet counts, which hold each of them once,
+    # and the incidents of the matching ones found through the reporter index
+    if q.reporter:
+        where.append(
+            "reporter_username IN (SELECT reporter_username FROM incident_facets"
+            " WHERE instr(lower(reporter_username), ?) > 0)"
+        )
+        params.append(q.reporter.lower())
+    if q.severity:
+        where.append("severity = ?")
+        params.append(q.severity.value)
+    if q.status:
+        where.append("status = ?")
+        params.append(q.status.value)
+    # Timestamps are stored as fixed width strings, so they compare chronologically
+    for field, (low, high) in q.ranges().items():
+        if low is not None:
+            where.append(f"{SORT_COLUMNS[field]} >= ?")
+            params.append(_timestamp(low))
+        if high is not None:
+            where.append(f"{SORT_COLUMNS[field]} <= ?")
+            params.append(_timestamp(high))
+    return where, params
+
+
+def _like_prefix(value: str) -> str:
+    """
+    Build a LIKE pattern matching the strings starting with a value.
+    """
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def _reporter_filters(q: ReporterQueryParams | None) -> tuple[list[str], list]:
+    """
+    Translate reporter query parameters into SQL conditions and their parameters.
+    """
+    where = []  # SQL conditions a reporter must satisfy
+    params = []  # Parameters bound to the conditions
+    if q is None:
+        return where, params
+
+    if q.username:
+        where.append("username = ?")
+        params.append(q.username)
+    if q.company:
+        where.append("company = ? COLLATE NOCASE")
+        params.append(q.company)
+    # The first name starts the name, and last names follow a space
+    if q.first_name:
+        where.append("name LIKE ? ESCAPE '\\'")
+        params.append(_like_prefix(q.first_name))
+    if q.last_name:
+        where.append("name LIKE ? ESCAPE '\\'")
+        params.append("% " + _like_prefix(q.last_name))
+    return where, params
+
+
+def _row_to_incident(row: sqlite3.Row) -> IncidentDTO:
+    """
+    Build an `IncidentDTO` from a row of the incidents table.
+    """
+    return IncidentDTO(
+        id=UUID(row["id"]),
+        title=row["title"],
+        description=row["description"],
+        severity=row["severity"],
+        status=row["status"],
+        reporter=row["reporter_username"],
+        date=datetime.fromisoformat(row["date"]),
+        created_at=datetime.fromisoformat(row["created_at"]),
+        updated_at=datetime.fromisoformat(row["updated_at"]),
+    )
+
+
+def _row_to_reporter(row: sqlite3.Row) -> dict:
+    """
+    Build a reporter dictionary, in the format of the seed reporters, from a row.
+    """
+    return {
+        "id": UUID(row["id"]),
+        "username": row["username"],
+        "name": row["name"],
+        "email": row["email"],
+        "password": row["password"],
+        "company": row["company"],
+        "disabled": bool(row["disabled"]),
+        "created_at": datetime.fromisoformat(row["created_at"]),
+        "updated_at": datetime.fromisoformat(row["updated_at"]),
+    }
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections used from a dedicated thread pool.
+
+    Queries run in worker threads so they never block the event loop. The
+    number of connections, and therefore of concurrent queries, is capped by
+    the pool size; callers wait asynchronously for a free connection.
+
+    Connections are opened in WAL mode, which lets readers proceed while a
+    write is in progress, and keep a cache of prepared statements. Queries are
+    built from a fixed set of SQL strings so their statements are reused.
+    """
+
+    def __init__(self, path: str, size: int, statement_cache: int = 256):
+        self._path = path  # Path of the database file
+        self._size = size  # Maximum number of connections
+        self._statement_cache = statement_cache  # Prepared statements per connection
+        self._executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="sqlite"
+        )  # Threads running the queries
+        self._idle: asyncio.Queue[sqlite3.Connection] = asyncio.Queue()
+        self._opened = 0  # Number of connections opened so far
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open and configure a new connection. Runs in a worker thread.
+        """
+        connection = sqlite3.connect(
+            self._path,
+            timeout=30,  # Wait for locks held by other writers
+            check_same_thread=False,  # Connections move between worker threads
+            cached_statements=self._statement_cache,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    async def _acquire(self) -> sqlite3.Connection:
+        """
+        Take an idle connection, opening a new one while below the pool size.
+        """
+        if self._idle.empty() and self._opened < self._size:
+            self._opened += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._connect
+                )
+            except BaseException:
+                self._opened -= 1
+                raise
+        return await self._idle.get()
+
+    async def run(self, function: Callable, *args) -> Any:
+        """
+        Run `function(connection, *args)` in a worker thread and return its result.
+        """
+        connection = await self._acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, function, connection, *args
+            )
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self) -> None:
+        """
+        Close every idle connection and stop the worker threads.
+        """
+        loop = asyncio.get_running_loop()
+        while not self._idle.empty():
+            connection = self._idle.get_nowait()
+            await loop.run_in_executor(self._executor, connection.close)
+            self._opened -= 1
+        self._executor.shutdown(wait=True)
+
+
+class SQLiteDatabase:
+    """
+    SQLite database shared by the incident and reporter repositories.
+
+    The schema is created, and seeded with the given seed data if the tables
+    are empty, the first time the database is used. The seed data is not read
+    at all when the tables already hold data.
+    """
+
+    def __init__(self, path: str, pool_size: int, seed: Seed | None = None):
+        self.pool = ConnectionPool(path, pool_size)
+        self._seed = seed  # Data stored in a new database
+        self._ready = False  # Whether the schema has been created
+        self._lock = asyncio.Lock()  # Serializes the schema creation
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        """
+        Create the tables and indexes, then seed the empty tables.
+        """
+        connection.executescript(SCHEMA)
+        with connection:
+            columns = [
+                row["name"]
+                for row in connection.execute("PRAGMA table_info(incidents)")
+            ]
+            if "version" not in columns:  # Database created before versioning
+                connection.execute(
+                    "ALTER TABLE incidents ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+                )
+            # Delta syncs read the incidents in the order of their last change
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS incidents_version ON incidents (version, id)"
+            )
+            # Incidents used to store a copy of their reporter, as JSON
+            if "reporter" in columns:
+                connection.execute("ALTER TABLE incidents DROP COLUMN reporter")
+            # Count the incidents of a database created before the facet counts
+            if not connection.execute(
+                "SELECT 1 FROM incident_facets LIMIT 1"
+            ).fetchone():
+                connection.execute(
+                    "INSERT INTO incident_facets SELECT severity, status,"
+                    " reporter_username, COUNT(*) FROM incidents GROUP BY 1, 2, 3"
+                )
+            # Versions start from the current time in microseconds, so they keep
+            # increasing even if the database file is replaced by a new one
+            connection.executemany(
+                "INSERT OR IGNORE INTO versions (name, value) VALUES (?, ?)",
+                [("incidents", initial_version()), ("reporters", initial_version())],
+            )
+            self._renumber_versions(connection)
+            # Deletions were not recorded before the tombstones, and incidents
+            # stored before versioning only show in delta syncs from scratch
+            connection.execute(
+                "INSERT OR IGNORE INTO versions (name, value)"
+                " SELECT 'tombstones', value FROM versions WHERE name = 'incidents'"
+            )
+            connection.execute(
+                "UPDATE incidents SET version ="
+                " (SELECT value FROM versions WHERE name = 'incidents')"
+                " WHERE version = 0"
+            )
+            if self._seed is None:
+                return
+            if not connection.execute("SELECT 1 FROM incidents LIMIT 1").fetchone():
+                connection.executemany(
+                    INSERT_INCIDENT, map(_incident_params, self._seed.incidents())
+                )
+            if not connection.execute("SELECT 1 FROM reporters LIMIT 1").fetchone():
+                connection.executemany(
+                    INSERT_REPORTER,
+                    (
+                        (
+                            reporter["username"],
+                            str(reporter["id"]),
+                            reporter["name"],
+                            reporter["email"],
+                            reporter["password"],
+                            reporter["company"],
+                            int(reporter["disabled"]),
+                            _timestamp(reporter["created_at"]),
+                            _timestamp(reporter["updated_at"]),
+                        )
+                        for reporter in self._seed.reporters().values()
+                    ),
+                )
+
+    @staticmethod
+    def _renumber_versions(connection: sqlite3.Connection) -> None:
+        """
+        Renumber the versions of a database above `MAX_VERSION`.
+
+        Versions used to start from the current time in nanoseconds. The
+        versions of incidents and their tombstones are shifted down together,
+        which keeps their order, while the reporter version, which is only
+        compared for equality, starts over. Runs within the schema creation.
+        """
+        start = connection.execute(
+            "SELECT MIN(version) FROM ("
+            " SELECT value AS version FROM versions WHERE name != 'reporters'"
+            " UNION ALL SELECT version FROM incidents"
+            " UNION ALL SELECT version FROM incident_tombstones"
+            ") WHERE version > ?",
+            (MAX_VERSION,),
+        ).fetchone()[0]
+        if start is not None:
+            shift = start - initial_version()
+            connection.execute(
+                "UPDATE versions SET value = value - ?"
+                " WHERE name != 'reporters' AND value > ?",
+                (shift, MAX_VERSION),
+            )
+            for table in ("incidents", "incident_tombstones"):
+                connection.execute(
+                    f"UPDATE {table} SET version = version - ? WHERE version > ?",
+                    (shift, MAX_VERSION),
+                )
+        connection.execute(
+            "UPDATE versions SET value = ? WHERE name = 'reporters' AND value > ?",
+            (initial_version(), MAX_VERSION),
+        )
+
+    async def open(self) -> None:
+        """
+        Create the schema if it has not been created yet.
+        """
+        async with self._lock:
+            if not self._ready:
+                await self.pool.run(self._create_schema)
+                self._ready = True
+
+    async def run(self, function: Callable, *args) -> Any:
+        """
+        Run `function(connection, *args)` on a pooled connection.
+        """
+        if not self._ready:
+            await self.open()
+        return await self.pool.run(function, *args)
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+class SQLiteIncidentRepository(IncidentRepository):
+    """
+    Incident repository storing incidents in a SQLite table.
+
+    Every sortable field has an index on `(column, id)`, so sorted listings,
+    cursors and time windows are served by index range scans. Equality filters
+    on severity and status have composite indexes with the default `created_at`
+    sort order.
+
+    Deleted incidents leave a row in the tombstones table, in the same
+    transaction. Tombstones are kept for `tombstone_retention` seconds if given,
+    and the expired ones are dropped whenever incidents are deleted.
+    """
+
+    def __init__(
+        self, database: SQLiteDatabase, tombstone_retention: float | None = None
+    ):
+        self.database = database
+        self.tombstone_retention = tombstone_retention  # Seconds tombstones are kept
+
+    def _expiry(self) -> str | None:
+        """
+        Return the time before which tombstones expire, or `None` if they don't.
+        """
+        if self.tombstone_retention is None:
+            return None
+        return _timestamp(datetime.now() - timedelta(seconds=self.tombstone_retention))
+
+    @staticmethod
+    def _get(connection: sqlite3.Connection, id: str) -> IncidentDTO | None:
+        row = connection.execute(
+            "SELECT * FROM incidents WHERE id = ?", (id,)
+        ).fetchone()
+        return _row_to_incident(row) if row else None
+
+    async def get(self, id: UUID) -> IncidentDTO | None:
+        return await self.database.run(self._get, str(id))
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, incident: IncidentDTO) -> bool:
+        """
+        Insert an incident, returning `False` if its UUID is already stored.
+        """
+        try:
+            connection.execute(INSERT_INCIDENT, _incident_params(incident))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    @classmethod
+    def _add(cls, connection: sqlite3.Connection, incident: IncidentDTO) -> None:
+        with connection:
+            connection.execute(BUMP_VERSION, ("incidents",))
+            if not cls._insert(connection, incident):
+                raise KeyError(f"Incident {incident.id} already exists")
+
+    async def add(self, incident: IncidentDTO) -> IncidentDTO:
+        await self.database.run(self._add, incident)
+        return incident
+
+    @classmethod
+    def _add_many(
+        cls, connection: sqlite3.Connection, incidents: list[IncidentDTO]
+    ) -> list[IncidentDTO | None]:
+        with connection:  # The whole batch is a single transaction
+            connection.execute(BUMP_VERSION, ("incidents",))
+            return [
+                incident if cls._insert(connection, incident) else None
+                for incident in incidents
+            ]
+
+    async def add_many(self, incidents: list[IncidentDTO]) -> list[IncidentDTO | None]:
+        return await self.database.run(self._add_many, incidents)
+
+    @classmethod
+    def _apply_update(
+        cls, connection: sqlite3.Connection, id: str, changes: dict[str, Any]
+    ) -> IncidentDTO | None:
+        """
+        Update an incident within the current transaction.
+        """
+        unknown = changes.keys() - UPDATABLE_FIELDS
+        if unknown:
+            raise KeyError(f"Cannot update incident fields {sorted(unknown)}")
+
+        changes = {**changes, "updated_at": datetime.now()}
+        # The reporter is stored in its sort column, `reporter_username`
+        columns = [f"{SORT_COLUMNS.get(field, field)} = ?" for field in changes]
+        params = [_column_value(field, value) for field, value in changes.items()]
+
+        found = connection.execute("SELECT 1 FROM incidents WHERE id = ?", (id,))
+        if found.fetchone() is None:
+            return None
+        (version,) = connection.execute(BUMP_VERSION, ("incidents",)).fetchone()
+        connection.execute(
+            f"UPDATE incidents SET {', '.join(columns)}, version = ? WHERE id = ?",
+            (*params, version, id),
+        )
+        return cls._get(connection, id)
+
+    @classmethod
+    def _update(
+        cls, connection: sqlite3.Connection, id: str, changes: dict[str, Any]
+    ) -> IncidentDTO | None:
+        with connection:
+            return cls._apply_update(connection, id, changes)
+
+    async def update(self, id: UUID, changes: dict[str, Any]) -> IncidentDTO | None:
+        return await self.database.run(self._update, str(id), changes)
+
+    @classmethod
+    def _update_many(
+        cls, connection: sqlite3.Connection, changes: list[tuple[str, dict]]
+    ) -> list[IncidentDTO | None]:
+        with connection:  # The whole batch is a single transaction
+            return [cls._apply_update(connection, id, fields) for id, fields in changes]
+
+    async def update_many(
+        self, changes: list[tuple[UUID, dict[str, Any]]]
+    ) -> list[IncidentDTO | None]:
+        return await self.database.run(
+            self._update_many, [(str(id), fields) for id, fields in changes]
+        )
+
+    @classmethod
+    def _apply_remove(
+        cls, connection: sqlite3.Connection, id: str
+    ) -> IncidentDTO | None:
+        """
+        Remove an incident within the current transaction.
+        """
+        incident = cls._get(connection, id)
+        if incident is not None:
+            (version,) = connection.execute(BUMP_VERSION, ("incidents",)).fetchone()
+            connection.execute("DELETE FROM incidents WHERE id = ?", (id,))
+            connection.execute(
+                "INSERT OR REPLACE INTO incident_tombstones VALUES (?, ?, ?)",
+                (id, version, _timestamp(datetime.now())),
+            )
+        return incident
+
+    @staticmethod
+    def _compact(connection: sqlite3.Connection, expiry: str | None) -> None:
+        """
+        Drop the tombstones of incidents deleted before `expiry`, within the
+        current transaction, and raise the 'tombstones' version to theirs.
+        """
+        if expiry is None:
+            return
+        # Only the expired tombstones are read, through the index on their time
+        (version,) = connection.execute(
+            "SELECT max(version) FROM incident_tombstones"
+            " INDEXED BY incident_tombstones_deleted_at WHERE deleted_at < ?",
+            (expiry,),
+        ).fetchone()
+        if version is None:
+            return
+        connection.execute(
+            "UPDATE versions SET value = max(value, ?) WHERE name = 'tombstones'",
+            (version,),
+        )
+        connection.execute(
+            "DELETE FROM incident_tombstones WHERE deleted_at < ?", (expiry,)
+        )
+
+    @classmethod
+    def _remove(
+        cls, connection: sqlite3.Connection, id: str, expiry: str | None
+    ) -> IncidentDTO | None:
+        with connection:
+            incident = cls._apply_remove(connection, id)
+            cls._compact(connection, expiry)
+            return incident
+
+    async def remove(self, id: UUID) -> IncidentDTO | None:
+        return await self.database.run(self._remove, str(id), self._expiry())
+
+    @classmethod
+    def _remove_many(
+        cls, connection: sqlite3.Connection, ids: list[str], expiry: str | None
+    ) -> list[IncidentDTO | None]:
+        with connection:  # The whole batch is a single transaction
+            incidents = [cls._apply_remove(connection, id) for id in ids]
+            cls._compact(connection, expiry)
+            return incidents
+
+    async def remove_many(self, ids: list[UUID]) -> list[IncidentDTO | None]:
+        return await self.database.run(
+            self._remove_many, [str(id) for id in ids], self._expiry()
+        )
+
+    @staticmethod
+    def _count(connection: sqlite3.Connection) -> int:
+        return connection.execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+
+    async def count(self) -> int:
+        return await self.database.run(self._count)
+
+    @staticmethod
+    def _version(connection: sqlite3.Connection, id: str | None) -> int | None:
+        if id is None:
+            query, params = "SELECT value FROM versions WHERE name = 'incidents'", ()
+        else:
+            query, params = "SELECT version FROM incidents WHERE id = ?", (id,)
+        row = connection.execute(query, params).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _facets(
+        connection: sqlite3.Connection, q: IncidentQueryParams
+    ) -> list[tuple[str, str, str, int]]:
+        where, params = _filters(q)
+        if q.q or q.title or q.description or q.ranges():
+            # Substring filters and time windows need the incidents themselves
+            sql = (
+                "SELECT severity, status, reporter_username, COUNT(*) FROM incidents"
+                f" WHERE {' AND '.join(where)} GROUP BY 1, 2, 3"
+            )
+        else:
+            sql = "SELECT * FROM incident_facets"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+        return [tuple(row) for row in connection.execute(sql, params)]
+
+    async def facets(self, q: IncidentQueryParams) -> list[tuple[str, str, str, int]]:
+        return await self.database.run(self._facets, q)
+
+    @staticmethod
+    def _histogram(
+        connection: sqlite3.Connection, q: IncidentQueryParams, field: str, prefix: int
+    ) -> list[tuple[datetime, int]]:
+        where, params = _filters(q)
+        sql = f"SELECT substr({SORT_COLUMNS[field]}, 1, ?), COUNT(*) FROM incidents"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " GROUP BY 1 ORDER BY 1"
+        rows = connection.execute(sql, [prefix, *params])
+        return [(datetime.fromisoformat(bucket), count) for bucket, count in rows]
+
+    async def histogram(
+        self, q: IncidentQueryParams, field: str, interval: str
+    ) -> list[tuple[datetime, int]]:
+        return await self.database.run(
+            self._histogram, q, field, HISTOGRAM_PREFIXES[interval]
+        )
+
+    async def version(self, id: UUID | None = None) -> int | None:
+        return await self.database.run(
+            self._version, str(id) if id is not None else None
+        )
+
+    @staticmethod
+    def _changes(
+        connection: sqlite3.Connection,
+        after: tuple[int, str],
+        limit: int,
+        since: int,
+    ) -> tuple[int, list[tuple[int, IncidentDTO]], list[tuple[int, UUID, datetime]]]:
+        # Every table is read from the same snapshot of the database, so no
+        # change committed meanwhile can be skipped by the merge of the two
+        with connection:
+            connection.execute("BEGIN")
+            (horizon,) = connection.execute(
+                "SELECT value FROM versions WHERE name = 'tombstones'"
+            ).fetchone()
+            rows = connection.execute(
+                "SELECT * FROM incidents WHERE (version, id) > (?, ?)"
+                " ORDER BY version, id LIMIT ?",
+                (*after, limit),
+            ).fetchall()
+            tombstones = connection.execute(
+                "SELECT version, id, deleted_at FROM incident_tombstones"
+                " WHERE (version, id) > (?, ?) ORDER BY version, id LIMIT ?",
+                (*max(after, (since, MAX_UUID)), limit),
+            ).fetchall()
+        return (
+            horizon,
+            [(row["version"], _row_to_incident(row)) for row in rows],
+            [
+                (version, UUID(id), datetime.fromisoformat(deleted_at))
+                for version, id, deleted_at in tombstones
+            ],
+        )
+
+    async def changes(
+        self, after: tuple[int, UUID], limit: int, since: int = 0
+    ) -> tuple[int, list[tuple[int, IncidentDTO]], list[tuple[int, UUID, datetime]]]:
+        version, id = after
+        return await self.database.run(self._changes, (version, str(id)), limit, since)
+
+    @staticmethod
+    def _search(
+        connection: sqlite3.Connection, sql: str, params: list
+    ) -> list[IncidentDTO]:
+        return [_row_to_incident(row) for row in connection.execute(sql, params)]
+
+    async def search(
+        self,
+        q: IncidentQueryParams,
+        sort_by: str,
+        reverse: bool,
+        after: tuple | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[IncidentDTO]:
+        where, params = _filters(q)
+
+        column = SORT_COLUMNS[sort_by]
+        if after is not None:
+            key, id = after
+            where.append(f"({column}, id) {'<' if reverse else '>'} (?, ?)")
+            params += [_column_value(sort_by, key), str(id)]
+
+        direction = "DESC" if reverse else "ASC"
+        sql = "SELECT * FROM incidents"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {column} {direction}, id {direction} LIMIT ? OFFSET ?"
+        params += [limit if limit is not None else -1, skip]
+
+        return await self.database.run(self._search, sql, params)
+
+
+class SQLiteReporterRepository(ReporterRepository):
+    """
+    Reporter repository storing reporters in a SQLite table.
+
+    The listing order is the insertion order, given by the table's rowid.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    @staticmethod
+    def _get(connection: sqlite3.Connection, username: str) -> dict | None:
+        row = connection.execute(
+            "SELECT * FROM reporters WHERE username = ?", (username,)
+        ).fetchone()
+        return _row_to_reporter(row) if row else None
+
+    async def get(self, username: str) -> dict | None:
+        return await self.database.run(self._get, username)
+
+    @staticmethod
+    def _get_many(connection: sqlite3.Connection, usernames: list[str]) -> dict:
+        reporters = {}
+        for start in range(0, len(usernames), MAX_PARAMETERS):
+            chunk = usernames[start : start + MAX_PARAMETERS]
+            rows = connection.execute(
+                "SELECT * FROM reporters WHERE username IN"
+                f" ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            reporters.update((row["username"], _row_to_reporter(row)) for row in rows)
+        return reporters
+
+    async def get_many(self, usernames: Iterable[str]) -> dict[str, dict]:
+        usernames = list(set(usernames))
+        if not usernames:
+            return {}
+        return await self.database.run(self._get_many, usernames)
+
+    @classmethod
+    def _update(
+        cls, connection: sqlite3.Connection, username: str, changes: dict[str, Any]
+    ) -> dict | None:
+        unknown = changes.keys() - REPORTER_UPDATABLE_FIELDS
+        if unknown:
+            raise KeyError(f"Cannot update reporter fields {sorted(unknown)}")
+
+        changes = {**changes, "updated_at": datetime.now()}
+        columns = [f"{field} = ?" for field in changes]
+        params = [_column_value(field, value) for field, value in changes.items()]
+
+        with connection:
+            cursor = connection.execute(
+                f"UPDATE reporters SET {', '.join(columns)} WHERE username = ?",
+                (*params, username),
+            )
+            if not cursor.rowcount:
+                return None
+            connection.execute(BUMP_VERSION, ("reporters",))
+            return cls._get(connection, username)
+
+    async def update(self, username: str, changes: dict[str, Any]) -> dict | None:
+        return await self.database.run(self._update, username, changes)
+
+    @staticmethod
+    def _count(connection: sqlite3.Connection, q: ReporterQueryParams | None) -> int:
+        where, params = _reporter_filters(q)
+        sql = "SELECT COUNT(*) FROM reporters"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return connection.execute(sql, params).fetchone()[0]
+
+    async def count(self, q: ReporterQueryParams | None = None) -> int:
+        return await self.database.run(self._count, q)
+
+    @staticmethod
+    def _version(connection: sqlite3.Connection) -> int:
+        return connection.execute(
+            "SELECT value FROM versions WHERE name = 'reporters'"
+        ).fetchone()[0]
+
+    async def version(self) -> int:
+        return await self.database.run(self._version)
+
+    @staticmethod
+    def _search(
+        connection: sqlite3.Connection,
+        q: ReporterQueryParams | None,
+        after: str | None,
+        skip: int,
+        limit: int,
+    ) -> list[ReporterDTO]:
+        position = 0
+        if after is not None:
+            row = connection.execute(
+                "SELECT rowid FROM reporters WHERE username = ?", (after,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(after)
+            position = row[0]
+
+        where, params = _reporter_filters(q)
+        rows = connection.execute(
+            f"SELECT * FROM reporters WHERE {' AND '.join(['rowid > ?', *where])}"
+            " ORDER BY rowid LIMIT ? OFFSET ?",
+            (position, *params, limit, skip),
+        )
+        return [ReporterDTO(**_row_to_reporter(row)) for row in rows]
+
+    async def search(
+        self,
+        q: ReporterQueryParams | None = None,
+        after: str | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+    ) -> list[ReporterDTO]:
+        return await self.database.run(
+            self._search, q, after, skip, limit if limit is not None else -1
+        )
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage engine keeping incidents and reporters in a SQLite database file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int,
+        seed: Seed | None = None,
+        tombstone_retention: float | None = None,
+    ):
+        self.database = SQLiteDatabase(path, pool_size, seed)
+        super().__init__(
+            SQLiteIncidentRepository(self.database, tombstone_retention),
+            SQLiteReporterRepository(self.database),
+        )
+
+    async def open(self) -> None:
+        await self.database.open()
+
+    async def close(self) -> None:
+        await self.database.close()
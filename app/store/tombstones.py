@@ -0,0 +1,85 @@
+from bisect import bisect_left
+from typing import Iterable
+
+
+class TombstoneLog:
+    """
+    Log of the incidents deleted from a store, kept for delta syncs.
+
+    A tombstone is a `(version, id, deleted_at)` tuple holding the version of
+    the store the incident was deleted at, the integer value of its UUID and
+    the time of the deletion in microseconds. Tombstones are kept in a list
+    ordered by `(version, id)`, so the deletions following a position are found
+    by binary search. Only the latest deletion of an incident is kept.
+
+    Versions increase with time, so the list is ordered by deletion time as
+    well: the tombstones older than the retention period are a prefix of the
+    list, which is cut off whenever new deletions are recorded. `horizon` is
+    the highest version whose tombstones may have been dropped, either by this
+    compaction or because they were never recorded, when the content of the
+    store was replaced; changes since an older version cannot be told apart
+    from a complete sync anymore.
+    """
+
+    def __init__(self, retention: int | None = None):
+        self.retention = retention  # Microseconds tombstones are kept, if bounded
+        self.horizon = 0  # Highest version whose tombstones may be missing
+        self._entries: list[tuple[int, int, int]] = []  # Ordered tombstones
+        self._versions: dict[int, int] = {}  # Version of the tombstone of an id
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset(self, version: int) -> None:
+        """
+        Drop every tombstone, when the content of the store is replaced at the
+        given version.
+        """
+        self._entries = []
+        self._versions = {}
+        self.horizon = version
+
+    def add(self, ids: Iterable[int], version: int, deleted_at: int) -> None:
+        """
+        Record the deletion of incidents at the given version and time, then
+        drop the tombstones that have outlived the retention period.
+        """
+        entries = self._entries
+        for id in sorted(ids):
+            previous = self._versions.get(id)
+            if previous is not None:
+                # The incident was deleted before, and stored again since
+                del entries[bisect_left(entries, (previous, id))]
+            entries.append((version, id, deleted_at))
+            self._versions[id] = version
+        if self.retention is not None:
+            self.compact(deleted_at - self.retention)
+
+    def compact(self, before: int) -> None:
+        """
+        Drop the tombstones of the incidents deleted before the given time.
+
+        Only the expired prefix of the list is read, so the cost depends on the
+        number of dropped tombstones.
+        """
+        entries = self._entries
+        count = 0
+        while count < len(entries) and entries[count][2] < before:
+            count += 1
+        if not count:
+            return
+        self.horizon = max(self.horizon, entries[count - 1][0])
+        for _, id, _ in entries[:count]:
+            del self._versions[id]
+        del entries[:count]
+
+    def after(
+        self, position: tuple[int, int], limit: int | None = None
+    ) -> list[tuple[int, int, int]]:
+        """
+        Return the tombstones following a `(version, id)` position, in order.
+        """
+        entries = self._entries
+        start = bisect_left(entries, (position[0], position[1] + 1))
+        stop = start + limit if limit is not None else None
+        return entries[start:stop]
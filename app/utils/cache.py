@@ -0,0 +1,281 @@
+from collections import OrderedDict
+from functools import lru_cache
+from time import time
+from typing import Any, Hashable
+from uuid import UUID
+
+import orjson
+
+from ..core import config
+from ..models.incident import IncidentDTO
+from ..models.reporter import Reporter, ReporterDTO
+
+
+class VerifiedToken:
+    """
+    Result of verifying an access token.
+
+    This class holds the verified JWT claims along with the reporter the token
+    was issued to, both as a `ReporterDTO` and as a basic `Reporter`, so that
+    neither model needs to be rebuilt while the token stays cached.
+    """
+
+    __slots__ = ("claims", "reporter", "principal", "expires_at")
+
+    def __init__(
+        self, claims: dict[str, Any], reporter: ReporterDTO, expires_at: float
+    ):
+        self.claims = claims  # Verified JWT claims
+        self.reporter = reporter  # Reporter the token was issued to
+        self.principal = Reporter(**reporter.model_dump())  # Basic reporter
+        self.expires_at = expires_at  # Time after which the entry is stale
+
+
+class TokenCache:
+    """
+    Least recently used cache of verified access tokens, with expiration.
+
+    Entries expire after a time-to-live, and never later than the expiration
+    claim of their token, so an expired token is always verified again and
+    rejected. The tokens of every reporter are tracked, which allows dropping
+    them all when the reporter is changed or disabled.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize  # Maximum number of cached tokens
+        self.ttl = ttl  # Seconds a verified token stays cached
+        self._entries: OrderedDict[str, VerifiedToken] = OrderedDict()
+        self._tokens: dict[str, set[str]] = {}  # Cached tokens of each username
+        self.hits = 0  # Lookups answered from the cache
+        self.misses = 0  # Lookups of tokens that had to be verified
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token: str) -> VerifiedToken | None:
+        """
+        Return the cached verification of a token, or `None` if it is not cached.
+        """
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time():
+            self.misses += 1
+            self._discard(token)
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(token)  # Mark as most recently used
+        return entry
+
+    def put(
+        self, token: str, claims: dict[str, Any], reporter: ReporterDTO
+    ) -> VerifiedToken:
+        """
+        Cache the verification of a token and return the cached entry.
+        """
+        expires_at = time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+
+        entry = VerifiedToken(claims, reporter, expires_at)
+        if self.maxsize <= 0:
+            return entry
+
+        self._discard(token)
+        self._entries[token] = entry
+        self._tokens.setdefault(reporter.username, set()).add(token)
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))  # Evict least recently used
+        return entry
+
+    def invalidate(self, username: str) -> None:
+        """
+        Drop every cached token issued to a reporter.
+        """
+        for token in self._tokens.pop(username, ()):
+            del self._entries[token]
+
+    def clear(self) -> None:
+        """
+        Drop every cached token.
+        """
+        self._entries.clear()
+        self._tokens.clear()
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+
+        tokens = self._tokens[entry.reporter.username]
+        tokens.discard(token)
+        if not tokens:
+            del self._tokens[entry.reporter.username]
+
+    def metrics(self) -> dict:
+        """
+        Return the size and counters of the cache.
+        """
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+@lru_cache()
+def get_token_cache() -> TokenCache:
+    """
+    Return the application's cache of verified access tokens.
+
+    The cache is created on first use with the size and time-to-live set in the
+    application settings, and shared by every request of the worker.
+    """
+    settings = config.get_settings()
+    return TokenCache(settings.token_cache_size, settings.token_cache_ttl)
+
+
+class FragmentCache:
+    """
+    Least recently used cache of the JSON serialization of incidents.
+
+    Each incident is serialized once, and its bytes are reused by every response
+    including it until it changes. The reporter is left out of the fragment, as
+    it is joined into the incident when a response is built, so a change to a
+    reporter leaves the fragments valid. A fragment is stored along with the
+    `updated_at` of the incident it was built from, so a stale fragment is
+    detected and rebuilt even if its invalidation was missed.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize  # Maximum number of cached fragments
+        self._fragments: OrderedDict[UUID, tuple[Any, bytes]] = OrderedDict()
+        self.hits = 0  # Incidents whose cached fragment was reused
+        self.misses = 0  # Incidents that had to be serialized
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def get(self, incident: IncidentDTO) -> bytes:
+        """
+        Return the JSON serialization of an incident without its reporter, from
+        the cache if possible.
+        """
+        cached = self._fragments.get(incident.id)
+        if cached is not None and cached[0] == incident.updated_at:
+            self.hits += 1
+            self._fragments.move_to_end(incident.id)  # Mark as most recently used
+            return cached[1]
+
+        self.misses += 1
+        fragment = orjson.dumps(incident.model_dump(exclude={"reporter"}))
+        if self.maxsize > 0:
+            self._fragments[incident.id] = (incident.updated_at, fragment)
+            self._fragments.move_to_end(incident.id)
+            if len(self._fragments) > self.maxsize:
+                self._fragments.popitem(last=False)  # Evict least recently used
+        return fragment
+
+    def invalidate(self, id: UUID) -> None:
+        """
+        Drop the cached fragment of an incident.
+        """
+        self._fragments.pop(id, None)
+
+    def clear(self) -> None:
+        """
+        Drop every cached fragment.
+        """
+        self._fragments.clear()
+
+    def metrics(self) -> dict:
+        """
+        Return the size and counters of the cache.
+        """
+        return {
+            "size": len(self._fragments),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+@lru_cache()
+def get_fragment_cache() -> FragmentCache:
+    """
+    Return the application's cache of serialized incidents.
+
+    The cache is created on first use with the size set in the application
+    settings, and shared by every request of the worker.
+    """
+    return FragmentCache(config.get_settings().fragment_cache_size)
+
+
+class QueryCache:
+    """
+    Least recently used cache of query results, tagged with a generation.
+
+    Each result is stored with the generation (the storage version) it was
+    computed at, and is only returned for that same generation. Any write to
+    the storage therefore makes every older entry stale without purging the
+    cache; stale entries are replaced when their query runs again, or evicted.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize  # Maximum number of cached results
+        self._results: OrderedDict[Hashable, tuple[int, Any]] = OrderedDict()
+        self.hits = 0  # Lookups answered from the cache
+        self.misses = 0  # Lookups that had to run the query
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key: Hashable, generation: int) -> Any | None:
+        """
+        Return the result cached for a query at a generation, or `None`.
+        """
+        cached = self._results.get(key)
+        if cached is None or cached[0] != generation:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._results.move_to_end(key)  # Mark as most recently used
+        return cached[1]
+
+    def put(self, key: Hashable, generation: int, result: Any) -> None:
+        """
+        Cache the result of a query computed at a generation.
+        """
+        if self.maxsize <= 0:
+            return
+
+        self._results[key] = (generation, result)
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)  # Evict least recently used
+
+    def metrics(self) -> dict:
+        """
+        Return the size and counters of the cache.
+        """
+        return {
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+@lru_cache()
+def get_query_cache() -> QueryCache:
+    """
+    Return the application's cache of incident search results.
+
+    The cache is created on first use with the size set in the application
+    settings, and shared by every request of the worker.
+    """
+    return QueryCache(config.get_settings().query_cache_size)
@@ -0,0 +1,41 @@
+from hashlib import blake2b
+
+from fastapi import Request, Response, status
+
+
+def make_etag(version: int | tuple[int, ...], request: Request | None = None):
+    """
+    Build a strong ETag from a storage version and, optionally, a request.
+
+    A tuple of versions, for resources read from several repositories, gives a
+    tag that changes whenever one of them does. The query parameters of the
+    request are hashed into the tag, so different pages, filters or sort orders
+    of the same listing get different tags while the version stays unchanged.
+    """
+    versions = version if isinstance(version, tuple) else (version,)
+    tag = ".".join(f"{part:x}" for part in versions)
+    if request is None:
+        return f'"{tag}"'
+
+    params = sorted(request.query_params.multi_items())
+    digest = blake2b(repr(params).encode(), digest_size=8).hexdigest()
+    return f'"{tag}-{digest}"'
+
+
+def not_modified(request: Request, etag: str):
+    """
+    Return a 304 Not Modified response if the client already has the resource.
+
+    This function compares the tag against the `If-None-Match` header of the
+    request, and returns `None` when the full response must be sent.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    return None
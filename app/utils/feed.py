@@ -0,0 +1,339 @@
+import asyncio
+from functools import lru_cache
+from typing import Iterable
+
+import orjson
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect, status
+from starlette.websockets import WebSocketState
+
+from app.core import config
+from app.models.incident import IncidentDTO, IncidentQueryParams
+from app.store.records import to_microseconds
+from app.utils.cache import get_fragment_cache
+from app.utils.reporter import ReporterMemo
+
+# Kinds of events published to the live feed
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+class IncidentFilter:
+    """
+    Predicate telling whether an incident matches incident query parameters.
+
+    The filters have the semantics of incident searches: text filters are case
+    insensitive substrings, the reporter filter a substring of the username and
+    time windows are inclusive. Needles and bounds are prepared once, as the
+    predicate is evaluated for every published incident.
+    """
+
+    __slots__ = ("text", "substrings", "values", "bounds")
+
+    def __init__(self, q: IncidentQueryParams):
+        self.text = q.q.lower() if q.q else None  # Searched in title or description
+        self.substrings = [
+            (field, needle.lower())
+            for field, needle in (
+                ("title", q.title),
+                ("description", q.description),
+                ("reporter", q.reporter),
+            )
+            if needle
+        ]  # Substrings searched in a single field
+        self.values = [
+            (field, value)
+            for field, value in (("severity", q.severity), ("status", q.status))
+            if value is not None
+        ]  # Values matched exactly
+        self.bounds = [
+            (
+                field,
+                None if low is None else to_microseconds(low),
+                None if high is None else to_microseconds(high),
+            )
+            for field, (low, high) in q.ranges().items()
+        ]  # Time windows, in microseconds
+
+    def __call__(self, incident: IncidentDTO) -> bool:
+        if self.text is not None and not (
+            self.text in incident.title.lower()
+            or self.text in incident.description.lower()
+        ):
+            return False
+        for field, needle in self.substrings:
+            if needle not in getattr(incident, field).lower():
+                return False
+        for field, value in self.values:
+            if getattr(incident, field) != value:
+                return False
+        for field, low, high in self.bounds:
+            value = to_microseconds(getattr(incident, field))
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+
+class FeedEvent:
+    """
+    Event of the live feed, serialized once for every subscriber.
+
+    `text` is the JSON message sent over WebSockets, `sse` the same message
+    framed as a server-sent event.
+    """
+
+    __slots__ = ("text", "sse")
+
+    def __init__(self, kind: str, data: bytes):
+        self.text = data.decode()  # JSON message
+        self.sse = b"event: " + kind.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class Subscription:
+    """
+    Subscription of a client to the live feed.
+
+    Events are queued for the client in a bounded queue. A subscription whose
+    queue is full is closed instead of growing: its pending events are dropped
+    and the client is told it fell behind, so a slow client never holds more
+    than `maxsize` events.
+    """
+
+    __slots__ = ("matches", "queue", "closed", "overflowed")
+
+    def __init__(self, matches: IncidentFilter, maxsize: int):
+        self.matches = matches  # Filter of the incidents sent to the client
+        self.queue: asyncio.Queue[FeedEvent | None] = asyncio.Queue(maxsize + 1)
+        self.closed = False  # Whether the subscription has ended
+        self.overflowed = False  # Whether it ended because the client fell behind
+
+    def push(self, event: FeedEvent) -> bool:
+        """
+        Queue an event for the client, returning `False` if the queue is full.
+        """
+        if self.queue.qsize() >= self.queue.maxsize - 1:
+            return False
+        self.queue.put_nowait(event)
+        return True
+
+    def close(self) -> None:
+        """
+        End the subscription, dropping the events not sent yet.
+
+        The client then receives `None`, which tells it the feed is over. The
+        queue keeps a free slot for it.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self) -> FeedEvent | None:
+        """
+        Wait for the next event, or `None` once the subscription has ended.
+        """
+        return await self.queue.get()
+
+
+class IncidentBroadcaster:
+    """
+    Broadcaster of incident changes to the subscribers of the live feed.
+
+    Routers publish the incidents they create, update or delete. Every incident
+    is serialized once, joined with its reporter, whatever the number of
+    subscribers; the same event is then queued for each subscriber whose filter
+    it matches. Publishing never waits on a subscriber: those whose queue is
+    full are dropped. When nobody is subscribed, publishing does nothing.
+
+    Events are only delivered to the subscribers of the worker handling the
+    change, as each worker process has its own broadcaster.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size  # Maximum number of events queued per client
+        self.max_subscribers = max_subscribers  # Maximum number of subscriptions
+        self._subscriptions: set[Subscription] = set()
+        self.published = 0  # Events published
+        self.dropped = 0  # Subscriptions dropped because their queue was full
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def subscribe(self, q: IncidentQueryParams) -> Subscription:
+        """
+        Subscribe to the changes of the incidents matching the query parameters.
+
+        Raises an HTTP 503 exception if the maximum number of subscriptions is
+        reached.
+        """
+        if len(self._subscriptions) >= self.max_subscribers:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many subscribers, try again later",
+            )
+        subscription = Subscription(IncidentFilter(q), self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        End a subscription.
+        """
+        self._subscriptions.discard(subscription)
+        subscription.close()
+
+    async def publish(self, kind: str, incidents: Iterable[IncidentDTO]) -> None:
+        """
+        Publish changes of a kind (`created`, `updated` or `deleted`) to the
+        incidents, as they are after the change or before their deletion.
+        """
+        if not self._subscriptions:
+            return
+        incidents = list(incidents)
+        reporters = ReporterMemo()
+        await reporters.load(incident.reporter for incident in incidents)
+
+        fragments = get_fragment_cache()
+        prefix = b'{"event":"' + kind.encode() + b'","incident":{"reporter":'
+        overflowed = []  # Subscriptions whose queue is full
+        for incident in incidents:
+            event = None  # Serialized once a subscriber matches the incident
+            for subscription in self._subscriptions:
+                if not subscription.matches(incident):
+                    continue
+                if event is None:
+                    # Deleted incidents are serialized without being cached again
+                    fragment = (
+                        orjson.dumps(incident.model_dump(exclude={"reporter"}))
+                        if kind == DELETED
+                        else fragments.get(incident)
+                    )
+                    reporter = reporters.fragment(incident.reporter)
+                    event = FeedEvent(
+                        kind, prefix + reporter + b"," + fragment[1:] + b"}"
+                    )
+                    self.published += 1
+                if not subscription.closed and not subscription.push(event):
+                    subscription.overflowed = True
+                    subscription.close()
+                    overflowed.append(subscription)
+
+        # Slow clients are dropped once the set of subscriptions is walked
+        for subscription in overflowed:
+            self.dropped += 1
+            self.unsubscribe(subscription)
+
+    def close(self) -> None:
+        """
+        End every subscription, when the application shuts down.
+        """
+        for subscription in list(self._subscriptions):
+            self.unsubscribe(subscription)
+
+    def metrics(self) -> dict:
+        """
+        Return the number of subscribers and the counters of the broadcaster.
+        """
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+@lru_cache()
+def get_broadcaster() -> IncidentBroadcaster:
+    """
+    Return the broadcaster of the live incident feed.
+
+    The broadcaster is created on first use with the limits set in the
+    application settings.
+    """
+    settings = config.get_settings()
+    return IncidentBroadcaster(settings.feed_queue_size, settings.feed_max_subscribers)
+
+
+async def sse_events(subscription: Subscription, keepalive: float):
+    """
+    Stream the events of a subscription as server-sent events.
+
+    This asynchronous generator yields the events queued since the previous
+    write at once, and a comment every `keepalive` seconds without events so
+    proxies keep the connection open. It ends with an `overflow` event if the
+    client fell behind, and ends the subscription when the client leaves.
+    """
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+
+            # Send the events already queued along with the first one
+            events = []
+            while event is not None:
+                events.append(event.sse)
+                if subscription.queue.empty():
+                    break
+                event = subscription.queue.get_nowait()
+            if events:
+                yield b"".join(events)
+            if event is None:
+                if subscription.overflowed:
+                    yield b"event: overflow\ndata: {}\n\n"
+                return
+    finally:
+        get_broadcaster().unsubscribe(subscription)
+
+
+async def _watch_disconnect(websocket: WebSocket, subscription: Subscription):
+    """
+    Wait for a WebSocket client to leave, then end its subscription.
+
+    Messages sent by the client are ignored.
+    """
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+    subscription.close()
+
+
+async def websocket_events(
+    websocket: WebSocket, subscription: Subscription, keepalive: float
+):
+    """
+    Send the events of a subscription over an accepted WebSocket.
+
+    Every event is sent as a JSON text message, and `{"event": "keep-alive"}`
+    every `keepalive` seconds without events. If the client falls behind, the
+    connection is closed with code 1013 (try again later); when the application
+    shuts down, with code 1001 (going away).
+    """
+    watcher = asyncio.create_task(_watch_disconnect(websocket, subscription))
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                await websocket.send_text('{"event":"keep-alive"}')
+                continue
+            if event is None:
+                break
+            await websocket.send_text(event.text)
+
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(
+                code=(
+                    status.WS_1013_TRY_AGAIN_LATER
+                    if subscription.overflowed
+                    else status.WS_1001_GOING_AWAY
+                )
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        get_broadcaster().unsubscribe(subscription)
@@ -1,276 +1,866 @@
+import csv
+import io
 from datetime import datetime, timedelta
-from random import randint, seed
-from typing import Annotated
+from heapq import merge
+from itertools import islice
+from operator import itemgetter
+from random import Random
+from typing import Annotated, Awaitable, Callable
 from uuid import UUID, uuid4
 
-from fastapi import Depends
+import orjson
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
+from app.core import config
 from app.models.incident import (
     IncidentDTO,
+    IncidentImport,
     IncidentQueryParams,
     IncidentSeverity,
     IncidentStatus,
+    local_time,
 )
+from app.models.pagination import PaginationQueryParams
 from app.models.sort import SortQueryParams
-from app.utils.reporter import REPORTERS_DB  # Database of reporters
+from app.store.backend import get_storage
+from app.store.incident import RANGE_FIELDS, SORT_KEYS
+from app.utils.cache import get_fragment_cache, get_query_cache
+from app.utils.feed import CREATED, get_broadcaster
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.reporter import ReporterMemo, unknown_reporters
 
-# Seed the random number generator for reproducibility
-seed(1)
 
-
-def search_incident_by_uuid(id: UUID):
+async def search_incident_by_uuid(id: UUID):
     """
     Search for an incident by its UUID.
 
     This function takes a unique identifier (UUID) and returns the corresponding
-    incident from the INCIDENTS_DB. If no incident is found, it returns `None`.
+    incident from the configured storage engine. If no incident is found, it
+    returns `None`.
+    """
+    return await get_storage().incidents.get(id)
+
+
+def _joined(incident: IncidentDTO, fragment: bytes, reporters: ReporterMemo) -> bytes:
+    """
+    Join the JSON fragment of an incident, without its reporter, with the
+    serialized reporter.
+
+    The reporter must already be loaded in the memo.
+    """
+    return b'{"reporter":' + reporters.fragment(incident.reporter) + b"," + fragment[1:]
+
+
+async def incident_response(incident: IncidentDTO):
+    """
+    Build the JSON response of a single incident.
+
+    The body is the incident's cached JSON fragment joined with its reporter, so
+    an unchanged incident is neither serialized nor validated again. The body
+    has the shape of `IncidentRes`.
     """
-    for incident in INCIDENTS_DB:
-        if incident.id == id:
-            return incident
-    return None  # Return `None` if no matching incident is found
+    reporters = ReporterMemo()
+    await reporters.load([incident.reporter])
+    fragment = get_fragment_cache().get(incident)
+    return Response(
+        _joined(incident, fragment, reporters), media_type="application/json"
+    )
+
+
+async def incidents_response(incidents: list[IncidentDTO], **meta):
+    """
+    Build the JSON response of a page of incidents.
 
+    The `data` list of the body is joined from the cached JSON fragments of the
+    incidents, and followed by the given metadata fields. The reporters of the
+    page are read at once, and each of them serialized once however many of its
+    incidents the page holds. The body has the shape of `IncidentsRes`, but the
+    models are not validated again.
+    """
+    reporters = ReporterMemo()
+    await reporters.load(incident.reporter for incident in incidents)
+    cache = get_fragment_cache()
+    fragments = b",".join(
+        _joined(incident, cache.get(incident), reporters) for incident in incidents
+    )
+    content = b'{"data":[' + fragments + b"]," + orjson.dumps(meta)[1:]
+    return Response(content, media_type="application/json")
 
-def search_incident_by_query(
+
+async def count_incidents_by_facet(
     q: Annotated[IncidentQueryParams, Depends(IncidentQueryParams)],
-    sort: Annotated[SortQueryParams, Depends(SortQueryParams)],
 ):
     """
-    Search for incidents based on query parameters and sorting options.
+    Count the incidents matching the query parameters by facet.
+
+    This function returns the total number of matching incidents, and their
+    number for every severity level, status and reporter. Every severity level
+    and status is listed, with a count of zero if no incident has it.
+    """
+    severity = dict.fromkeys((level.value for level in IncidentSeverity), 0)
+    status = dict.fromkeys((state.value for state in IncidentStatus), 0)
+    reporter = {}
+    total = 0
+    for level, state, username, count in await get_storage().incidents.facets(q):
+        severity[level] += count
+        status[state] += count
+        reporter[username] = reporter.get(username, 0) + count
+        total += count
+
+    return {
+        "total": total,
+        "severity": severity,
+        "status": status,
+        "reporter": dict(sorted(reporter.items())),
+    }
+
+
+async def count_incidents_by_interval(
+    q: Annotated[IncidentQueryParams, Depends(IncidentQueryParams)],
+    field: str,
+    interval: str,
+):
+    """
+    Count the incidents matching the query parameters by interval of time.
+
+    This function buckets the incidents by the timestamp `field`, into intervals
+    of an hour or a day, and returns the non-empty buckets in chronological
+    order along with the total number of matching incidents.
+    """
+    buckets = await get_storage().incidents.histogram(q, field, interval)
+    return {
+        "field": field,
+        "interval": interval,
+        "total": sum(count for _, count in buckets),
+        "buckets": [{"start": start, "count": count} for start, count in buckets],
+    }
+
+
+def check_bulk_size(items: list, settings: config.Settings):
+    """
+    Check that a bulk request does not exceed the maximum number of items.
+
+    This function raises an HTTP 413 exception if the request holds more items
+    than allowed by the `bulk_max_items` setting.
+    """
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk requests are limited to {settings.bulk_max_items} items",
+        )
+
+
+async def apply_known_reporters(
+    items: list,
+    reporter: Callable[[object], str | None],
+    apply: Callable[[list], Awaitable[list]],
+) -> list:
+    """
+    Apply a batch operation to the items whose reporter exists.
+
+    `reporter` returns the username an item references, or `None` if it does
+    not reference any. Items referencing a username that belongs to no reporter
+    are left out of the batch given to `apply`. Returns the results of `apply`
+    in the order of the items, with an HTTP 422 exception in place of the
+    results of the items left out.
+    """
+    unknown = await unknown_reporters(filter(None, map(reporter, items)))
+    if not unknown:
+        return await apply(items)
+
+    rejected = HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Unknown reporter"
+    )
+    applied = iter(
+        await apply([item for item in items if reporter(item) not in unknown])
+    )
+    return [rejected if reporter(item) in unknown else next(applied) for item in items]
 
-    This function takes query parameters and sorting options to filter and
-    sort incidents from the INCIDENTS_DB.
-    """
-    filtered_incidents = INCIDENTS_DB  # Start with all incidents
-
-    # Apply filtering based on the query parameters
-    if q.title:
-        filtered_incidents = [
-            incident
-            for incident in filtered_incidents
-            if q.title.lower() in incident.title.lower()
-        ]
-
-    if q.reporter:
-        filtered_incidents = [
-            incident
-            for incident in filtered_incidents
-            if q.reporter.lower() in incident.reporter.lower()
-        ]
-
-    if q.severity:
-        filtered_incidents = [
-            incident
-            for incident in filtered_incidents
-            if q.severity == incident.severity
-        ]
-
-    if q.status:
-        filtered_incidents = [
-            incident for incident in filtered_incidents if q.status == incident.status
-        ]
 
+def is_incident(result) -> bool:
+    """
+    Tell whether the result of an item of a batch is an incident, rather than
+    `None` or an HTTP exception reporting its failure.
+    """
+    return result is not None and not isinstance(result, HTTPException)
+
+
+def bulk_response(ids: list[UUID], results: list, code: int, error: str):
+    """
+    Build the response of a bulk request from the results of its items.
+
+    Items whose result is `None` failed; they are reported with the given status
+    code and error message. Items whose result is an `HTTPException` were
+    rejected before being applied; they are reported with its status code and
+    detail.
+    """
+    data = []
+    for id, result in zip(ids, results):
+        if isinstance(result, HTTPException):
+            data.append(
+                {"id": id, "status": result.status_code, "detail": result.detail}
+            )
+        elif result is None:
+            data.append({"id": id, "status": code, "detail": error})
+        else:
+            data.append({"id": id, "status": status.HTTP_200_OK})
+    failed = sum(item["status"] != status.HTTP_200_OK for item in data)
+    return {"data": data, "succeeded": len(results) - failed, "failed": failed}
+
+
+def incident_cursor(incident: IncidentDTO, sort_by: str):
+    """
+    Build the opaque pagination cursor pointing right after an incident.
+
+    The cursor encodes the active sort field, the incident's sort key and its
+    UUID, which together identify its position in the sort index. Timestamp
+    keys are encoded in the naive local time the indexes are keyed by.
+    """
+    key = SORT_KEYS[sort_by](incident)
+    if isinstance(key, datetime):
+        key = local_time(key)
+    return encode_cursor(sort_by, key, incident.id)
+
+
+def decode_incident_cursor(cursor: str, sort_by: str):
+    """
+    Decode a cursor built by `incident_cursor` into a `(key, id)` position.
+
+    Raises an HTTP 400 exception if the cursor is malformed or was issued for
+    a different sort field.
+    """
+    values = decode_cursor(cursor)
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+    )
+    if len(values) != 3 or values[0] != sort_by:
+        raise invalid_exception
+
+    # The key must have the same type as the index keys to be comparable
+    key = values[1]
+    if sort_by in RANGE_FIELDS:
+        if not isinstance(key, datetime):
+            raise invalid_exception
+        key = local_time(key)
+    elif not isinstance(key, str):
+        raise invalid_exception
+
+    try:
+        return key, UUID(values[2])
+    except (ValueError, TypeError):
+        raise invalid_exception
+
+
+def normalize_sort(sort: SortQueryParams):
+    """
+    Replace invalid sorting parameters with their defaults.
+
+    Unknown sort fields fall back to `created_at`, and sort orders other than
+    1 (ascending) or -1 (descending) fall back to descending.
+    """
     # Determine the valid sorting fields
-    valid_sort_by = ["title", "reporter", "severity", "created_at", "updated_at"]
-    if sort.sort_by not in valid_sort_by:
+    if sort.sort_by not in SORT_KEYS:
         sort.sort_by = "created_at"  # Default sorting field
 
     # Determine the valid sort order (1 for ascending, -1 for descending)
     if sort.sort_order not in [-1, 1]:
         sort.sort_order = -1  # Default sort order (descending)
 
-    reverse = sort.sort_order == -1  # If descending, set reverse to True
 
-    # Sort the incidents based on the specified field and order
-    return sorted(
-        filtered_incidents,
-        key=lambda incident: getattr(incident, sort.sort_by),
-        reverse=reverse,
+def incident_query_key(
+    q: IncidentQueryParams, sort: SortQueryParams, pag: PaginationQueryParams
+):
+    """
+    Build the key identifying a search in the query result cache.
+
+    Parameters that select the same page map to the same key: empty text
+    filters are dropped, as are a zero skip or limit. Sort parameters are
+    expected to be normalized already.
+    """
+    return (
+        q.q or None,
+        q.title or None,
+        q.description or None,
+        q.severity,
+        q.reporter or None,
+        q.status,
+        *q.ranges().items(),
+        sort.sort_by,
+        sort.sort_order,
+        pag.skip or 0,
+        pag.limit or None,
+        pag.cursor or None,
+    )
+
+
+async def search_incident_by_query(
+    q: Annotated[IncidentQueryParams, Depends(IncidentQueryParams)],
+    sort: Annotated[SortQueryParams, Depends(SortQueryParams)],
+    pag: Annotated[PaginationQueryParams, Depends(PaginationQueryParams)],
+):
+    """
+    Search for incidents based on query, sorting and pagination parameters.
+
+    This function takes query parameters and sorting options to filter and
+    sort incidents from the configured storage engine, and returns the requested
+    page along with the cursor of the next page (or `None` on the last page).
+    If a cursor is given, the search resumes right after the position it encodes.
+
+    Results are kept in the query result cache, tagged with the version of the
+    incidents they were computed at, so a repeated search is answered from the
+    cache until an incident is created, updated or deleted.
+    """
+    normalize_sort(sort)
+
+    # Answer from the cache if no incident has changed since the same search
+    incidents_db = get_storage().incidents
+    cache = get_query_cache()
+    key = incident_query_key(q, sort, pag)
+    generation = await incidents_db.version()
+    cached = cache.get(key, generation)
+    if cached is not None:
+        incidents, next_cursor = cached
+        return list(incidents), next_cursor
+
+    reverse = sort.sort_order == -1  # If descending, walk the index backwards
+
+    # Resolve the position to resume from when paginating with a cursor
+    after = decode_incident_cursor(pag.cursor, sort.sort_by) if pag.cursor else None
+
+    # Request one extra entry that tells whether there is a next page
+    limit = pag.limit + 1 if pag.limit else None
+    incidents = await incidents_db.search(
+        q, sort.sort_by, reverse, after, pag.skip or 0, limit
+    )
+
+    next_cursor = None
+    if pag.limit and len(incidents) > pag.limit:
+        incidents.pop()  # Drop the look-ahead entry
+        next_cursor = incident_cursor(incidents[-1], sort.sort_by)
+
+    cache.put(key, generation, (tuple(incidents), next_cursor))
+    return incidents, next_cursor
+
+
+# Greatest UUID: paired with a version, the position after every change made at
+# that version
+LAST_UUID = UUID(int=(1 << 128) - 1)
+
+
+def changes_cursor(floor: int, version: int, id: int):
+    """
+    Build the opaque cursor resuming a delta sync after a change.
+
+    The cursor encodes the version deletions are reported from, and the
+    `(version, id)` position of the last change returned, with the integer
+    value of the incident's UUID.
+    """
+    return encode_cursor("changes", floor, version, UUID(int=id))
+
+
+def decode_changes_cursor(cursor: str) -> tuple[int, tuple[int, UUID]]:
+    """
+    Decode a cursor built by `changes_cursor` into the version deletions are
+    reported from and a `(version, id)` position.
+
+    Raises an HTTP 400 exception if the cursor is malformed or was not issued
+    by a delta sync.
+    """
+    values = decode_cursor(cursor)
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
     )
+    if (
+        len(values) != 4
+        or values[0] != "changes"
+        or not all(type(value) is int for value in values[1:3])
+    ):
+        raise invalid_exception
+
+    try:
+        return values[1], (values[2], UUID(values[3]))
+    except (ValueError, TypeError):
+        raise invalid_exception
+
+
+async def sync_incidents(since: int, cursor: str | None, limit: int):
+    """
+    Build the response of a delta sync of the incidents changed since a version.
+
+    Changes are read in the order they were made, from the storage engine's
+    version index and tombstones, so the cost of a sync depends on the number
+    of changes rather than on the number of incidents. The response holds the
+    incidents created or updated since the version, as they are now, and the
+    tombstones of those deleted since, at most `limit` changes at a time with a
+    cursor for the rest. Once the last page is read, `since` is the version to
+    sync from next.
 
+    A sync from version 0 returns every incident. Deletions made before it
+    started are left out, as they concern no incident the client holds. Raises
+    an HTTP 410 exception if tombstones the sync needs have expired, in which
+    case the client has to sync again from version 0.
+    """
+    incidents_db = get_storage().incidents
+    if cursor is not None:
+        floor, after = decode_changes_cursor(cursor)
+    else:
+        after = (since, LAST_UUID)  # After every change made at that version
+        floor = since or await incidents_db.version()
+
+    # Read one extra change that tells whether there is a next page
+    horizon, changed, deleted = await incidents_db.changes(after, limit + 1, floor)
+    if floor < horizon:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Changes since this version have expired, sync again from 0",
+        )
+
+    tombstones = (
+        (version, id.int, {"id": id, "version": version, "deleted_at": deleted_at})
+        for version, id, deleted_at in deleted
+    )
+    changes = list(
+        islice(
+            merge(
+                ((version, incident.id.int, incident) for version, incident in changed),
+                tombstones,
+                key=itemgetter(0, 1),
+            ),
+            limit + 1,
+        )
+    )
+
+    next_cursor = None
+    if len(changes) > limit:
+        changes.pop()  # Drop the look-ahead change
+        version, id, _ = changes[-1]
+        next_cursor = changes_cursor(floor, version, id)
+        since = version - 1  # Changes made at that version may follow
+    else:
+        since = max(changes[-1][0] if changes else 0, floor)
+
+    incidents = [change for *_, change in changes if isinstance(change, IncidentDTO)]
+    # An incident deleted and created again only needs its latest state
+    stored = {incident.id for incident in incidents}
+    tombstones = [
+        change
+        for *_, change in changes
+        if isinstance(change, dict) and change["id"] not in stored
+    ]
+    return await incidents_response(
+        incidents, deleted=tombstones, since=since, next_cursor=next_cursor
+    )
+
+
+# Columns of the CSV export, with the function reading each from an incident
+# and the joined fields of its reporter
+CSV_COLUMNS = {
+    "id": lambda incident, reporter: str(incident.id),
+    "title": lambda incident, reporter: incident.title,
+    "description": lambda incident, reporter: incident.description,
+    "severity": lambda incident, reporter: incident.severity.value,
+    "status": lambda incident, reporter: incident.status.value,
+    "reporter_username": lambda incident, reporter: reporter["username"],
+    "reporter_name": lambda incident, reporter: reporter["name"],
+    "reporter_email": lambda incident, reporter: reporter["email"],
+    "reporter_company": lambda incident, reporter: reporter["company"],
+    "date": lambda incident, reporter: incident.date.isoformat(),
+    "created_at": lambda incident, reporter: incident.created_at.isoformat(),
+    "updated_at": lambda incident, reporter: incident.updated_at.isoformat(),
+}
+
+
+def _csv_rows(rows: list[list[str]]) -> bytes:
+    """
+    Format rows of values as CSV lines.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def export_incidents(
+    q: IncidentQueryParams, sort: SortQueryParams, format: str, chunk_size: int
+):
+    """
+    Stream the incidents matching the query parameters as NDJSON or CSV.
+
+    This asynchronous generator yields the export in chunks of `chunk_size`
+    incidents. Every chunk is a separate page read from the storage engine,
+    resumed right after the last incident of the previous one, so only one
+    chunk is held in memory however large the export is. As the generator
+    only reads the next page once the previous chunk has been sent, a slow
+    client slows down the export instead of letting chunks pile up.
+
+    Reporters are joined into the incidents as in responses, with a memo kept
+    for the whole export, so every reporter is read and serialized once.
+    """
+    normalize_sort(sort)
+    reverse = sort.sort_order == -1  # If descending, walk the index backwards
+    key = SORT_KEYS[sort.sort_by]
+    incidents_db = get_storage().incidents
+    reporters = ReporterMemo()
+
+    if format == "csv":
+        yield _csv_rows([list(CSV_COLUMNS)])  # Header line
+
+    after = None
+    while True:
+        incidents = await incidents_db.search(
+            q, sort.sort_by, reverse, after, 0, chunk_size
+        )
+        if not incidents:
+            break
+        await reporters.load(incident.reporter for incident in incidents)
+
+        if format == "csv":
+            yield _csv_rows(
+                [
+                    [
+                        column(incident, reporters.get(incident.reporter))
+                        for column in CSV_COLUMNS.values()
+                    ]
+                    for incident in incidents
+                ]
+            )
+        else:
+            # Exported incidents are not kept in the fragment cache, which
+            # would otherwise be flushed by every export
+            yield b"".join(
+                _joined(
+                    incident,
+                    orjson.dumps(incident.model_dump(exclude={"reporter"})),
+                    reporters,
+                )
+                + b"\n"
+                for incident in incidents
+            )
+
+        if len(incidents) < chunk_size:
+            break
+        after = (key(incidents[-1]), incidents[-1].id)  # Resume after this chunk
+
+
+# Validates a whole batch of import records in a single call
+IMPORT_BATCH = TypeAdapter(list[IncidentImport])
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    Streaming response sent while the request body is still being read.
+
+    The default streaming response listens for client disconnects by reading
+    the request messages, which would swallow the body chunks the content is
+    generated from. The body reader raises on disconnect by itself, so this
+    response only streams its content.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _validation_message(error: ValidationError) -> str:
+    """
+    Summarize a validation error as a single line of text.
+    """
+    return "; ".join(
+        (
+            ".".join(map(str, detail["loc"])) + ": " + detail["msg"]
+            if detail["loc"]
+            else detail["msg"]
+        )
+        for detail in error.errors()
+    )
+
+
+def _event(event: dict) -> bytes:
+    """
+    Format an import event as an NDJSON line.
+    """
+    return orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def _import_batch(load, batch: list[tuple[int, bytes]], counts: dict):
+    """
+    Validate and store a batch of numbered NDJSON lines.
+
+    The batch is validated in a single call; if that fails, the lines are
+    validated one by one to find the invalid ones. Returns the NDJSON events
+    reporting the error of every failed line, followed by the progress.
+    """
+    events = []
+    records = None
+    try:
+        records = IMPORT_BATCH.validate_json(
+            b"[" + b",".join(line for _, line in batch) + b"]"
+        )
+    except ValidationError:
+        pass
+    numbers = [number for number, _ in batch]
+
+    # A line holding several values would shift the records, so the lines are
+    # also checked one by one when the counts do not match
+    if records is None or len(records) != len(batch):
+        records, numbers = [], []
+        for number, line in batch:
+            try:
+                records.append(IncidentImport.model_validate_json(line))
+                numbers.append(number)
+            except ValidationError as error:
+                events.append({"line": number, "error": _validation_message(error)})
+
+    # Import records are incidents (`IncidentImport` extends `IncidentDTO`), so
+    # they are stored as they are instead of being copied into new models
+    results = await apply_known_reporters(records, lambda record: record.reporter, load)
+    for number, result in zip(numbers, results):
+        if isinstance(result, HTTPException):
+            events.append({"line": number, "error": result.detail})
+        elif result is None:
+            events.append({"line": number, "error": "Incident already exists"})
+
+    stored = list(filter(is_incident, results))
+    await get_broadcaster().publish(CREATED, stored)
+    imported = len(stored)
+    counts["imported"] += imported
+    counts["failed"] += len(batch) - imported
+    events.sort(key=lambda event: event["line"])
+    events.append({"progress": dict(counts)})
+    return events
+
+
+async def import_incidents(request: Request, batch_size: int):
+    """
+    Import incidents from an NDJSON request body, streaming the progress.
+
+    This asynchronous generator reads the body as it arrives and splits it into
+    lines, one incident per line. Lines are validated and stored in batches of
+    `batch_size` through a bulk load of the storage engine, which rebuilds its
+    indexes once when the import is over. It yields NDJSON events: the error of
+    every line that could not be imported, the progress after every batch and a
+    final summary. Only the current batch is held in memory.
+    """
+    counts = {"lines": 0, "imported": 0, "failed": 0}
+    batch: list[tuple[int, bytes]] = []  # Numbered lines waiting to be stored
+    pending = b""  # Start of a line whose end has not arrived yet
+
+    async with get_storage().incidents.bulk_load() as load:
+        async for chunk in request.stream():
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                counts["lines"] += 1
+                if line.strip():
+                    batch.append((counts["lines"], line))
+                if len(batch) >= batch_size:
+                    events = await _import_batch(load, batch, counts)
+                    yield b"".join(map(_event, events))
+                    batch = []
+
+        if pending.strip():
+            counts["lines"] += 1
+            batch.append((counts["lines"], pending))
+        if batch:
+            events = await _import_batch(load, batch, counts)
+            yield b"".join(map(_event, events))
+
+    yield _event({"done": counts})
+
+
+def sample_incidents(reporters: dict[str, dict]) -> list[IncidentDTO]:
+    """
+    Build the mock database of incidents, with various severity, reporters, and status.
+
+    The incidents are reported by the first two of the given reporters. Like the
+    sample reporters, they are only built to write the seed snapshot.
+    """
+    reporters = list(reporters)  # Usernames, listed once for every incident
+    rng = Random(1)  # Seeded for reproducibility
 
-# A mock database of incidents with various severity, reporters, and status.
-INCIDENTS_DB = [
-    IncidentDTO(
-        id=uuid4(),
-        title="Network Outage",
-        description="A network outage has occurred in the main office.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[0],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=17),
-        updated_at=datetime.now() - timedelta(minutes=17),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Hardware Failure",
-        description="Multiple hardware components have malfunctioned.",
-        severity=IncidentSeverity.LOW,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=16),
-        updated_at=datetime.now() - timedelta(minutes=16),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Data Loss",
-        description="Critical data loss due to backup failure.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[0],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=15),
-        updated_at=datetime.now() - timedelta(minutes=15),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Security Breach",
-        description="Unauthorized access to sensitive data.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=14),
-        updated_at=datetime.now() - timedelta(minutes=14),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Software Bug",
-        description="A software bug has caused a system crash.",
-        severity=IncidentSeverity.MEDIUM,
-        reporter=list(REPORTERS_DB.values())[0],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=13),
-        updated_at=datetime.now() - timedelta(minutes=13),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Power Outage",
-        description="A power outage has occurred in the building.",
-        severity=IncidentSeverity.LOW,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=12),
-        updated_at=datetime.now() - timedelta(minutes=12),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="System Failure",
-        description="A system failure has caused data corruption.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=11),
-        updated_at=datetime.now() - timedelta(minutes=11),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Server Crash",
-        description="A server crash has caused downtime.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=10),
-        updated_at=datetime.now() - timedelta(minutes=10),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Database Error",
-        description="A database error has caused data inconsistency.",
-        severity=IncidentSeverity.MEDIUM,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=9),
-        updated_at=datetime.now() - timedelta(minutes=9),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Application Failure",
-        description="An application failure has caused data loss.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=8),
-        updated_at=datetime.now() - timedelta(minutes=8),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Network Outage",
-        description="A network outage has occurred in the main office.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=7),
-        updated_at=datetime.now() - timedelta(minutes=7),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Hardware Failure",
-        description="Multiple hardware components have malfunctioned.",
-        severity=IncidentSeverity.LOW,
-        reporter=list(REPORTERS_DB.values())[0],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=6),
-        updated_at=datetime.now() - timedelta(minutes=6),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Data Loss",
-        description="Critical data loss due to backup failure.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=5),
-        updated_at=datetime.now() - timedelta(minutes=5),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Security Breach",
-        description="Unauthorized access to sensitive data.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=4),
-        updated_at=datetime.now() - timedelta(minutes=4),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Software Bug",
-        description="A software bug has caused a system crash.",
-        severity=IncidentSeverity.MEDIUM,
-        reporter=list(REPORTERS_DB.values())[0],
-        status=IncidentStatus.PAUSED,
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=3),
-        updated_at=datetime.now() - timedelta(minutes=3),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Power Outage",
-        description="A power outage has occurred in the building.",
-        severity=IncidentSeverity.LOW,
-        reporter=list(REPORTERS_DB.values())[1],
-        status=IncidentStatus.IN_PROGRESS,
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=2),
-        updated_at=datetime.now() - timedelta(minutes=2),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="System Failure",
-        description="A system failure has caused data corruption.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[1],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now() - timedelta(minutes=1),
-        updated_at=datetime.now() - timedelta(minutes=1),
-    ),
-    IncidentDTO(
-        id=uuid4(),
-        title="Server Crash",
-        description="A server crash has caused downtime.",
-        severity=IncidentSeverity.HIGH,
-        reporter=list(REPORTERS_DB.values())[0],
-        date=datetime.now() - timedelta(days=randint(0, 100)),
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-    ),
-]
+    return [
+        IncidentDTO(
+            id=uuid4(),
+            title="Network Outage",
+            description="A network outage has occurred in the main office.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[0],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=17),
+            updated_at=datetime.now() - timedelta(minutes=17),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Hardware Failure",
+            description="Multiple hardware components have malfunctioned.",
+            severity=IncidentSeverity.LOW,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=16),
+            updated_at=datetime.now() - timedelta(minutes=16),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Data Loss",
+            description="Critical data loss due to backup failure.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[0],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=15),
+            updated_at=datetime.now() - timedelta(minutes=15),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Security Breach",
+            description="Unauthorized access to sensitive data.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=14),
+            updated_at=datetime.now() - timedelta(minutes=14),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Software Bug",
+            description="A software bug has caused a system crash.",
+            severity=IncidentSeverity.MEDIUM,
+            reporter=reporters[0],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=13),
+            updated_at=datetime.now() - timedelta(minutes=13),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Power Outage",
+            description="A power outage has occurred in the building.",
+            severity=IncidentSeverity.LOW,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=12),
+            updated_at=datetime.now() - timedelta(minutes=12),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="System Failure",
+            description="A system failure has caused data corruption.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=11),
+            updated_at=datetime.now() - timedelta(minutes=11),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Server Crash",
+            description="A server crash has caused downtime.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=10),
+            updated_at=datetime.now() - timedelta(minutes=10),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Database Error",
+            description="A database error has caused data inconsistency.",
+            severity=IncidentSeverity.MEDIUM,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=9),
+            updated_at=datetime.now() - timedelta(minutes=9),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Application Failure",
+            description="An application failure has caused data loss.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=8),
+            updated_at=datetime.now() - timedelta(minutes=8),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Network Outage",
+            description="A network outage has occurred in the main office.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=7),
+            updated_at=datetime.now() - timedelta(minutes=7),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Hardware Failure",
+            description="Multiple hardware components have malfunctioned.",
+            severity=IncidentSeverity.LOW,
+            reporter=reporters[0],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=6),
+            updated_at=datetime.now() - timedelta(minutes=6),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Data Loss",
+            description="Critical data loss due to backup failure.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=5),
+            updated_at=datetime.now() - timedelta(minutes=5),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Security Breach",
+            description="Unauthorized access to sensitive data.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=4),
+            updated_at=datetime.now() - timedelta(minutes=4),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Software Bug",
+            description="A software bug has caused a system crash.",
+            severity=IncidentSeverity.MEDIUM,
+            reporter=reporters[0],
+            status=IncidentStatus.PAUSED,
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=3),
+            updated_at=datetime.now() - timedelta(minutes=3),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Power Outage",
+            description="A power outage has occurred in the building.",
+            severity=IncidentSeverity.LOW,
+            reporter=reporters[1],
+            status=IncidentStatus.IN_PROGRESS,
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=2),
+            updated_at=datetime.now() - timedelta(minutes=2),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="System Failure",
+            description="A system failure has caused data corruption.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[1],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now() - timedelta(minutes=1),
+            updated_at=datetime.now() - timedelta(minutes=1),
+        ),
+        IncidentDTO(
+            id=uuid4(),
+            title="Server Crash",
+            description="A server crash has caused downtime.",
+            severity=IncidentSeverity.HIGH,
+            reporter=reporters[0],
+            date=datetime.now() - timedelta(days=rng.randint(0, 100)),
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+        ),
+    ]
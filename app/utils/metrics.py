@@ -0,0 +1,238 @@
+from bisect import bisect_left
+from functools import lru_cache
+from time import perf_counter
+from typing import Iterable
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Upper bounds of the payload size buckets, in bytes
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Route label of the requests that matched no route, so unknown paths do not
+# create a series each
+UNMATCHED = "unmatched"
+
+# Media type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Histogram of observed values, over fixed buckets.
+
+    Each observation increments the count of the first bucket whose upper
+    bound is at least the value, found by binary search, so recording never
+    allocates. Counts are only made cumulative, as Prometheus expects, when
+    the histogram is rendered.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds  # Upper bounds of the buckets, in increasing order
+        self.counts = [0] * (len(bounds) + 1)  # Count per bucket, then +Inf
+        self.sum = 0  # Sum of the observed values
+        self.count = 0  # Number of observations
+
+    def observe(self, value: float) -> None:
+        """
+        Record an observed value.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> Iterable[str]:
+        """
+        Yield the sample lines of the histogram, with the given labels.
+        """
+        prefix = labels + "," if labels else ""
+        total = 0
+        for bound, count in zip((*self.bounds, "+Inf"), self.counts):
+            total += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {total}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class RouteMetrics:
+    """
+    Metrics of the requests handled by one route and method.
+    """
+
+    __slots__ = ("labels", "latency", "request_size", "response_size", "statuses")
+
+    def __init__(self, labels: str):
+        self.labels = labels  # Rendered labels of the route and method
+        self.latency = Histogram(LATENCY_BUCKETS)  # Seconds taken per request
+        self.request_size = Histogram(SIZE_BUCKETS)  # Bytes of request bodies
+        self.response_size = Histogram(SIZE_BUCKETS)  # Bytes of response bodies
+        self.statuses: dict[int, int] = {}  # Number of responses per status code
+
+
+def _escape(value: str) -> str:
+    """
+    Escape a label value of the Prometheus text format.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    Registry of the request and authentication metrics of the worker.
+
+    Requests are recorded per route template (such as `/incident/{id}`) rather
+    than per path, so the number of series stays bounded. Every recording
+    happens on the event loop, between two awaits, so counters are updated
+    without locks; recording only increments preallocated counters, and the
+    text exposition is only built when the metrics are scraped.
+    """
+
+    def __init__(self):
+        self.routes: dict[tuple, RouteMetrics] = {}  # Metrics by route and method
+        self.in_flight = 0  # Requests being handled
+        self.auth: dict[str, Histogram] = {}  # Seconds per authentication step
+
+    def observe_request(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        seconds: float,
+        request_size: int,
+        response_size: int,
+    ) -> None:
+        """
+        Record a handled request.
+        """
+        metrics = self.routes.get((route, method))
+        if metrics is None:
+            labels = f'method="{_escape(method)}",route="{_escape(route)}"'
+            metrics = self.routes[route, method] = RouteMetrics(labels)
+        metrics.latency.observe(seconds)
+        metrics.request_size.observe(request_size)
+        metrics.response_size.observe(response_size)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def observe_auth(self, step: str, seconds: float) -> None:
+        """
+        Record the time taken by a step of the authentication.
+        """
+        histogram = self.auth.get(step)
+        if histogram is None:
+            histogram = self.auth[step] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def render(self) -> Iterable[str]:
+        """
+        Yield the lines of the recorded metrics, in Prometheus text format.
+        """
+        routes = list(self.routes.values())
+
+        yield "# HELP http_requests_total Requests handled, by route and status."
+        yield "# TYPE http_requests_total counter"
+        for route in routes:
+            for status, count in sorted(route.statuses.items()):
+                yield f'http_requests_total{{{route.labels},status="{status}"}} {count}'
+
+        yield "# HELP http_requests_in_flight Requests being handled."
+        yield "# TYPE http_requests_in_flight gauge"
+        yield f"http_requests_in_flight {self.in_flight}"
+
+        for name, attribute, description in (
+            ("http_request_duration_seconds", "latency", "Request latency"),
+            ("http_request_size_bytes", "request_size", "Size of request bodies"),
+            ("http_response_size_bytes", "response_size", "Size of response bodies"),
+        ):
+            yield f"# HELP {name} {description}, by route."
+            yield f"# TYPE {name} histogram"
+            for route in routes:
+                yield from getattr(route, attribute).render(name, route.labels)
+
+        yield "# HELP auth_duration_seconds Time taken by authentication, by step."
+        yield "# TYPE auth_duration_seconds histogram"
+        for step, histogram in sorted(self.auth.items()):
+            yield from histogram.render(
+                "auth_duration_seconds", f'step="{_escape(step)}"'
+            )
+
+
+@lru_cache()
+def get_metrics() -> Metrics:
+    """
+    Return the metrics registry of the worker.
+
+    The registry is created on first use and shared by every request of the
+    worker. Each worker process keeps its own metrics.
+    """
+    return Metrics()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency, status and payload sizes of requests.
+
+    The route template is read from the scope once the request has been
+    handled, as the router stores the matched route there. The middleware
+    only wraps the `receive` and `send` callables to count body bytes and
+    catch the status code, so streaming responses are passed through as they
+    are produced; their latency includes the whole stream.
+    """
+
+    def __init__(self, app):
+        self.app = app  # Wrapped ASGI application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = get_metrics()
+        status = 500  # Reported if the application fails before responding
+        request_size = 0
+        response_size = 0
+
+        async def receive_counted():
+            nonlocal request_size
+            message = await receive()
+            request_size += len(message.get("body", b""))
+            return message
+
+        async def send_counted(message):
+            nonlocal status, response_size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        started = perf_counter()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe_request(
+                route.path if route is not None else UNMATCHED,
+                scope["method"],
+                status,
+                perf_counter() - started,
+                request_size,
+                response_size,
+            )
@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def _encode_value(value):
+    """
+    Encode values that JSON does not support natively into tagged objects.
+    """
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return str(value)  # UUIDs and other scalar values are stored as strings
+
+
+def _decode_value(value: dict):
+    """
+    Restore tagged objects produced by `_encode_value`.
+    """
+    if "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode a position in a sorted listing into an opaque cursor.
+
+    The values (typically the sort field, the sort key and the record id) are
+    serialized to JSON and encoded as URL-safe base64 so clients can pass the
+    cursor back as a query parameter without interpreting it.
+    """
+    payload = json.dumps(values, default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decode a cursor produced by `encode_cursor` back into its values.
+
+    Raises an HTTP 400 exception if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)  # Restore stripped padding
+        payload = base64.urlsafe_b64decode(padded.encode())
+        values = json.loads(payload, object_hook=_decode_value)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    if not isinstance(values, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return values
@@ -0,0 +1,115 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from math import ceil
+from time import perf_counter
+
+from fastapi import HTTPException, status
+
+from ..core import config
+from .auth import crypt
+from .metrics import get_metrics
+
+
+class PasswordVerifier:
+    """
+    Pool of worker threads verifying passwords against their bcrypt hashes.
+
+    Checking a bcrypt hash takes a few hundred milliseconds of CPU time, so it
+    runs on dedicated threads (bcrypt releases the GIL while hashing) instead
+    of blocking the event loop. Admission is bounded: once every worker is busy
+    and `queue_size` verifications are waiting, new ones are rejected with an
+    HTTP 503 exception telling the client when to retry. A burst of logins then
+    slows down logins only, while other requests keep being served.
+    """
+
+    def __init__(self, workers: int, queue_size: int, retry_after: float):
+        self.workers = workers  # Number of worker threads
+        self.queue_size = queue_size  # Maximum number of waiting verifications
+        self.retry_after = retry_after  # Seconds a rejected client should wait
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="password")
+
+        self.in_flight = 0  # Verifications admitted and not finished yet
+        self.completed = 0  # Verifications finished
+        self.rejected = 0  # Verifications rejected because the queue was full
+        self.wait_seconds = 0.0  # Total time spent waiting for a worker
+        self.busy_seconds = 0.0  # Total time spent verifying passwords
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """
+        Check a password against its hash on a worker thread.
+
+        Raises an HTTP 503 exception if the admission queue is full.
+        """
+        if self.in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(ceil(self.retry_after))},
+            )
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        future = self._executor.submit(self._verify, password, hashed, perf_counter())
+        # The slot is released once the worker is done, even if the client left
+        future.add_done_callback(
+            lambda future: loop.call_soon_threadsafe(self._release, future)
+        )
+        valid, _, _ = await asyncio.wrap_future(future)
+        return valid
+
+    @staticmethod
+    def _verify(password: str, hashed: str, submitted_at: float):
+        started_at = perf_counter()
+        valid = crypt.verify(password, hashed)
+        return valid, started_at - submitted_at, perf_counter() - started_at
+
+    def _release(self, future: Future) -> None:
+        self.in_flight -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        _, waited, busy = future.result()
+        self.completed += 1
+        self.wait_seconds += waited
+        self.busy_seconds += busy
+        get_metrics().observe_auth("password_wait", waited)
+        get_metrics().observe_auth("password_verify", busy)
+
+    def metrics(self) -> dict:
+        """
+        Return the current state and counters of the pool.
+        """
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": min(self.in_flight, self.workers),
+            "waiting": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.wait_seconds * 1000 / max(self.completed, 1),
+            "avg_verify_ms": self.busy_seconds * 1000 / max(self.completed, 1),
+        }
+
+    def close(self) -> None:
+        """
+        Stop the worker threads, letting running verifications finish.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+@lru_cache()
+def get_password_verifier() -> PasswordVerifier:
+    """
+    Return the password verification pool of the application.
+
+    The pool is created on first use with the size set in the application
+    settings, and closed when the application shuts down.
+    """
+    settings = config.get_settings()
+    return PasswordVerifier(
+        settings.password_workers,
+        settings.password_queue_size,
+        settings.password_retry_after,
+    )
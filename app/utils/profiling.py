@@ -0,0 +1,257 @@
+import asyncio
+import cProfile
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from random import random
+from secrets import token_hex
+from time import perf_counter
+
+from ..core import config
+
+# Name of the header requesting a profile of the request, holding the token set
+# in the `profile_token` setting
+PROFILE_HEADER = b"x-profile"
+
+# Names of the profiles, from the time they were taken and a random suffix
+PROFILE_NAME = re.compile(r"\d{8}T\d{6}-[0-9a-f]{6}")
+
+# Extensions of the files saved for every profile
+PROFILE_FILES = {
+    "pstats": ".pstats",  # Deterministic profile, readable with `pstats`
+    "collapsed": ".collapsed",  # Sampled stacks, in the format of flame graphs
+}
+PROFILE_INFO = ".json"  # Description of the profiled request
+
+
+class StackSampler(threading.Thread):
+    """
+    Thread sampling the call stack of another thread at a fixed interval.
+
+    Samples are counted per stack, written root first as `module:function`
+    frames separated by semicolons: this is the collapsed format read by
+    flame graph tools such as `flamegraph.pl` or speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id  # Identifier of the sampled thread
+        self.interval = interval  # Seconds between two samples
+        self.stacks: Counter[str] = Counter()  # Number of samples per stack
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                module = frame.f_globals.get("__name__", "?")
+                frames.append(f"{module}:{frame.f_code.co_qualname}")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def stop(self) -> None:
+        """
+        Stop sampling and wait for the thread to finish.
+        """
+        self._stopped.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Opt-in profiler of the requests handled by the application.
+
+    A request is profiled when it carries the `X-Profile` header with the
+    configured token, or when it is picked by sampling: once armed through the
+    admin endpoint, every request whose path starts with the given prefix is
+    profiled with probability `sample_rate`, until `remaining` profiles were
+    taken. Only one request is profiled at a time.
+
+    Each profile is saved to the profile directory as a deterministic profile
+    (`.pstats`), the stacks of the event loop thread sampled every `interval`
+    seconds (`.collapsed`), and a description of the request (`.json`). Both
+    profilers observe the whole event loop thread, so requests handled
+    concurrently with the profiled one show up in its profile as well.
+    """
+
+    def __init__(self, directory: str, interval: float, token: str | None):
+        self.directory = directory  # Directory the profiles are saved to
+        self.interval = interval  # Seconds between two stack samples
+        self.token = token.encode() if token else None  # Token of the header
+        self.sample_rate = 0.0  # Probability of profiling a matching request
+        self.remaining = 0  # Number of sampled profiles left to take
+        self.path = "/"  # Prefix of the paths of the sampled requests
+        self.active = False  # Whether a request is being profiled
+
+    def arm(self, sample_rate: float, count: int, path: str) -> None:
+        """
+        Start profiling a sample of the requests whose path starts with `path`.
+        """
+        self.sample_rate = sample_rate
+        self.remaining = count
+        self.path = path
+
+    def disarm(self) -> None:
+        """
+        Stop profiling sampled requests.
+        """
+        self.sample_rate = 0.0
+        self.remaining = 0
+
+    def state(self) -> dict:
+        """
+        Return the sampling settings and the number of profiles left to take.
+        """
+        return {
+            "enabled": self.remaining > 0,
+            "sample_rate": self.sample_rate,
+            "remaining": self.remaining,
+            "path": self.path,
+        }
+
+    def requested(self, scope) -> bool:
+        """
+        Return whether the request asks to be profiled through the header.
+        """
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    def sampled(self, scope) -> bool:
+        """
+        Return whether the request is picked to be profiled by sampling.
+        """
+        return (
+            self.remaining > 0
+            and scope["path"].startswith(self.path)
+            and random() < self.sample_rate
+        )
+
+    def save(self, profile: cProfile.Profile, stacks: Counter[str], info: dict) -> str:
+        """
+        Write the files of a profile to the profile directory.
+
+        Returns the name of the profile. This does blocking I/O, so it is
+        called from a worker thread.
+        """
+        name = f"{datetime.now():%Y%m%dT%H%M%S}-{token_hex(3)}"
+        base = os.path.join(self.directory, name)
+        os.makedirs(self.directory, exist_ok=True)
+
+        profile.dump_stats(base + PROFILE_FILES["pstats"])
+        with open(base + PROFILE_FILES["collapsed"], "w") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{stack} {count}\n")
+        with open(base + PROFILE_INFO, "w") as file:
+            json.dump({"name": name, **info}, file)
+        return name
+
+    def list(self) -> list[dict]:
+        """
+        Return the descriptions of the saved profiles, most recent first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        profiles = []
+        for entry in sorted(os.listdir(self.directory), reverse=True):
+            stem, extension = os.path.splitext(entry)
+            if extension != PROFILE_INFO or not PROFILE_NAME.fullmatch(stem):
+                continue
+            with open(os.path.join(self.directory, entry)) as file:
+                profiles.append(json.load(file))
+        return profiles
+
+    def file(self, name: str, kind: str) -> str | None:
+        """
+        Return the path of a file of a saved profile, or `None` if it does not exist.
+        """
+        if not PROFILE_NAME.fullmatch(name) or kind not in PROFILE_FILES:
+            return None
+        path = os.path.join(self.directory, name + PROFILE_FILES[kind])
+        return path if os.path.isfile(path) else None
+
+
+@lru_cache()
+def get_profiler() -> Profiler | None:
+    """
+    Return the request profiler, or `None` if profiling is not configured.
+
+    Profiling is configured by setting the `profile_dir` setting.
+    """
+    settings = config.get_settings()
+    if not settings.profile_dir:
+        return None
+    return Profiler(
+        settings.profile_dir, settings.profile_interval, settings.profile_token
+    )
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling the requests picked by the request profiler.
+
+    Requests go straight through when profiling is not configured. Otherwise,
+    requests that are not profiled go through after a couple of attribute
+    checks; the profile of the others is saved once their response has been
+    sent.
+    """
+
+    def __init__(self, app):
+        self.app = app  # Wrapped ASGI application
+
+    async def __call__(self, scope, receive, send):
+        profiler = get_profiler() if scope["type"] == "http" else None
+        if profiler is None or profiler.active:
+            await self.app(scope, receive, send)
+            return
+
+        requested = profiler.token is not None and profiler.requested(scope)
+        if not requested and not profiler.sampled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # Reported if the application fails before responding
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        if not requested:
+            profiler.remaining -= 1
+        profiler.active = True
+        sampler = StackSampler(threading.get_ident(), profiler.interval)
+        profile = cProfile.Profile()
+        sampler.start()
+        started = perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            profile.disable()
+            duration = perf_counter() - started
+            sampler.stop()
+            profiler.active = False
+
+            route = scope.get("route")
+            info = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route.path if route is not None else None,
+                "status": status,
+                "duration_ms": duration * 1000,
+                "samples": sum(sampler.stacks.values()),
+                "created_at": datetime.now().isoformat(),
+            }
+            await asyncio.to_thread(profiler.save, profile, sampler.stacks, info)
@@ -1,103 +1,219 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Iterable
 from uuid import UUID, uuid4
 
-from fastapi import Depends
+import orjson
+from fastapi import Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 
+from ..models.pagination import PaginationQueryParams
 from ..models.reporter import (
     Reporter,
     ReporterDTO,  # Models for reporters
     ReporterQueryParams,
 )
+from ..store.backend import get_storage
+from .cache import get_token_cache
+from .pagination import decode_cursor, encode_cursor
 
 
-def search_reporter_db(username: str):
+async def search_reporter_db(username: str):
     """
     Search for a reporter in the database by username.
 
-    This function returns a `ReporterDTO` if the username exists in `REPORTERS_DB`.
-    If the username does not exist, it returns `None`.
+    This function returns the `ReporterDTO` of the username in the configured
+    storage engine, which may be shared with other callers and must not be
+    changed. If the username does not exist, it returns `None`.
     """
-    if username in REPORTERS_DB:
-        return ReporterDTO(**REPORTERS_DB[username])
+    return await get_storage().reporters.get_model(username)
 
 
-def search_reporter(username: str):
+async def update_reporter_db(username: str, changes: dict):
     """
-    Search for a basic reporter in the database by username.
+    Apply field changes to a reporter in the database.
 
-    This function returns a `Reporter` if the username exists in `REPORTERS_DB`.
-    If the username does not exist, it returns `None`.
+    This function updates the reporter in the configured storage engine and
+    drops the cached tokens issued to it, so that the next request made with
+    one of them sees the change (for example, a disabled account). It returns
+    the updated `ReporterDTO`, or `None` if the username does not exist.
     """
-    if username in REPORTERS_DB:
-        return Reporter(**REPORTERS_DB[username])
+    reporter = await get_storage().reporters.update(username, changes)
+    get_token_cache().invalidate(username)
+    if reporter is not None:
+        return ReporterDTO(**reporter)
 
 
-def search_reporters_by_query(
-    q: Annotated[ReporterQueryParams, Depends(ReporterQueryParams)]
+async def unknown_reporters(usernames: Iterable[str]) -> set[str]:
+    """
+    Return the given usernames that do not belong to any reporter.
+
+    Incidents reference their reporter by username, so the username given when
+    an incident is created or changed must belong to a reporter.
+    """
+    usernames = set(usernames)
+    return usernames - (await get_storage().reporters.get_many(usernames)).keys()
+
+
+async def check_reporter(username: str | None):
+    """
+    Check that a username given for an incident belongs to a reporter.
+
+    This function raises an HTTP 422 exception if it does not. `None`, which
+    leaves the reporter of an incident unchanged, is always accepted.
+    """
+    if username is not None and await unknown_reporters([username]):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Unknown reporter",
+        )
+
+
+# Fields of a reporter joined into the incidents it reported
+JOINED_FIELDS = tuple(Reporter.model_fields)
+
+
+class ReporterMemo:
+    """
+    Memo of the reporters joined into the incidents of a single response.
+
+    Incidents only hold the username of their reporter. The memo reads the
+    reporters of a whole page in a single call to the storage engine, and
+    serializes each of them only once, however many incidents of the page it
+    reported. A new memo is used for every response, so a change to a reporter
+    shows in the very next one.
+
+    A username that belongs to no reporter, which incidents stored before
+    reporters were checked may still hold, is joined with empty fields.
+    """
+
+    def __init__(self):
+        self._reporters: dict[str, dict] = {}  # Joined fields, by username
+        self._fragments: dict[str, bytes] = {}  # Serialized reporters, by username
+
+    async def load(self, usernames: Iterable[str]) -> None:
+        """
+        Read the reporters of the given usernames that are not in the memo yet.
+        """
+        missing = set(usernames) - self._reporters.keys()
+        if not missing:
+            return
+        found = await get_storage().reporters.get_many(missing)
+        for username in missing:
+            reporter = found.get(username)
+            self._reporters[username] = (
+                {field: reporter[field] for field in JOINED_FIELDS}
+                if reporter is not None
+                else {**dict.fromkeys(JOINED_FIELDS, ""), "username": username}
+            )
+
+    def get(self, username: str) -> dict:
+        """
+        Return the joined fields of a loaded reporter.
+        """
+        return self._reporters[username]
+
+    def fragment(self, username: str) -> bytes:
+        """
+        Return the JSON serialization of a loaded reporter.
+        """
+        fragment = self._fragments.get(username)
+        if fragment is None:
+            fragment = orjson.dumps(self._reporters[username])
+            self._fragments[username] = fragment
+        return fragment
+
+
+def reporter_cursor(reporter: ReporterDTO):
+    """
+    Build the opaque pagination cursor pointing right after a reporter.
+    """
+    return encode_cursor(reporter.username)
+
+
+async def list_reporters_db(
+    pag: Annotated[PaginationQueryParams, Depends(PaginationQueryParams)],
+    q: Annotated[ReporterQueryParams, Depends(ReporterQueryParams)],
 ):
     """
-    Search for reporters based on query parameters.
-
-    This function filters the `REPORTERS_DB` based on the query parameters
-    provided by `ReporterQueryParams`. It supports filtering by first name,
-    last name, username, and company.
-    """
-    filtered_reporters = REPORTERS_DB
-
-    if q.first_name:
-        filtered_reporters = [
-            reporter
-            for reporter in REPORTERS_DB.values()
-            if q.first_name.lower() in reporter.name.lower()
-        ]
-
-    if q.last_name:
-        filtered_reporters = [
-            reporter
-            for reporter in filtered_reporters
-            if q.last_name.lower() in reporter.name.lower()
-        ]
-
-    if q.username:
-        filtered_reporters = [
-            reporter
-            for reporter in filtered_reporters
-            if reporter.username == q.username
-        ]
-
-    if q.company:
-        filtered_reporters = [
-            reporter
-            for reporter in filtered_reporters
-            if q.company.lower() in reporter.company.lower()
-        ]
-
-    return filtered_reporters
-
-
-# A mock database of reporters with sample data for testing and development
-REPORTERS_DB = {
-    "john.doe": {
-        "id": uuid4(),
-        "username": "john.doe",
-        "name": "John Doe",
-        "email": "john.doe@mail.com",
-        "password": "$2a$12$haRs4/ppy4hvfTCNNOwX6eUBz5Wjk88bCLjcQcd6meaKkpGWQoc.C",
-        "company": "Byron Labs",
-        "disabled": False,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now(),
-    },
-    "jane.doe": {
-        "id": uuid4(),
-        "username": "jane.doe",
-        "name": "Jane Doe",
-        "email": "jane.doe@mail.com",
-        "password": "$2a$12$haRs4/ppy4hvfTCNNOwX6eUBz5Wjk88bCLjcQcd6meaKkpGWQoc.C",
-        "company": "Cyberdyne Systems",
-        "disabled": True,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now(),
-    },
-}
+    Retrieve a page of the reporters matching the query parameters.
+
+    This function returns the requested page, in listing order, along with the
+    cursor of the next page (or `None` on the last page). Reporters can be
+    filtered by exact username, by company regardless of case, and by the start
+    of their first or last name, through the indexes of the storage engine. If
+    a cursor is given, the listing resumes right after the reporter it points
+    to. Raises an HTTP 400 exception for an invalid cursor.
+    """
+    after = None
+    if pag.cursor:
+        values = decode_cursor(pag.cursor)
+        if len(values) != 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        after = values[0]
+
+    # Request one extra entry that tells whether there is a next page
+    limit = pag.limit + 1 if pag.limit else None
+    try:
+        reporters = await get_storage().reporters.search(q, after, pag.skip or 0, limit)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    next_cursor = None
+    if pag.limit and len(reporters) > pag.limit:
+        reporters.pop()  # Drop the look-ahead entry
+        next_cursor = reporter_cursor(reporters[-1])
+
+    return reporters, next_cursor
+
+
+# Serializer of the reporter models of a listing, built once
+REPORTER_LIST = TypeAdapter(list[ReporterDTO])
+
+
+def reporters_response(reporters: list[ReporterDTO], **meta):
+    """
+    Build the JSON response of a page of reporters.
+
+    The reporter models are serialized as they are, followed by the given
+    metadata fields. The body has the shape of `ReportersRes`, but the models
+    are not validated again.
+    """
+    content = b'{"data":' + REPORTER_LIST.dump_json(reporters) + b","
+    return Response(content + orjson.dumps(meta)[1:], media_type="application/json")
+
+
+def sample_reporters() -> dict[str, dict]:
+    """
+    Build the mock database of reporters, with sample data for testing and development.
+
+    The storage engines are not filled from here at every start: the sample data
+    is written once to the seed snapshot, which they are then loaded from.
+    """
+    return {
+        "john.doe": {
+            "id": uuid4(),
+            "username": "john.doe",
+            "name": "John Doe",
+            "email": "john.doe@mail.com",
+            "password": "$2a$12$haRs4/ppy4hvfTCNNOwX6eUBz5Wjk88bCLjcQcd6meaKkpGWQoc.C",
+            "company": "Byron Labs",
+            "disabled": False,
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+        },
+        "jane.doe": {
+            "id": uuid4(),
+            "username": "jane.doe",
+            "name": "Jane Doe",
+            "email": "jane.doe@mail.com",
+            "password": "$2a$12$haRs4/ppy4hvfTCNNOwX6eUBz5Wjk88bCLjcQcd6meaKkpGWQoc.C",
+            "company": "Cyberdyne Systems",
+            "disabled": True,
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+        },
+    }
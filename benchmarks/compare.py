@@ -0,0 +1,82 @@
+import argparse
+import json
+import sys
+
+# Metrics compared between runs, and whether a higher value is better
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "throughput": True,
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[dict]:
+    """
+    Compare the scenarios of two benchmark results.
+
+    Returns one row per scenario and metric found in both results, with the
+    relative change in percent and whether it is a regression, that is a change
+    for the worse of more than `threshold` percent. Reports without throughput,
+    such as the startup report, are compared on their percentiles only.
+    """
+    rows = []
+    for name, results in current["scenarios"].items():
+        reference = baseline["scenarios"].get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in reference or metric not in results:
+                continue
+            before, after = reference[metric], results[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            worse = -change if higher_is_better else change
+            rows.append(
+                {
+                    "scenario": name,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": change,
+                    "regression": worse > threshold,
+                }
+            )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Compare benchmark results against a baseline, failing on regressions.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark results against a baseline."
+    )
+    parser.add_argument("baseline", help="JSON results of the baseline run")
+    parser.add_argument("current", help="JSON results of the run to check")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="percentage by which a metric may get worse (default 10)",
+    )
+    options = parser.parse_args(argv)
+
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    with open(options.current) as file:
+        current = json.load(file)
+    if baseline["meta"]["size"] != current["meta"]["size"]:
+        print("warning: the runs used different dataset sizes", file=sys.stderr)
+
+    rows = compare(baseline, current, options.threshold)
+    for row in rows:
+        print(
+            f"{row['scenario']:>8} {row['metric']:>10}: {row['baseline']:10.2f}"
+            f" -> {row['current']:10.2f} ({row['change']:+7.1f}%)"
+            f"{'  REGRESSION' if row['regression'] else ''}"
+        )
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
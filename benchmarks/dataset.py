@@ -0,0 +1,124 @@
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from random import Random
+from uuid import UUID
+
+from app.core import config
+from app.models.incident import IncidentDTO, IncidentSeverity, IncidentStatus
+from app.store.backend import get_storage
+from app.store.seed import get_seed, write_seed
+from app.utils.reporter import sample_reporters
+
+# Dataset sizes selectable by name, in number of incidents
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Number of incidents per synthetic reporter
+INCIDENTS_PER_REPORTER = 100
+
+# Password of every synthetic reporter, which is also the password of the mock
+# reporters, so their hash is reused instead of hashing it once per reporter
+PASSWORD = "byronlabs"
+
+# Fixed reference time, so that the generated timestamps never change
+EPOCH = datetime(2024, 1, 1)
+
+# Words the synthetic titles and descriptions are made of
+WORDS = (
+    "network server database firewall backup malware phishing outage breach "
+    "credential laptop router storage payment vpn email certificate ransomware "
+    "access patch login cluster gateway endpoint token scanner"
+).split()
+
+
+def _uuid(rng: Random) -> UUID:
+    """
+    Draw a random version 4 UUID from a seeded generator.
+    """
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def generate_reporters(count: int, seed: int = 0) -> dict[str, dict]:
+    """
+    Generate reporters in the format of the seed reporters, keyed by username.
+
+    The same count and seed always give the same reporters. Every reporter has
+    the password of the mock reporters.
+    """
+    rng = Random(seed)
+    password = sample_reporters()["john.doe"]["password"]
+    reporters = {}
+    for i in range(count):
+        username = f"reporter{i:05d}"
+        created_at = EPOCH - timedelta(days=rng.randint(0, 730))
+        reporters[username] = {
+            "id": _uuid(rng),
+            "username": username,
+            "name": f"Reporter {i}",
+            "email": f"{username}@mail.com",
+            "password": password,
+            "company": f"Company {i % 50}",
+            "disabled": False,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+    return reporters
+
+
+def generate_incidents(
+    count: int, reporters: dict[str, dict], seed: int = 0
+) -> list[IncidentDTO]:
+    """
+    Generate incidents reported by the given reporters.
+
+    The same count, reporters and seed always give the same incidents. Incident
+    dates spread over the year before `EPOCH`, and the incidents are built
+    without validation, as their values are valid by construction.
+    """
+    rng = Random(seed)
+    authors = list(reporters)  # Usernames the incidents reference
+    severities = list(IncidentSeverity)
+    statuses = list(IncidentStatus)
+
+    incidents = []
+    for i in range(count):
+        created_at = EPOCH - timedelta(seconds=rng.randint(0, 365 * 86400))
+        updated_at = created_at + timedelta(seconds=rng.randint(0, 7 * 86400))
+        incidents.append(
+            IncidentDTO.model_construct(
+                id=_uuid(rng),
+                title=" ".join(rng.choices(WORDS, k=3)).capitalize(),
+                description=" ".join(rng.choices(WORDS, k=12)).capitalize() + ".",
+                severity=rng.choice(severities),
+                reporter=rng.choice(authors),
+                status=rng.choice(statuses),
+                date=created_at - timedelta(seconds=rng.randint(0, 3 * 86400)),
+                created_at=created_at,
+                updated_at=updated_at,
+            )
+        )
+    return incidents
+
+
+def install(
+    size: int, path: str, seed: int = 0
+) -> tuple[list[IncidentDTO], dict[str, dict]]:
+    """
+    Write a synthetic dataset of `size` incidents as the seed of the application.
+
+    The dataset is written to the seed snapshot at `path`, which the settings
+    are pointed to. The mock reporters are kept, so their credentials still
+    work, and one synthetic reporter is added per `INCIDENTS_PER_REPORTER`
+    incidents. This must run before the application starts, as the storage
+    engine is loaded from the seed on startup. Returns the generated incidents
+    and reporters.
+    """
+    reporters = generate_reporters(max(size // INCIDENTS_PER_REPORTER, 1), seed)
+    incidents = generate_incidents(size, reporters, seed)
+    write_seed(Path(path), incidents, {**sample_reporters(), **reporters})
+
+    os.environ["SEED_PATH"] = path
+    config.get_settings.cache_clear()  # Read the new seed path
+    get_seed.cache_clear()
+    get_storage.cache_clear()  # Build the storage engine from the new seed
+    return incidents, reporters
@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import timedelta
+from math import ceil
+from random import Random
+from time import perf_counter
+from typing import Callable
+
+# Scenarios of the benchmark. Every scenario reads or changes incidents, except
+# for the logins, which are much slower as they verify a bcrypt hash
+SCENARIOS = ("list", "filter", "sort", "get", "create", "update", "delete", "login")
+
+# Percentiles reported for every scenario
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Return the `p`-th percentile of sorted values, with the nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values), max(ceil(p / 100 * len(values)), 1)) - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """
+    Summarize the latencies of a scenario, in milliseconds, and its throughput.
+    """
+    values = sorted(latency * 1000 for latency in latencies)
+    summary = {
+        "requests": len(values),
+        "errors": errors,
+        "throughput": len(values) / elapsed if elapsed else 0.0,  # Requests/second
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "min_ms": values[0] if values else 0.0,
+        "max_ms": values[-1] if values else 0.0,
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = percentile(values, p)
+    return summary
+
+
+class Workload:
+    """
+    Deterministic generator of the requests of every scenario.
+
+    Requests are drawn from a seeded random generator and from the synthetic
+    dataset, so two runs with the same options send the same requests. Each
+    builder returns the method, URL and keyword arguments of one request.
+    """
+
+    def __init__(self, incidents: list, reporters: dict[str, dict], seed: int):
+        self.rng = Random(seed)
+        self.ids = [str(incident.id) for incident in incidents]
+        self.usernames = list(reporters)
+        self.words = sorted(
+            {word.lower() for i in incidents[:1000] for word in i.title.split()}
+        )
+        self.dates = sorted(incident.date for incident in incidents[:1000])
+
+        # Incidents are deleted once each, and never read or updated afterwards
+        self.deletable = self.ids[: len(self.ids) // 2]
+        self.ids = self.ids[len(self.ids) // 2 :]
+        self.rng.shuffle(self.deletable)
+
+    def list(self):
+        return (
+            "GET",
+            "/incident/all",
+            {"params": {"limit": 50, "skip": self.rng.randrange(0, 500, 50)}},
+        )
+
+    def filter(self):
+        rng = self.rng
+        params = {"limit": 50}
+        choice = rng.randrange(4)
+        if choice == 0:
+            params["severity"] = rng.choice(["low", "medium", "high"])
+            params["status"] = rng.choice(
+                ["not_started", "in_progress", "paused", "closed"]
+            )
+        elif choice == 1:
+            params["q"] = rng.choice(self.words)
+        elif choice == 2:
+            params["reporter"] = rng.choice(self.usernames)
+        else:
+            start = rng.choice(self.dates)
+            params["date_from"] = start.isoformat()
+            params["date_to"] = (start + timedelta(days=1)).isoformat()
+        return "GET", "/incident/all", {"params": params}
+
+    def sort(self):
+        params = {
+            "limit": 50,
+            "sort_by": self.rng.choice(
+                ["title", "reporter", "severity", "date", "created_at", "updated_at"]
+            ),
+            "sort_order": self.rng.choice([1, -1]),
+        }
+        return "GET", "/incident/all", {"params": params}
+
+    def get(self):
+        return "GET", f"/incident/{self.rng.choice(self.ids)}", {}
+
+    def create(self):
+        body = {
+            "title": " ".join(self.rng.choices(self.words, k=3)).capitalize(),
+            "description": "Created by the benchmark.",
+            "severity": self.rng.choice(["low", "medium", "high"]),
+            "reporter": self.rng.choice(self.usernames),
+            "status": "not_started",
+            "date": self.rng.choice(self.dates).isoformat(),
+        }
+        return "POST", "/incident/", {"json": body}
+
+    def update(self):
+        body = {
+            "severity": self.rng.choice(["low", "medium", "high"]),
+            "status": self.rng.choice(
+                ["not_started", "in_progress", "paused", "closed"]
+            ),
+        }
+        return "PUT", f"/incident/{self.rng.choice(self.ids)}", {"json": body}
+
+    def delete(self):
+        return "DELETE", f"/incident/{self.deletable.pop()}", {}
+
+    def login(self):
+        data = {"username": self.rng.choice(self.usernames), "password": "byronlabs"}
+        return "POST", "/auth/login", {"data": data}
+
+
+async def run_scenario(client, build: Callable, requests: int, concurrency: int):
+    """
+    Send `requests` requests built by `build`, at most `concurrency` at a time.
+
+    Returns the latency of every successful request, the number of failed
+    requests and the elapsed time.
+    """
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            method, url, kwargs = build()
+            started_at = perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latency = perf_counter() - started_at
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(latency)
+
+    started_at = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, perf_counter() - started_at
+
+
+async def benchmark(options: argparse.Namespace, directory: str) -> dict:
+    """
+    Install the synthetic dataset, start the application and run the scenarios.
+
+    The seed snapshot of the dataset is written to `directory`.
+    """
+    import httpx
+
+    from app.main import app
+    from benchmarks.dataset import SIZES, install
+
+    size = SIZES[options.size]
+    started_at = perf_counter()
+    incidents, reporters = install(
+        size, os.path.join(directory, "seed.bin"), options.seed
+    )
+    workload = Workload(incidents, reporters, options.seed)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        setup_seconds = perf_counter() - started_at
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            response = await client.post(
+                "/auth/login", data={"username": "john.doe", "password": "byronlabs"}
+            )
+            client.headers["Authorization"] = (
+                f"Bearer {response.json()['access_token']}"
+            )
+
+            for name in options.scenarios:
+                build = getattr(workload, name)
+                requests = (
+                    options.login_requests if name == "login" else options.requests
+                )
+                if options.warmup and name not in ("delete", "login"):
+                    await run_scenario(
+                        client, build, options.warmup, options.concurrency
+                    )
+                latencies, errors, elapsed = await run_scenario(
+                    client, build, requests, options.concurrency
+                )
+                results[name] = summarize(latencies, errors, elapsed)
+                print(
+                    f"{name:>8}: p50 {results[name]['p50_ms']:8.2f} ms"
+                    f"  p95 {results[name]['p95_ms']:8.2f} ms"
+                    f"  p99 {results[name]['p99_ms']:8.2f} ms"
+                    f"  {results[name]['throughput']:9.1f} req/s"
+                    f"  {errors} errors",
+                    file=sys.stderr,
+                )
+
+    return {
+        "meta": {
+            "size": options.size,
+            "incidents": size,
+            "backend": options.backend,
+            "requests": options.requests,
+            "login_requests": options.login_requests,
+            "concurrency": options.concurrency,
+            "warmup": options.warmup,
+            "seed": options.seed,
+            "setup_seconds": setup_seconds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Run the benchmarks selected on the command line and write their results.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load and latency benchmarks of the API, run in-process."
+    )
+    parser.add_argument(
+        "--size",
+        choices=["10k", "100k", "1m"],
+        default="10k",
+        help="number of incidents",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["memory", "sqlite"],
+        default="memory",
+        help="storage engine",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=500, help="requests per scenario"
+    )
+    parser.add_argument(
+        "--login-requests", type=int, default=20, help="requests of the login scenario"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="requests in flight at once"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=20, help="unmeasured requests per scenario"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed of the dataset and requests"
+    )
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=SCENARIOS,
+        help="scenario to run (repeatable, default all)",
+    )
+    parser.add_argument(
+        "--output", help="file the JSON results are written to (default stdout)"
+    )
+    options = parser.parse_args(argv)
+    options.scenarios = options.scenarios or list(SCENARIOS)
+
+    # The settings are read when the application first needs them, so the
+    # environment is prepared before anything is imported from it
+    os.environ.setdefault("JWT_SECRET", "benchmark")
+    os.environ["STORAGE_BACKEND"] = options.backend
+    os.environ.pop("JOURNAL_DIR", None)
+    with tempfile.TemporaryDirectory() as directory:
+        # A new database file, as the SQLite engine only seeds empty databases
+        os.environ["SQLITE_PATH"] = os.path.join(directory, "benchmark.db")
+        results = asyncio.run(benchmark(options, directory))
+
+    output = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run import PERCENTILES, percentile
+
+# Phases of the startup measured in every fresh interpreter: importing the
+# application, loading the storage engine, both, and reading the seed snapshot
+# (which is part of the load)
+PHASES = ("import", "load", "total", "seed")
+
+
+def measure() -> dict:
+    """
+    Measure the startup of the application in the current interpreter.
+
+    Returns the seconds spent importing `app.main` and running the startup of
+    its lifespan, which loads the storage engine, along with the seconds spent
+    reading the seed snapshot. Only meaningful in a fresh interpreter, in which
+    nothing has been imported from the application yet.
+    """
+    started = time.perf_counter()
+    from app.main import app
+    from app.store.seed import get_seed
+
+    imported = time.perf_counter()
+
+    async def start():
+        async with app.router.lifespan_context(app):
+            return time.perf_counter()
+
+    loaded = asyncio.run(start())
+    return {
+        "import": imported - started,
+        "load": loaded - imported,
+        "total": loaded - started,
+        "seed": sum(get_seed().timings.values()),
+    }
+
+
+def run(runs: int, env: dict[str, str]) -> list[dict]:
+    """
+    Measure the startup of `runs` fresh interpreters, one after the other.
+    """
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            env=env,
+            check=True,
+            capture_output=True,
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    return samples
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Measure the startup time of the application and write a JSON report.
+    """
+    parser = argparse.ArgumentParser(
+        description="Startup time of the application, in fresh interpreters."
+    )
+    parser.add_argument(
+        "--size",
+        choices=["10k", "100k", "1m"],
+        help="seed the application with a synthetic dataset (default mock data)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["memory", "sqlite"],
+        default="memory",
+        help="storage engine",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=10, help="number of measured startups"
+    )
+    parser.add_argument(
+        "--output", help="file the JSON report is written to (default stdout)"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.child:
+        print(json.dumps(measure()))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "JWT_SECRET": os.environ.get("JWT_SECRET", "benchmark"),
+            "STORAGE_BACKEND": options.backend,
+            "SEED_PATH": os.path.join(directory, "seed.bin"),
+            "SQLITE_PATH": os.path.join(directory, "benchmark.db"),
+        }
+        env.pop("JOURNAL_DIR", None)
+        if options.size:
+            from benchmarks.dataset import SIZES, install
+
+            install(SIZES[options.size], env["SEED_PATH"])
+
+        # The first startup writes the missing seed snapshot or SQLite database,
+        # so it is left out: the report is about restarts of the application
+        run(1, env)
+        samples = run(options.runs, env)
+
+    phases = {}
+    for phase in PHASES:
+        values = sorted(sample[phase] * 1000 for sample in samples)
+        phases[phase] = {
+            "runs": len(values),
+            "mean_ms": sum(values) / len(values),
+            "min_ms": values[0],
+            "max_ms": values[-1],
+            **{f"p{p}_ms": percentile(values, p) for p in PERCENTILES},
+        }
+        print(
+            f"{phase:>8}: p50 {phases[phase]['p50_ms']:9.2f} ms"
+            f"  p95 {phases[phase]['p95_ms']:9.2f} ms",
+            file=sys.stderr,
+        )
+
+    report = json.dumps(
+        {
+            "meta": {
+                "size": options.size or "mock",
+                "backend": options.backend,
+                "runs": options.runs,
+                "python": sys.version.split()[0],
+            },
+            "scenarios": phases,
+        },
+        indent=2,
+    )
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from jose import jwt
+
+# The settings are read from the environment, which must hold a JWT secret
+os.environ["JWT_SECRET"] = "test-secret"
+
+from app.core import config  # noqa: E402
+from app.main import app  # noqa: E402
+from app.store.backend import get_storage  # noqa: E402
+from app.store.seed import get_seed  # noqa: E402
+from app.utils.cache import (  # noqa: E402
+    get_fragment_cache,
+    get_query_cache,
+    get_token_cache,
+)
+from app.utils.feed import get_broadcaster  # noqa: E402
+from app.utils.metrics import get_metrics  # noqa: E402
+from app.utils.profiling import get_profiler  # noqa: E402
+
+# Shared objects of the application, created on first use from the settings
+SHARED = (
+    config.get_settings,
+    get_seed,
+    get_storage,
+    get_token_cache,
+    get_fragment_cache,
+    get_query_cache,
+    get_broadcaster,
+    get_metrics,
+    get_profiler,
+)
+
+
+def reset_application() -> None:
+    """
+    Drop the shared objects of the application, so the next test builds new ones.
+    """
+    for factory in SHARED:
+        factory.cache_clear()
+
+
+def auth_headers(username: str = "john.doe") -> dict[str, str]:
+    """
+    Build the headers of a request authenticated as a reporter of the seed data.
+    """
+    settings = config.get_settings()
+    claims = {
+        "sub": username,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+    }
+    token = jwt.encode(claims, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, monkeypatch, tmp_path):
+    """
+    Configure the application with each storage engine, on files of the test.
+
+    The enabled reporter of the seed data, john.doe, is an administrator.
+    """
+    monkeypatch.setenv("STORAGE_BACKEND", request.param)
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "incidents.db"))
+    monkeypatch.setenv("SEED_PATH", str(tmp_path / "seed.bin"))
+    monkeypatch.setenv("ADMIN_USERS", '["john.doe"]')
+    return request.param
+
+
+@pytest.fixture
+async def client(backend):
+    """
+    HTTP client of the application, started with the configured storage engine.
+    """
+    reset_application()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test", headers=auth_headers()
+        ) as client:
+            yield client
+    reset_application()
@@ -0,0 +1,59 @@
+import pytest
+
+from app.utils.cache import get_token_cache
+
+from .conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def set_disabled(client, username: str, disabled: bool):
+    return await client.put(f"/reporter/{username}", json={"disabled": disabled})
+
+
+async def test_disabled_reporter_is_rejected_right_away(client):
+    response = await set_disabled(client, "jane.doe", False)
+    assert response.status_code == 200, response.text
+    headers = auth_headers("jane.doe")
+
+    # The first request caches the verified token
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 200, response.text
+    token = headers["Authorization"].removeprefix("Bearer ")
+    assert get_token_cache().get(token) is not None
+
+    response = await set_disabled(client, "jane.doe", True)
+    assert response.status_code == 200, response.text
+    assert response.json()["disabled"] is True
+
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+async def test_reporter_changes_show_in_cached_tokens(client):
+    headers = auth_headers("john.doe")
+    assert (await client.get("/auth/me", headers=headers)).json()["company"] == (
+        "Byron Labs"
+    )
+
+    response = await client.put("/reporter/john.doe", json={"company": "Acme"})
+    assert response.status_code == 200, response.text
+
+    response = await client.get("/auth/me", headers=headers)
+    assert response.json()["company"] == "Acme"
+
+
+async def test_only_administrators_update_reporters(client):
+    await set_disabled(client, "jane.doe", False)
+    response = await client.put(
+        "/reporter/john.doe",
+        json={"disabled": True},
+        headers=auth_headers("jane.doe"),
+    )
+    assert response.status_code == 403
+
+
+async def test_unknown_reporter_is_not_found(client):
+    response = await set_disabled(client, "nobody", True)
+    assert response.status_code == 404
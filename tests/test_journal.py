@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.models.incident import IncidentDTO, IncidentQueryParams
+from app.store.incident import IncidentStore
+from app.store.journal import JOURNAL_FILE, DurableMemoryStorage
+
+pytestmark = pytest.mark.anyio
+
+
+def make_incident(title: str) -> IncidentDTO:
+    return IncidentDTO(
+        id=uuid4(),
+        title=title,
+        description=f"Description of {title}",
+        severity="medium",
+        reporter="john.doe",
+        date=datetime(2026, 1, 1),
+    )
+
+
+def make_storage(directory) -> DurableMemoryStorage:
+    """
+    Build a journaled memory engine whose snapshots are only taken on startup.
+    """
+    return DurableMemoryStorage(
+        IncidentStore(), {}, str(directory), fsync="never", snapshot_interval=3600
+    )
+
+
+async def stored_titles(storage: DurableMemoryStorage) -> dict:
+    incidents = await storage.incidents.search(IncidentQueryParams(), "title", False)
+    return {incident.id: incident.title for incident in incidents}
+
+
+async def test_journal_is_replayed_after_restart(tmp_path):
+    storage = make_storage(tmp_path)
+    await storage.open()
+    try:
+        kept, changed, removed = (make_incident(title) for title in "abc")
+        for incident in (kept, changed, removed):
+            await storage.incidents.add(incident)
+        await storage.incidents.update(changed.id, {"title": "changed"})
+        await storage.incidents.remove(removed.id)
+        expected = await stored_titles(storage)
+    finally:
+        await storage.close()
+
+    restarted = make_storage(tmp_path)
+    await restarted.open()
+    try:
+        assert await stored_titles(restarted) == expected
+        assert expected == {kept.id: "a", changed.id: "changed"}
+    finally:
+        await restarted.close()
+
+
+async def test_torn_record_ends_the_replay(tmp_path):
+    storage = make_storage(tmp_path)
+    await storage.open()
+    incident = make_incident("a")
+    try:
+        await storage.incidents.add(incident)
+    finally:
+        await storage.close()
+
+    # A crash in the middle of a write leaves a partial record at the end
+    with open(tmp_path / JOURNAL_FILE, "ab") as journal:
+        journal.write(b'[99,"put",{"id":')
+
+    restarted = make_storage(tmp_path)
+    await restarted.open()
+    try:
+        assert await stored_titles(restarted) == {incident.id: "a"}
+    finally:
+        await restarted.close()
+
+
+async def test_failed_write_stops_acknowledging_changes(tmp_path):
+    storage = make_storage(tmp_path)
+    await storage.open()
+    try:
+
+        def fail(data: bytes, sync: bool) -> None:
+            raise OSError("No space left on device")
+
+        storage.journal._write = fail
+        await storage.incidents.add(make_incident("lost"))
+        await asyncio.sleep(storage.journal.fsync_interval + 0.1)  # Writer fails
+
+        with pytest.raises(RuntimeError):
+            await storage.incidents.add(make_incident("rejected"))
+    finally:
+        await storage.close()
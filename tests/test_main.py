@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+
+def test_application_imports_without_settings():
+    # Tooling such as the OpenAPI export imports the application without secrets
+    env = {key: value for key, value in os.environ.items() if key != "JWT_SECRET"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,86 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# Incident dated with a UTC offset, later than every incident of the seed data
+AWARE_INCIDENT = {
+    "title": "Offset incident",
+    "description": "Reported with a timezone-aware date",
+    "severity": "high",
+    "reporter": "john.doe",
+    "status": "not_started",
+    "date": "2099-01-01T00:00:00+05:00",
+}
+
+
+async def read_pages(client, **params) -> list[str]:
+    """
+    Read a whole incident listing page by page, returning the incident ids.
+    """
+    ids = []
+    params = {"limit": 4, **params}
+    while True:
+        response = await client.get("/incident/all", params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        ids += [incident["id"] for incident in body["data"]]
+        if body["next_cursor"] is None:
+            return ids
+        params["cursor"] = body["next_cursor"]
+
+
+@pytest.mark.parametrize("sort_by", ["date", "created_at", "title", "severity"])
+@pytest.mark.parametrize("sort_order", [1, -1])
+async def test_cursor_pages_cover_every_incident_once(client, sort_by, sort_order):
+    created = await client.post("/incident/", json=AWARE_INCIDENT)
+    assert created.status_code == 200, created.text
+
+    full = await client.get(
+        "/incident/all", params={"sort_by": sort_by, "sort_order": sort_order}
+    )
+    expected = [incident["id"] for incident in full.json()["data"]]
+
+    pages = await read_pages(client, sort_by=sort_by, sort_order=sort_order)
+    assert pages == expected
+    assert len(set(pages)) == full.json()["total"]
+
+
+async def test_cursor_after_aware_date_is_accepted(client):
+    created = (await client.post("/incident/", json=AWARE_INCIDENT)).json()
+
+    first = await client.get(
+        "/incident/all", params={"limit": 1, "sort_by": "date", "sort_order": -1}
+    )
+    assert [incident["id"] for incident in first.json()["data"]] == [created["id"]]
+
+    second = await client.get(
+        "/incident/all",
+        params={
+            "limit": 1,
+            "sort_by": "date",
+            "sort_order": -1,
+            "cursor": first.json()["next_cursor"],
+        },
+    )
+    assert second.status_code == 200, second.text
+    assert second.json()["data"][0]["id"] != created["id"]
+
+
+async def test_date_filters_compare_instants(client):
+    created = (await client.post("/incident/", json=AWARE_INCIDENT)).json()
+
+    # The incident happened at 19:00 UTC on the previous day
+    before = await client.get(
+        "/incident/all", params={"date_from": "2098-12-31T18:30:00Z"}
+    )
+    assert [incident["id"] for incident in before.json()["data"]] == [created["id"]]
+
+    after = await client.get(
+        "/incident/all", params={"date_from": "2098-12-31T19:30:00Z"}
+    )
+    assert after.json()["data"] == []
+
+
+async def test_invalid_cursor_is_rejected(client):
+    response = await client.get("/incident/all", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
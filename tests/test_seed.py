@@ -0,0 +1,46 @@
+import time
+
+from app.store.seed import Seed, read_seed_header, sample_fingerprint, write_seed
+from app.utils.reporter import sample_reporters
+
+
+def test_missing_snapshot_is_built(tmp_path):
+    seed = Seed(tmp_path / "data" / "seed.bin", max_age=3600)
+    assert "john.doe" in seed.reporters()
+    assert "build" in seed.timings
+    assert read_seed_header(seed.path)[0] == sample_fingerprint()
+
+    # A current snapshot is read as it is
+    again = Seed(seed.path, max_age=3600)
+    again.reporters()
+    assert "build" not in again.timings
+
+
+def test_stale_snapshot_is_rebuilt(tmp_path):
+    path = tmp_path / "seed.bin"
+    Seed(path).reporters()
+    built_at = read_seed_header(path)[1]
+
+    time.sleep(0.01)
+    seed = Seed(path, max_age=0)
+    seed.reporters()
+    assert "build" in seed.timings
+    assert read_seed_header(path)[1] > built_at
+
+
+def test_snapshot_of_another_generator_is_rebuilt(tmp_path):
+    path = tmp_path / "seed.bin"
+    write_seed(path, [], sample_reporters(), fingerprint=b"\xff" * 16)
+
+    seed = Seed(path)
+    assert len(list(seed.incidents())) > 0
+    assert read_seed_header(path)[0] == sample_fingerprint()
+
+
+def test_snapshot_of_other_data_is_kept(tmp_path):
+    path = tmp_path / "seed.bin"
+    write_seed(path, [], sample_reporters())  # Like the benchmark datasets
+
+    seed = Seed(path, max_age=0)
+    assert list(seed.incidents()) == []
+    assert "build" not in seed.timings
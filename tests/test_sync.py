@@ -0,0 +1,75 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# Greatest integer JavaScript clients read exactly
+MAX_SAFE_INTEGER = 2**53 - 1
+
+NEW_INCIDENT = {
+    "title": "New incident",
+    "description": "Created after the first sync",
+    "severity": "low",
+    "reporter": "john.doe",
+    "status": "not_started",
+    "date": "2026-01-01T00:00:00",
+}
+
+
+async def sync(client, since: int, limit: int | None = None) -> dict:
+    """
+    Sync the incidents changed since a version, reading every page of changes.
+
+    Returns the changed incident ids, the deleted incident ids, and the version
+    to sync from next.
+    """
+    params = {"since": since}
+    if limit is not None:
+        params["limit"] = limit
+    changed, deleted = [], []
+    while True:
+        response = await client.get("/incident/changes", params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        changed += [incident["id"] for incident in body["data"]]
+        deleted += [tombstone["id"] for tombstone in body["deleted"]]
+        assert body["since"] <= MAX_SAFE_INTEGER
+        assert all(t["version"] <= MAX_SAFE_INTEGER for t in body["deleted"])
+        if body["next_cursor"] is None:
+            return {"changed": changed, "deleted": deleted, "since": body["since"]}
+        params["cursor"] = body["next_cursor"]
+
+
+async def test_first_sync_returns_every_incident(client):
+    listing = (await client.get("/incident/all")).json()
+    first = await sync(client, 0)
+    assert sorted(first["changed"]) == sorted(i["id"] for i in listing["data"])
+    assert first["deleted"] == []
+
+
+async def test_paged_sync_matches_single_page(client):
+    whole = await sync(client, 0)
+    paged = await sync(client, 0, limit=3)
+    assert sorted(paged["changed"]) == sorted(whole["changed"])
+    assert len(paged["changed"]) == len(set(paged["changed"]))
+    assert paged["since"] == whole["since"]
+
+
+async def test_sync_returns_changes_and_tombstones(client):
+    first = await sync(client, 0)
+    updated, removed = first["changed"][:2]
+
+    created = (await client.post("/incident/", json=NEW_INCIDENT)).json()
+    response = await client.put(f"/incident/{updated}", json={"status": "closed"})
+    assert response.status_code == 200, response.text
+    response = await client.delete(f"/incident/{removed}")
+    assert response.status_code == 200, response.text
+
+    second = await sync(client, first["since"])
+    assert sorted(second["changed"]) == sorted([created["id"], updated])
+    assert second["deleted"] == [removed]
+    assert second["since"] > first["since"]
+
+    # Nothing changed since the second sync
+    third = await sync(client, second["since"])
+    assert third["changed"] == third["deleted"] == []
+    assert third["since"] == second["since"]